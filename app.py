@@ -1,7 +1,11 @@
 import pandas as pd
-from flask import Flask, redirect, render_template, request, send_file, url_for, escape
+from flask import Flask, abort, jsonify, make_response, redirect, render_template, request, send_file, \
+    send_from_directory, url_for, escape
 
+from pystruct.configs import PATH_REPORT_ASSETS_DIR
+from pystruct.html_utils.lazy_report import LazyTabsReportMixin, ReportAssetStore, report_fragment
 from pystruct.objects.full_report import FullReport
+from pystruct.objects.import_cycles import ModuleReachabilityDataframe
 from pystruct.plat.dataset_controller import DatasetController
 from pystruct.utils.object_utils import get_all_concrete_object_classes
 from pystruct.utils.object_utils import get_object_class_from_class_name
@@ -15,6 +19,7 @@ app.config['SECRET_KEY'] = 'test_key'
 debug_flag = True
 app.logger.info(f"{debug_flag=}")
 app.logger.info(f"{dataset_controller.current_dataset=}")
+report_asset_store = ReportAssetStore()
 
 
 @app.route('/')
@@ -33,10 +38,43 @@ def main():
 def obj(obj_class_name):
     print("debug->", dataset_controller.current_dataset.name)
     cls = get_object_class_from_class_name(obj_class_name.replace(' ', ''))
-    html_object = cls().to_html()
+    if issubclass(cls, LazyTabsReportMixin):
+        # the tabs are built when they are opened, see fragment
+        html_object = cls().lazy_html(_fragment_url)
+    else:
+        html_object = cls().to_html()
     return render_template('objects.html', **locals(), **globals())
 
 
+def _fragment_url(obj_class):
+    return url_for('fragment', obj_class_name=obj_class.__name__)
+
+
+def _asset_url(filename):
+    return url_for('asset', filename=filename)
+
+
+@app.route('/fragment/<obj_class_name>')
+def fragment(obj_class_name):
+    """
+    The html of an object, without the page around it, for the lazy tabs of the reports. The images are
+    served separately, see asset.
+    The ETag is the hash of the html, so the object is still loaded (or built) and rendered for a
+    conditional request: a 304 saves only the transfer of the fragment.
+    """
+    cls = get_object_class_from_class_name(obj_class_name.replace(' ', ''))
+    response = make_response(report_fragment(cls(), _fragment_url, report_asset_store, _asset_url))
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@app.route('/asset/<filename>')
+def asset(filename):
+    # the assets are named by the hash of their content, so they never change
+    return send_from_directory(PATH_REPORT_ASSETS_DIR, filename, max_age=31536000)
+
+
 @app.route('/build_obj/<obj_class_name>')
 def build_obj(obj_class_name):
     cls = get_object_class_from_class_name(obj_class_name.replace(' ', ''))
@@ -54,6 +92,22 @@ def download_obj(obj_class_name):
     return send_file(filepath, as_attachment=True)
 
 
+@app.route('/reachability/<module>')
+def reachability(module):
+    """
+    Transitive dependencies and dependents of a module of the project, or if it depends on the module of
+    the `depends_on` argument.
+    """
+    index = ModuleReachabilityDataframe().index()
+    if module not in index:
+        abort(404)
+
+    other_module = request.args.get('depends_on')
+    if other_module is not None:
+        return jsonify(module=module, depends_on=other_module, result=index.depends_on(module, other_module))
+    return jsonify(module=module, dependencies=index.dependencies(module), dependents=index.dependents(module))
+
+
 @app.route('/project/', methods=['GET'])
 def project():
     existing_dataset_names = [dataset.name for dataset in dataset_controller.all_datasets]
@@ -2,6 +2,7 @@ import argparse
 
 from pystruct.objects.full_report import FullReport
 from pystruct.objects.grab_code import grab_code
+from pystruct.objects.python_object import PObject
 from pystruct.python.python_source_obj import PythonSourceObj
 
 
@@ -9,6 +10,8 @@ def read_args():
     parser = argparse.ArgumentParser(description='Extract stats from python codebase.')
     # https://docs.python.org/3/library/argparse.html#:~:text=in%20version%203.9.-,The%20add_argument()%20method,-%C2%B6
     parser.add_argument('pystruct', type=str, help='Source folder')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Number of processes used to parse the source code (0 uses all the CPUs)")
     # parser.add_argument('-d', '--dest', type=str, help="Destination exported files (stats, reports, etc...)")
     # parser.add_argument('-b', '--ex2', choices=['b1', 'b2', 'b3'], required=False, help="example required")
     # parser.add_argument('-s', '--save', action='store_false')
@@ -23,6 +26,8 @@ def main():
     print(args)
     source = args['pystruct']
 
+    PObject.jobs = args['jobs'] or None
+
     grab_code(source)
 
     FullReport().data()
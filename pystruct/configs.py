@@ -11,6 +11,12 @@ PATH_GIT_COPY_DIR = join(PATH_FILES_DIR, "git_repo")
 
 PATH_STORE_HTML_BUILDS_DIR = join(PATH_FILES_DIR, "html_builds")
 
+PATH_PYTHON_PACKAGE_INDEX_DIR = join(PATH_FILES_DIR, "python_package_index")
+
+PATH_PLANTUML_RENDER_CACHE_DIR = join(PATH_FILES_DIR, "plantuml_render_cache")
+
+PATH_REPORT_ASSETS_DIR = join(PATH_FILES_DIR, "report_assets")
+
 
 PATH_STORE_PYTHON_OBJECTS_DIR = join(PATH_FILES_DIR, "python_objects")
 PATH_STORE_PYTHON_SOURCE_OBJECTS_JSON = join(PATH_STORE_PYTHON_OBJECTS_DIR, "python_source_object.json")
@@ -33,4 +39,20 @@ PATH_RES_HTML_IMAGE = join(PATH_RES_HTML, "image.html")
 
 PATH_STORE_JOINT_STAT_TABLE_CSV = join(PATH_FILES_DIR, "joint_stats.csv")
 
+PLANTUML_LOCAL_SERVER_URL = 'http://localhost:8080/img/'
+PLANTUML_DOCKER_SERVER_URL = 'http://plantuml:8080/img/'
+PLANTUML_WEB_SERVER_URL = 'http://www.plantuml.com/plantuml/img/'
+
+PLANTUML_CONNECT_TIMEOUT = 3  # seconds, for the health checks of the servers
+PLANTUML_HEALTH_MAX_AGE = 300  # seconds, before the cached health of a server is checked again
+PLANTUML_HEALTH_CHECK_INTERVAL = 60  # seconds, between the background checks of the servers
+
+# more PlantUML servers to render with, besides the one PlantUMLService connects to
+PLANTUML_RENDER_POOL_URLS = []
+PLANTUML_RENDER_POOL_MAX_WORKERS = 4
+PLANTUML_RENDER_TIMEOUT = 60  # seconds
+PLANTUML_RENDER_RETRIES = 2
+
+PLANTUML_RENDER_CACHE_MAX_SIZE = 512 * 2**20  # bytes
+
 VERBOSITY = 2
@@ -116,6 +116,15 @@ class TabsHTML(TemplateHTMLBuilder):
         self._add_div(label, html_content.html() if issubclass(html_content.__class__, HTMLObject) else html_content)
         return self
 
+    def add_lazy_tab(self, label, url):
+        """
+        Adds a tab whose content is fetched from the url when the tab is opened for the first time.
+        """
+        self._add_button(label)
+        to_add = f"<div id=\"{label}_[id]\" class=\"tabcontent_[id]\" data-src=\"{url}\">Loading..</div>\n[div_tab]"
+        self.replace('div_tab', to_add)
+        return self
+
     def html(self):
         self.replace("button", '')
         self.replace("div_tab", '')
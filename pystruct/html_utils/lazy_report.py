@@ -0,0 +1,82 @@
+"""
+Reports served in parts: a report of tabs is sent as a light page whose tabs are fetched when they are
+opened (report fragments), and the images of the fragments are sent as separate files (assets), that the
+browser caches, instead of being inlined in base64.
+"""
+import base64
+import hashlib
+import os
+import re
+import uuid
+
+from pystruct.configs import PATH_REPORT_ASSETS_DIR
+from pystruct.html_utils.html_pages import TabsHTML
+
+INLINE_IMAGE_PATTERN = re.compile(r'src="data:image/[\w+]+;base64,\s*([A-Za-z0-9+/=]+)"')
+
+IMAGE_EXTENSIONS = [(b'\x89PNG', 'png'), (b'GIF8', 'gif'), (b'\xff\xd8', 'jpg'), (b'<svg', 'svg'), (b'<?xml', 'svg')]
+
+
+def _image_extension(image):
+    return next((extension for signature, extension in IMAGE_EXTENSIONS if image.startswith(signature)), 'png')
+
+
+class ReportAssetStore:
+    """
+    The images of the reports in files named by the hash of their content, so an asset never changes and
+    the same image is stored once for all the reports and datasets.
+    """
+    def __init__(self, directory=PATH_REPORT_ASSETS_DIR):
+        self.directory = directory
+
+    def put(self, image):
+        """
+        :return: the file name of the image
+        """
+        filename = f"{hashlib.sha256(image).hexdigest()[:32]}.{_image_extension(image)}"
+        filepath = os.path.join(self.directory, filename)
+        if not os.path.exists(filepath):
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_filepath = f"{filepath}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_filepath, 'wb') as f:
+                f.write(image)
+            os.replace(tmp_filepath, filepath)
+        return filename
+
+    def externalize_images(self, html, asset_url):
+        """
+        :param asset_url: function of the file name of an asset to its url
+        :return: the html with the base64 images replaced by lazy loaded images of the assets
+        """
+        def replace(match):
+            filename = self.put(base64.b64decode(match.group(1)))
+            return f'loading="lazy" src="{asset_url(filename)}"'
+
+        return INLINE_IMAGE_PATTERN.sub(replace, html)
+
+
+class LazyTabsReportMixin:
+    """
+    Report with a tab per object of `content_dict`, that can be served as a page of lazy tabs: the
+    objects are built when their tab is opened.
+    """
+    content_dict = {}
+
+    def lazy_html(self, fragment_url):
+        """
+        :param fragment_url: function of an object class to the url of its fragment
+        """
+        html_builder = TabsHTML()
+        for title, obj_class in self.content_dict.items():
+            html_builder.add_lazy_tab(title, fragment_url(obj_class))
+        return html_builder.html()
+
+
+def report_fragment(obj, fragment_url, asset_store, asset_url):
+    """
+    :return: the html of the object for a lazy tab: lazy tabs for the reports of tabs, otherwise its html
+    with the images as assets
+    """
+    if isinstance(obj, LazyTabsReportMixin):
+        return obj.lazy_html(fragment_url)
+    return asset_store.externalize_images(obj.to_html(), asset_url)
@@ -0,0 +1,143 @@
+"""
+Centrality metrics of the nodes of an import graph (pystruct.utils.graph_structures.Graph), computed with
+vectorised sums over the edge arrays of the graph: a sum over the predecessors (or the successors) of all
+the nodes is one np.bincount, which is a sparse matrix-vector product.
+
+An edge goes from the importing node to the imported one, so a node that is imported by many (important)
+nodes has a high PageRank.
+"""
+import numpy as np
+import pandas as pd
+
+GRAPH_METRICS = ['pagerank', 'fan_in', 'fan_out', 'instability', 'betweenness']
+
+
+def _distinct_edges(graph):
+    sources, targets = graph.edge_ids()
+    not_self_edges = sources != targets
+    pairs = np.unique(np.stack([sources[not_self_edges], targets[not_self_edges]], axis=1).reshape(-1, 2), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def fan_in_and_fan_out(graph):
+    """
+    :return: (number of nodes that import every node, number of nodes every node imports)
+    """
+    sources, targets = _distinct_edges(graph)
+    return np.bincount(targets, minlength=graph.size()), np.bincount(sources, minlength=graph.size())
+
+
+def instability(fan_in, fan_out):
+    """
+    Instability (I = fan-out / (fan-in + fan-out)): 0 for nodes that only are imported, 1 for the ones that
+    only import, NaN for the nodes without imports.
+    """
+    fan = fan_in + fan_out
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(fan > 0, fan_out / fan, np.nan)
+
+
+def pagerank(graph, damping=0.85, tolerance=1e-10, max_iterations=100):
+    """
+    PageRank with power iteration. The rank of the nodes without edges (nothing imported) is distributed to
+    all the nodes.
+    """
+    number_of_nodes = graph.size()
+    if number_of_nodes == 0:
+        return np.zeros(0)
+
+    sources, targets = _distinct_edges(graph)
+    out_degrees = np.bincount(sources, minlength=number_of_nodes)
+    is_dangling = out_degrees == 0
+    edge_weights = 1. / out_degrees[sources]
+
+    ranks = np.full(number_of_nodes, 1. / number_of_nodes)
+    for _ in range(max_iterations):
+        incoming = np.bincount(targets, weights=ranks[sources] * edge_weights, minlength=number_of_nodes)
+        new_ranks = (1. - damping) / number_of_nodes + damping * (incoming + ranks[is_dangling].sum() / number_of_nodes)
+        converged = np.abs(new_ranks - ranks).sum() < tolerance * number_of_nodes
+        ranks = new_ranks
+        if converged:
+            break
+    return ranks
+
+
+def _add_source_dependencies(sources, targets, number_of_nodes, source, centralities):
+    """
+    Brandes' accumulation of the dependencies of the shortest paths from `source`, level by level of its
+    breadth first search.
+    """
+    distances = np.full(number_of_nodes, -1, dtype=np.int64)
+    distances[source] = 0
+    frontier = np.zeros(number_of_nodes, dtype=bool)
+    frontier[source] = True
+    level = 0
+    while frontier.any():
+        successors = np.unique(targets[frontier[sources]])
+        successors = successors[distances[successors] == -1]
+        level += 1
+        distances[successors] = level
+        frontier[:] = False
+        frontier[successors] = True
+
+    # the edges of the shortest paths, sorted by the level of their source
+    on_shortest_paths = (distances[sources] >= 0) & (distances[targets] == distances[sources] + 1)
+    path_sources, path_targets = sources[on_shortest_paths], targets[on_shortest_paths]
+    order = np.argsort(distances[path_sources], kind='stable')
+    path_sources, path_targets = path_sources[order], path_targets[order]
+    # the edges whose source is at the distance d of the source are level_bounds[d]:level_bounds[d+1]
+    level_bounds = np.concatenate([[0], np.searchsorted(distances[path_sources], np.arange(level), side='right')])
+    levels = list(zip(level_bounds[:-1].tolist(), level_bounds[1:].tolist()))
+
+    number_of_paths = np.zeros(number_of_nodes)
+    number_of_paths[source] = 1.
+    for start, end in levels:
+        number_of_paths += np.bincount(path_targets[start:end], weights=number_of_paths[path_sources[start:end]],
+                                       minlength=number_of_nodes)
+
+    dependencies = np.zeros(number_of_nodes)
+    for start, end in reversed(levels):
+        level_sources, level_targets = path_sources[start:end], path_targets[start:end]
+        contributions = number_of_paths[level_sources] / number_of_paths[level_targets] * (1. + dependencies[level_targets])
+        dependencies += np.bincount(level_sources, weights=contributions, minlength=number_of_nodes)
+
+    dependencies[source] = 0.
+    centralities += dependencies
+
+
+def betweenness(graph, number_of_pivots=100, seed=0):
+    """
+    Betweenness centrality of the directed graph, normalised by (n-1)(n-2). Exact (Brandes' algorithm) for
+    graphs of up to `number_of_pivots` nodes, otherwise approximated from the shortest paths of
+    `number_of_pivots` random source nodes (Brandes and Pich), scaled to all the nodes.
+    """
+    number_of_nodes = graph.size()
+    if number_of_nodes < 3:
+        return np.zeros(number_of_nodes)
+
+    sources, targets = _distinct_edges(graph)
+    if number_of_nodes <= number_of_pivots:
+        pivots = np.arange(number_of_nodes)
+    else:
+        pivots = np.random.default_rng(seed).choice(number_of_nodes, number_of_pivots, replace=False)
+
+    centralities = np.zeros(number_of_nodes)
+    for pivot in pivots.tolist():
+        _add_source_dependencies(sources, targets, number_of_nodes, pivot, centralities)
+
+    return centralities * (number_of_nodes / len(pivots)) / ((number_of_nodes - 1) * (number_of_nodes - 2))
+
+
+def graph_metrics(graph, node_column='node'):
+    """
+    :return: pandas.DataFrame with the nodes of the graph and their GRAPH_METRICS
+    """
+    fan_in, fan_out = fan_in_and_fan_out(graph)
+    return pd.DataFrame({
+        node_column: [graph.node(node_id) for node_id in range(graph.size())],
+        'pagerank': pagerank(graph),
+        'fan_in': fan_in,
+        'fan_out': fan_out,
+        'instability': instability(fan_in, fan_out),
+        'betweenness': betweenness(graph),
+    })
@@ -1,30 +1,38 @@
+import pandas as pd
+
+from pystruct.utils.name_trie import DottedNameTrie
 from pystruct.utils.python_utils import is_python_builtin_package
 
 
 def enrich_import_raw_df(df):
+    # the columns are computed once per distinct module and import path, and expanded to all the rows
+    modules, imports = DistinctValues(df['module']), DistinctValues(df['imports'])
+
     # takes an imported path e.x "a.b.c" and keeps only the first component "a"
-    df['import_root'] = df['imports'].apply(import_root)
+    import_roots = imports.values.str.partition('.')[0]
+    df['import_root'] = imports.expand(import_roots)
 
     # if no-imports
     df['is_no_imports'] = df['import_root'] == 'no-imports'
 
     # finds the root path of all the module paths
-    project_root = common_root(df['module'])
+    project_root = common_root(modules.values.str.partition('.')[0])
 
     # checks if it is an internal/in-project module
-    df['is_internal'] = df['import_root'].apply(lambda x: x == project_root)
+    df['is_internal'] = df['import_root'] == project_root
 
     # checks if it is an external/3rd-party python library
     df['is_external'] = ~df['is_internal'] & ~df['is_no_imports']
 
     # checks if it is a python built-in module
-    df['is_builtin'] = df['imports'].apply(is_python_builtin_package)
+    df['is_builtin'] = imports.expand(import_roots.map(is_python_builtin_package))
 
     # finds the module import path for in-project imports
-    df['import_module'] = df['imports'].apply(lambda x: element_with_longest_match(x, df['module'].unique()))
+    resolver = ProjectImportResolver(modules.values)
+    df['import_module'] = imports.expand(imports.values.map(resolver.module))
 
     # calculate the depth of a module path
-    df['module_depth'] = df['module'].apply(lambda x: len(breakdown_import_path(x)))
+    df['module_depth'] = modules.expand(modules.values.str.count(r'\.') + 1)
 
     # check if imported in-project module exists and therefore if it is an valid import path
     df['invalid_import'] = df['is_internal'] & df['import_module'].isna()
@@ -32,58 +40,78 @@ def enrich_import_raw_df(df):
     # check if a module is imported anywhere in the project
     df['unused_module'] = ~df['module'].isin(df['import_module'])
 
+    # splits the module paths at their last dot, e.x "a.b.c" -> "a.b", "c"
+    module_parts = modules.values.str.rpartition('.')
+
     # keeps only the name of the module ex "a.b.c" -> "c"
-    df['module_name'] = df['module'].apply(module_name)
+    df['module_name'] = modules.expand(module_parts[2])
 
     # finds the package path of each module
-    df['package'] = df['module'].apply(lambda x: '.'.join(breakdown_import_path(x)[:-1]))
+    df['package'] = modules.expand(module_parts[0])
 
     # short package name ex a.b.c -> c
-    df['package_name'] = df['package'].apply(lambda x: breakdown_import_path(x)[-1])
+    df['package_name'] = modules.expand(module_parts[0].str.rpartition('.')[2])
 
-    # finds the package path of each in-project import
-    df['import_package_temp'] = df['import_module'].apply(lambda x: element_with_longest_match(x, df['package'].unique()))
-
-    # similar to import_package_temp column but for com packages too
-    df['import_package'] = df.apply(lambda row: row['import_package_temp'] if row['is_internal'] else row['import_root'], axis=1)
-    del df['import_package_temp']
+    # finds the package path of each in-project import, the import root for com packages
+    import_modules = DistinctValues(df['import_module'])
+    import_packages = import_modules.expand(import_modules.values.map(resolver.package))
+    df['import_package'] = df['import_root'].mask(df['is_internal'], import_packages)
 
     df['is_init_file'] = df['module_name'] == '__init__'
 
     return df
 
 
-def breakdown_import_path(import_path):
-    return import_path.split('.')
+class DistinctValues:
+    """
+    The distinct values of a column, to compute other columns once per distinct value and expand them
+    back to the rows of the column.
+    """
+    def __init__(self, series):
+        self._codes, uniques = pd.factorize(series)
+        self._index = series.index
+        self.values = pd.Series(uniques)
 
+    def expand(self, distinct_values_column):
+        """
+        :param distinct_values_column: column aligned with `values`
+        :return: the column for all the rows (missing for rows with missing values)
+        """
+        return pd.Series(distinct_values_column.array.take(self._codes, allow_fill=True), index=self._index)
 
-def import_root(import_path):
-    return breakdown_import_path(import_path)[0]
 
-
-def module_name(module_path):
-    return breakdown_import_path(module_path)[-1]
+def breakdown_import_path(import_path):
+    return import_path.split('.')
 
 
-def common_root(module_paths):
-    roots = module_paths.apply(import_root)
-    vc = roots.value_counts()
+def common_root(module_roots):
+    vc = module_roots.value_counts()
     if len(vc) != 1:
         raise ValueError(f"Module paths don't all have the same root: {vc}")
     return vc.index[0]
 
 
-def element_with_longest_match(string, list_of_strings):
-    if not string:
-        return None
+def package_path(module_path):
+    return '.'.join(breakdown_import_path(module_path)[:-1])
+
+
+class ProjectImportResolver:
+    """
+    Resolves import paths to the modules and packages of the project they import, using prefix trees
+    of the module and package paths built once.
+    """
+    def __init__(self, module_paths):
+        self._modules = DottedNameTrie(module_paths)
+        self._packages = DottedNameTrie(package_path(module_path) for module_path in module_paths)
 
-    longest_match_len = -1
-    longest_match_element = None
-    for element in list_of_strings:
-        if string.startswith(element):
-            match_len_inv = len(string.replace(element, ''))
-            if longest_match_len == -1 or match_len_inv < longest_match_len:
-                longest_match_len = match_len_inv
-                longest_match_element = element
-    return longest_match_element
+    def module(self, import_path):
+        """
+        :return: the longest module path of the project that the import path starts with, or None
+        """
+        return self._modules.longest_prefix(import_path)
 
+    def package(self, import_path):
+        """
+        :return: the longest package path of the project that the import path starts with, or None
+        """
+        return self._packages.longest_prefix(import_path)
@@ -2,85 +2,83 @@ import abc
 
 import pandas as pd
 
+from pystruct.metrics.node_features import NodeFeaturesVisitor
 from pystruct.objects.data_objects import DataframeObjectABC
-from pystruct.objects.python_object import PObject
-from pystruct.utils.logs import log_yellow
-from pystruct.visitors.visitor import TreeNodeVisitor
+from pystruct.objects.python_object import TreeVisitorObjectMixin
 
 """
 To add a new metric:
-   * sub-class Metric class
-   * implement any of the calculate_[obj] functions needed
-"""
-
-
-class CalculateMetricVisitor(TreeNodeVisitor):
-    def __init__(self, metric):
-        self._metric = metric
-        self._results = {}
-
-    def _set_value_for_obj(self, p_obj, value):
-        if value is None:
-            return False
-
-        if p_obj.name in self._results.keys():
-            log_yellow(f"Multiple values for metric {self._metric.name} (current value {self._results[p_obj.name]} overwritten with {value}.)")
-
-        self._results[p_obj.name] = value
-        return True
+   * sub-class MetricObject class
+   * set the node types the metric applies to, if not all of them
+   * implement the calculate function, that computes the metric as a column of the node features table
 
-    def visit_all(self, node):
-        self._set_value_for_obj(node.data, self._metric.calculate(node.data))
-
-    def visit_directory(self, node):
-        self._set_value_for_obj(node.data, self._metric.calculate_directory(node.data))
+Nodes are identified by their node id, the position of the node in the node features table. Metrics are
+stored by node id, and are combined by aligning their columns on it. The names of the nodes are only
+added for display.
+"""
 
-    def visit_module(self, node):
-        self._set_value_for_obj(node.data, self._metric.calculate_module(node.data))
 
-    def visit_class(self, node):
-        self._set_value_for_obj(node.data, self._metric.calculate_class(node.data))
+class NodeFeaturesDataframe(TreeVisitorObjectMixin, DataframeObjectABC):
+    """
+    One row per node of the python source object, with the features the metrics are calculated from.
+    See NodeFeaturesVisitor for the columns.
+    """
+    def tree_visitor(self):
+        return NodeFeaturesVisitor()
 
-    def visit_function(self, node):
-        self._set_value_for_obj(node.data, self._metric.calculate_function(node.data))
+    def result_from_visitor(self, visitor):
+        return visitor.result()
 
-    def visit_class_method(self, node):
-        self._set_value_for_obj(node.data, self._metric.calculate_class_method(node.data))
 
-    def results(self):
-        data_array = list(self._results.items())
-        return pd.DataFrame.from_records(data_array, columns=['item', self._metric.metric_name])
+def metrics_dataframe(metric_classes, with_items=False):
+    """
+    :return: pandas.DataFrame indexed by node id, with one column per metric (empty for the nodes a metric
+    doesn't apply to), and optionally the names of the nodes in the first column ('item')
+    """
+    features_df = NodeFeaturesDataframe().data()
+    columns = [metric_class().column(len(features_df)) for metric_class in metric_classes]
+    if with_items:
+        columns.insert(0, features_df['item'])
+    return pd.concat(columns, axis=1)
 
 
-class Metric(abc.ABC):
+class MetricObject(DataframeObjectABC, abc.ABC):
     metric_name = None
+    node_types = None  # types of the nodes the metric is calculated for, None for all the types
 
-    def calculate(self, p_obj, **kwargs):
-        pass
-
-    def calculate_directory(self, p_obj, **kwargs):
-        pass
-
-    def calculate_module(self, p_obj, **kwargs):
-        pass
-
-    def calculate_class(self, p_obj, **kwargs):
-        pass
-
-    def calculate_function(self, p_obj, **kwargs):
-        pass
-
-    def calculate_class_method(self, p_obj, **kwargs):
-        pass
-
-
-class MetricObject(DataframeObjectABC, Metric):
     def __init__(self):
         super().__init__()
 
+    @abc.abstractmethod
+    def calculate(self, features_df):
+        """
+        :param features_df: the rows of the node features table for the node types of the metric
+        :return: pandas.Series with the metric's value for every row
+        """
+        pass
+
     def build(self):
-        pobj = PObject().python_source_object()
-        metrics_vis = CalculateMetricVisitor(self)
-        pobj.use_visitor(metrics_vis)
-        res = metrics_vis.results()
-        return res
+        features_df = NodeFeaturesDataframe().data()
+        if self.node_types is not None:
+            features_df = features_df[features_df['type'].isin(self.node_types)]
+
+        return pd.DataFrame({
+            'node_id': features_df.index,
+            self.metric_name: self.calculate(features_df)
+        }).reset_index(drop=True)
+
+    def column(self, number_of_nodes):
+        """
+        :return: pandas.Series with the values of the metric aligned on the node ids of all the nodes
+        """
+        df = self.data()
+        column = pd.Series(df[self.metric_name].values, index=df['node_id'].values, name=self.metric_name)
+        return column.reindex(pd.RangeIndex(number_of_nodes))
+
+    def named_data(self):
+        """
+        :return: pandas.DataFrame with the names of the nodes ('item') and the values of the metric
+        """
+        df = self.data()
+        items = NodeFeaturesDataframe().data()['item'].values
+        return pd.DataFrame({'item': items[df['node_id'].values], self.metric_name: df[self.metric_name].values})
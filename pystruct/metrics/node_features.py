@@ -0,0 +1,89 @@
+import ast
+import re
+
+import pandas as pd
+
+from pystruct.visitors.visitor import TreeNodeVisitor
+
+# the `if __name__ == '__main__':` guard, matched while ignoring all spaces and new lines and the type of quotes
+MAIN_GUARD_REGEX = re.compile('[ \n]*'.join(
+    "['\"]" if char == "'" else re.escape(char) for char in "if__name__=='__main__':"
+))
+
+FUNCTION_TYPES = ['function', 'class_method']
+STATEMENT_TYPES = ['class', 'function', 'class_method']
+CODE_TYPES = ['module', 'class', 'function', 'class_method']
+
+# arguments that are not counted in the arguments of the class methods
+IMPLICIT_METHOD_ARGS = {'self', 'args', 'kwargs'}
+
+
+def number_of_lines(p_obj):
+    span = p_obj.span
+    if span is not None:
+        return span.end_lineno - span.start_lineno + 1
+    return p_obj.code.count('\n') + 1
+
+
+def has_main_guard(code):
+    return MAIN_GUARD_REGEX.search(code) is not None
+
+
+class NodeFeaturesVisitor(TreeNodeVisitor):
+    """
+    Collects the features of every node of the tree in a table with one row per node. Features that
+    don't apply to the type of the node are left empty:
+    * type: the type of the node
+    * number_of_lines: lines of code of modules, classes, functions and class methods
+    * number_of_args: all the arguments (nested functions and lambdas included) of functions and class methods
+    * number_of_distinct_args: distinct argument names of functions and class methods, except for
+      self, args and kwargs
+    * number_of_decorators: decorators of classes, functions and class methods
+    * has_main_guard: if a module has an `if __name__ == '__main__':` block
+    """
+    COLUMNS = ['item', 'type', 'number_of_lines', 'number_of_args', 'number_of_distinct_args',
+               'number_of_decorators', 'has_main_guard']
+
+    def __init__(self):
+        self._columns = {column: [] for column in self.COLUMNS}
+
+    def _add_row(self, p_obj, number_of_lines=None, number_of_args=None, number_of_distinct_args=None,
+                 number_of_decorators=None, has_main_guard=None):
+        row = (p_obj.name, p_obj.type, number_of_lines, number_of_args, number_of_distinct_args,
+               number_of_decorators, has_main_guard)
+        for column, value in zip(self.COLUMNS, row):
+            self._columns[column].append(value)
+
+    def visit_directory(self, node):
+        self._add_row(node.data)
+
+    def visit_module(self, node):
+        module_obj = node.data
+        self._add_row(module_obj, number_of_lines=number_of_lines(module_obj),
+                      has_main_guard=has_main_guard(module_obj.code))
+
+    def visit_class(self, node):
+        class_obj = node.data
+        self._add_row(class_obj, number_of_lines=number_of_lines(class_obj),
+                      number_of_decorators=self._number_of_decorators(class_obj.ast))
+
+    def visit_function(self, node):
+        self._add_function_row(node.data)
+
+    def visit_class_method(self, node):
+        self._add_function_row(node.data)
+
+    def _add_function_row(self, function_obj):
+        _asts = function_obj.ast
+        args = [_ast.arg for _ast in _asts if isinstance(_ast, ast.arg)]
+        self._add_row(function_obj, number_of_lines=number_of_lines(function_obj),
+                      number_of_args=len(args),
+                      number_of_distinct_args=len(set(args) - IMPLICIT_METHOD_ARGS),
+                      number_of_decorators=self._number_of_decorators(_asts))
+
+    @staticmethod
+    def _number_of_decorators(_asts):
+        return len(_asts[1].decorator_list) if len(_asts) > 1 else None
+
+    def result(self):
+        return pd.DataFrame(self._columns, columns=self.COLUMNS)
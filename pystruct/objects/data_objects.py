@@ -75,6 +75,21 @@ class AbstractObject(abc.ABC, Singleton, HTMLMixin, NameMixin):
 
         return self._data
 
+    def is_available(self):
+        """
+        :return: True if the data are already built, either in memory or in the object's file.
+        """
+        return self._data is not None or (self._file_adapter is not None and self._file_adapter.exists())
+
+    def set_data(self, data):
+        """
+        Sets (and saves) data built outside the object's `build`, for example data built along with
+        another object's data.
+        """
+        self._data = data
+        if self._file_adapter and self._data is not None:
+            self._file_adapter.save(self._data)
+
     def delete(self):
         self._data = None
         if self._file_adapter:
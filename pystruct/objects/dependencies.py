@@ -1,20 +1,66 @@
+from collections import namedtuple
+
+import numpy as np
 import pandas as pd
 
 from pystruct.objects.data_objects import DataframeObjectABC
 from pystruct.objects.imports_data_objects import ImportsEnrichedDataframe
 
 
-def _unique_sorted_string_agg(items):
-    filtered_items = [item for item in items if isinstance(item, str)]
-    return ','.join(sorted(set(filtered_items   )))
-
-
-def _produce_unique_and_nunique_from_df(imports_df, new_column_name, groupby_column, agg_column):
-    agg_rows = imports_df.groupby(groupby_column).agg({agg_column: [_unique_sorted_string_agg, pd.Series.nunique]})
-    agg_rows.columns = [f'{new_column_name}s', f'number_of_{new_column_name}s']
-    agg_rows[f'number_of_{new_column_name}s'].fillna(0, inplace=True)
-    # agg_rows[f'number_of_{new_column_name}s'] = agg_rows[f'number_of_{new_column_name}s'].astype(int)
-    return agg_rows
+# unique and number of unique values of the `agg_column` for each value of the `groupby_column`, for the
+# rows where the `filter_column` is True, named `{name}s` and `number_of_{name}s`
+UniqueStat = namedtuple('UniqueStat', ['name', 'groupby_column', 'agg_column', 'filter_column'])
+
+
+class DependencyStatsEngine:
+    """
+    Computes the unique/nunique stats of the imports in a single grouped pass. The values of the columns
+    are replaced once by their codes in a sorted vocabulary, the (stat, group, value) codes of all the stats
+    are deduplicated and sorted together, and the values of every group are joined in one groupby.
+    """
+    def __init__(self, imports_df, unique_stats):
+        columns = sorted({column for stat in unique_stats for column in (stat.groupby_column, stat.agg_column)})
+        self._vocabulary = pd.Index(pd.concat([imports_df[column] for column in columns]).dropna().unique()).sort_values()
+        codes = {column: self._vocabulary.get_indexer(imports_df[column]) for column in columns}
+
+        stat_ids, group_codes, value_codes = [], [], []
+        for stat_id, stat in enumerate(unique_stats):
+            mask = imports_df[stat.filter_column].to_numpy(dtype=bool) & (codes[stat.groupby_column] != -1)
+            group_codes.append(codes[stat.groupby_column][mask])
+            value_codes.append(codes[stat.agg_column][mask])
+            stat_ids.append(np.full(mask.sum(), stat_id))
+
+        codes_df = pd.DataFrame({
+            'stat': np.concatenate(stat_ids),
+            'group': np.concatenate(group_codes),
+            'value': np.concatenate(value_codes),
+        }).drop_duplicates().sort_values(['stat', 'group', 'value'])
+
+        # groups whose values are all missing (-1) are kept in the results, with no values
+        groups_index = pd.MultiIndex.from_frame(codes_df[['stat', 'group']].drop_duplicates())
+        valid_codes_df = codes_df[codes_df['value'] != -1]
+        grouped_values = pd.Series(self._vocabulary.take(valid_codes_df['value']), index=valid_codes_df.index)\
+            .groupby([valid_codes_df['stat'], valid_codes_df['group']], sort=False)
+        stats_df = pd.DataFrame({
+            'values': grouped_values.agg(','.join),
+            'number_of_values': grouped_values.size(),
+        }).reindex(groups_index).fillna({'values': '', 'number_of_values': 0})
+
+        self._stats = {}
+        stat_id_level = stats_df.index.get_level_values('stat')
+        for stat_id, stat in enumerate(unique_stats):
+            stat_df = stats_df[stat_id_level == stat_id]
+            self._stats[stat.name] = pd.DataFrame({
+                f'{stat.name}s': stat_df['values'].array,
+                f'number_of_{stat.name}s': stat_df['number_of_values'].to_numpy(dtype='int64'),
+            }, index=pd.Index(self._vocabulary.take(stat_df.index.get_level_values('group')), name=stat.groupby_column))
+
+    def unique_and_nunique(self, name):
+        """
+        :return: pandas.DataFrame indexed by the groups (sorted), with the comma separated unique values of
+        the stat (`{name}s`) and their number (`number_of_{name}s`)
+        """
+        return self._stats[name]
 
 
 class PackageAndModulesMapping(DataframeObjectABC):
@@ -31,14 +77,51 @@ class PackageAndModulesMapping(DataframeObjectABC):
         return df_res
 
 
-class PackageDependencyStatsDataframe(DataframeObjectABC):
+class DependencyStatsDataframeABC(DataframeObjectABC):
+    """
+    Unique and number of unique imports of every package or module. The imports are loaded when the stats
+    are built, and all the stats of `unique_stats` are calculated together by a DependencyStatsEngine.
+    """
+    unique_stats = []
+
     def __init__(self):
         super().__init__(read_csv_kwargs={'index_col': None, 'header': 0}, to_csv_kwargs={'index': False})
-        df = ImportsEnrichedDataframe().data()
-        df_filtered = df[~df['unused_module']]
-        self._imports_df = df_filtered
+        self._imports_df = None
+        self._stats_engine = None
+
+    def imports_df(self):
+        if self._imports_df is None:
+            df = ImportsEnrichedDataframe().data()
+            self._imports_df = df[~df['unused_module']]
+        return self._imports_df
+
+    def _build_stats_engine(self):
+        self._stats_engine = DependencyStatsEngine(self.imports_df(), self.unique_stats)
+
+    def _unique_and_nunique(self, name):
+        if self._stats_engine is not None:
+            return self._stats_engine.unique_and_nunique(name)
+        # a single stat is calculated on its own, without requiring the columns of the other stats
+        unique_stat = next(stat for stat in self.unique_stats if stat.name == name)
+        return DependencyStatsEngine(self.imports_df(), [unique_stat]).unique_and_nunique(name)
+
+    def _imported_from(self, name, index_name):
+        res = self._unique_and_nunique(name)
+        res = res.rename(columns={f'number_of_{name}s': f'times_been_{name}s'})
+        return res.rename_axis(index_name)
+
+
+class PackageDependencyStatsDataframe(DependencyStatsDataframeABC):
+    unique_stats = [
+        UniqueStat('external_package', 'package', 'import_package', 'is_external'),
+        UniqueStat('builtin_package', 'package', 'import_package', 'is_builtin'),
+        UniqueStat('internal_package', 'package', 'import_package', 'is_internal'),
+        UniqueStat('internal_module', 'package', 'import_module', 'is_internal'),
+        UniqueStat('imported_from_package', 'import_package', 'package', 'is_internal'),
+    ]
 
     def build(self):
+        self._build_stats_engine()
         df_ext_packages = self.produce_external_packages()
         df_python_packages = self.produce_python_builtin_packages()
         df_int_packages = self.produce_internal_packages()
@@ -51,58 +134,40 @@ class PackageDependencyStatsDataframe(DataframeObjectABC):
         return df_pack_deps
 
     def produce_external_packages(self):
-        external_modules = self._imports_df[self._imports_df['is_external']]
-        return _produce_unique_and_nunique_from_df(external_modules,
-                                                   new_column_name='external_package',
-                                                   groupby_column='package',
-                                                   agg_column='import_package')
+        return self._unique_and_nunique('external_package')
 
     def produce_python_builtin_packages(self):
-        python_builtin_modules = self._imports_df[self._imports_df['is_builtin']]
-        return _produce_unique_and_nunique_from_df(python_builtin_modules,
-                                                   new_column_name='builtin_package',
-                                                   groupby_column='package',
-                                                   agg_column='import_package')
+        return self._unique_and_nunique('builtin_package')
 
     def produce_internal_packages(self):
-        internal_modules = self._imports_df[self._imports_df['is_internal']]
-        return _produce_unique_and_nunique_from_df(internal_modules,
-                                                   new_column_name='internal_package',
-                                                   groupby_column='package',
-                                                   agg_column='import_package')
+        return self._unique_and_nunique('internal_package')
 
     def produce_cyclic_imports(self):
-        cyclic_imports = self._imports_df[self._imports_df['package'] == self._imports_df['import_package']]
+        imports_df = self.imports_df()
+        cyclic_imports = imports_df[imports_df['package'] == imports_df['import_package']]
         cyclic_imports_agg = cyclic_imports.groupby('package').agg({'import_package': 'count'})
         cyclic_imports_agg = cyclic_imports_agg.rename(columns={'import_package': 'imports_itself'})[['imports_itself']]
         return cyclic_imports_agg
 
     def produce_internal_modules(self):
-        internal_modules = self._imports_df[self._imports_df['is_internal']]
-        return _produce_unique_and_nunique_from_df(internal_modules,
-                                                   new_column_name='internal_module',
-                                                   groupby_column='package',
-                                                   agg_column='import_module')
+        return self._unique_and_nunique('internal_module')
 
     def produce_imported_from_packages(self):
-        internal_modules = self._imports_df[self._imports_df['is_internal']]
-        res = _produce_unique_and_nunique_from_df(internal_modules,
-                                                  new_column_name='imports',
-                                                  groupby_column='import_package',
-                                                  agg_column='package').reset_index()
-        res.columns = ['package', 'imported_from_packages', 'times_been_imported_from_packages']
-        res = res.set_index('package')
-        return res
+        return self._imported_from('imported_from_package', 'package')
 
 
-class ModuleDependencyStatsDataframe(DataframeObjectABC):
-    def __init__(self):
-        super().__init__(read_csv_kwargs={'index_col': None, 'header': 0}, to_csv_kwargs={'index': False})
-        df = ImportsEnrichedDataframe().data()
-        df_filtered = df[~df['unused_module']]
-        self._imports_df = df_filtered
+class ModuleDependencyStatsDataframe(DependencyStatsDataframeABC):
+    unique_stats = [
+        UniqueStat('external_package', 'module', 'import_package', 'is_external'),
+        UniqueStat('builtin_package', 'module', 'import_package', 'is_builtin'),
+        UniqueStat('internal_package', 'module', 'import_package', 'is_internal'),
+        UniqueStat('internal_module', 'module', 'import_module', 'is_internal'),
+        UniqueStat('imported_from_package', 'import_module', 'package', 'is_internal'),
+        UniqueStat('imported_from_module', 'import_module', 'module', 'is_internal'),
+    ]
 
     def build(self):
+        self._build_stats_engine()
         df_ext_packages = self.produce_external_packages()
         df_python_packages = self.produce_python_builtin_packages()
         df_int_packages = self.produce_internal_packages()
@@ -115,52 +180,22 @@ class ModuleDependencyStatsDataframe(DataframeObjectABC):
         return df_mod_deps
 
     def produce_external_packages(self):
-        external_modules = self._imports_df[self._imports_df['is_external']]
-        return _produce_unique_and_nunique_from_df(external_modules,
-                                                   new_column_name='external_package',
-                                                   groupby_column='module',
-                                                   agg_column='import_package')
+        return self._unique_and_nunique('external_package')
 
     def produce_python_builtin_packages(self):
-        python_builtin_modules = self._imports_df[self._imports_df['is_builtin']]
-        return _produce_unique_and_nunique_from_df(python_builtin_modules,
-                                                   new_column_name='builtin_package',
-                                                   groupby_column='module',
-                                                   agg_column='import_package')
+        return self._unique_and_nunique('builtin_package')
 
     def produce_internal_packages(self):
-        internal_modules = self._imports_df[self._imports_df['is_internal']]
-        return _produce_unique_and_nunique_from_df(internal_modules,
-                                                   new_column_name='internal_package',
-                                                   groupby_column='module',
-                                                   agg_column='import_package')
+        return self._unique_and_nunique('internal_package')
 
     def produce_internal_modules(self):
-        internal_modules = self._imports_df[self._imports_df['is_internal']]
-        return _produce_unique_and_nunique_from_df(internal_modules,
-                                                   new_column_name='internal_module',
-                                                   groupby_column='module',
-                                                   agg_column='import_module')
+        return self._unique_and_nunique('internal_module')
 
     def produce_imported_from_packages(self):
-        internal_modules = self._imports_df[self._imports_df['is_internal']]
-        res = _produce_unique_and_nunique_from_df(internal_modules,
-                                                  new_column_name='imports',
-                                                  groupby_column='import_module',
-                                                  agg_column='package').reset_index()
-        res.columns = ['module', 'imported_from_packages', 'times_been_imported_from_packages']
-        res = res.set_index('module')
-        return res
+        return self._imported_from('imported_from_package', 'module')
 
     def produce_imported_from_modules(self):
-        internal_modules = self._imports_df[self._imports_df['is_internal']]
-        res = _produce_unique_and_nunique_from_df(internal_modules,
-                                                  new_column_name='imports',
-                                                  groupby_column='import_module',
-                                                  agg_column='module').reset_index()
-        res.columns = ['module', 'imported_from_modules', 'times_been_imported_from_modules']
-        res = res.set_index('module')
-        return res
+        return self._imported_from('imported_from_module', 'module')
 
 
 if __name__ == '__main__':
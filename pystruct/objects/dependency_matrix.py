@@ -0,0 +1,64 @@
+import abc
+
+from pystruct.html_utils.html_pages import ImageHTML, TabsHTML
+from pystruct.objects.data_objects import DataframeObjectABC, HTMLObjectABC
+from pystruct.objects.dependencies import PackageAndModulesMapping
+from pystruct.objects.imports_data_objects import ImportsEnrichedDataframe
+from pystruct.reports.dsm import DependencyStructureMatrix
+
+
+class DependencyStructureMatrixDataframeABC(DataframeObjectABC, abc.ABC):
+    """
+    The non-zero entries of the dependency structure matrix (DSM) of the in-project imports at a level
+    (module or package): the positions of the importing and of the imported node in the matrix order, their
+    names, and the number of imports between them. See DependencyStructureMatrix.
+    """
+    level = None
+
+    def import_counts(self):
+        df = ImportsEnrichedDataframe().data()
+        df = df[df['is_internal']][[self.level, f'import_{self.level}']].dropna()
+        return df.groupby([self.level, f'import_{self.level}'], sort=False).size().reset_index(name='number_of_imports')
+
+    def groups(self):
+        return None
+
+    def build(self):
+        return DependencyStructureMatrix.from_dependencies(self.import_counts(), self.groups()).to_dataframe(self.level)
+
+    def matrix(self):
+        return DependencyStructureMatrix.from_dataframe(self.data(), self.level, self.groups())
+
+
+class ModuleDependencyStructureMatrixDataframe(DependencyStructureMatrixDataframeABC):
+    level = 'module'
+
+    def groups(self):
+        # the modules are clustered by package
+        return PackageAndModulesMapping().data().drop_duplicates('module').set_index('module')['package']
+
+
+class PackageDependencyStructureMatrixDataframe(DependencyStructureMatrixDataframeABC):
+    level = 'package'
+
+
+class DependencyStructureMatrixHTMLObj(HTMLObjectABC):
+    content_dict = {
+        'Modules': ModuleDependencyStructureMatrixDataframe,
+        'Packages': PackageDependencyStructureMatrixDataframe,
+    }
+
+    def build(self):
+        html_builder = TabsHTML()
+        for title, obj_class in self.content_dict.items():
+            matrix = obj_class().matrix()
+            if matrix.size == 0:
+                html_builder.add_tab(title, "No in-project imports.")
+                continue
+            html_builder.add_tab(title, ImageHTML(matrix.heatmap_png(title=f"{title}: {matrix.size}")).html())
+
+        return html_builder.html()
+
+
+if __name__ == '__main__':
+    DependencyStructureMatrixHTMLObj().data()
@@ -1,4 +1,5 @@
 from pystruct.html_utils.html_pages import TabsHTML
+from pystruct.html_utils.lazy_report import LazyTabsReportMixin
 from pystruct.objects.data_objects import HTMLObjectABC
 from pystruct.objects.imports_data_objects import ImportsStatsHTML
 from pystruct.objects.metric_tables import AllMetricsTable, AllMetricsStatsHTML
@@ -6,7 +7,7 @@ from pystruct.objects.uml_graph_obj import UMLClassGraphHTMLObj, UMLClassRelatio
     DependencyReportObj
 
 
-class FullReport(HTMLObjectABC):
+class FullReport(LazyTabsReportMixin, HTMLObjectABC):
     content_dict = {
         "General info": AllMetricsStatsHTML,
         "UML Class diagram": UMLClassGraphHTMLObj,
@@ -0,0 +1,168 @@
+"""
+Strongly connected components (SCCs) of the in-project import graph, at module and at package level. The
+modules (or packages) of an SCC import each other, directly or not, so every SCC of more than one node, or
+of a node that imports itself, is an import cycle. The SCCs are numbered in topological order, so the
+imports of an SCC go to the SCC itself or to later ones.
+"""
+import abc
+
+import numpy as np
+import pandas as pd
+
+from pystruct.objects.data_objects import DataframeObjectABC
+from pystruct.objects.dependencies import PackageAndModulesMapping
+from pystruct.objects.imports_data_objects import InProjectImportModuleGraphDataframe
+from pystruct.utils.graph_structures import Graph, ReachabilityIndex
+
+
+# the import graph and its SCCs of every components object, by the path of the object's file (which is
+# in the directory of the dataset), see `ImportGraphComponentsDataframeABC.graph_and_components`
+_graphs_and_components = {}
+# the reachability index of every dataset, by the path of the reachability object's file
+_reachability_indexes = {}
+
+
+def _cycle_to_string(cycle):
+    return ' -> '.join(cycle)
+
+
+class ImportGraphComponentsDataframeABC(DataframeObjectABC, abc.ABC):
+    """
+    One row per node of the import graph, with its SCC ('scc') and the number of nodes of the SCC ('scc_size').
+    """
+    level = None
+
+    @abc.abstractmethod
+    def import_graph_edges(self):
+        """
+        :return: pandas.DataFrame with the importing and the imported nodes of the level in two columns
+        """
+        pass
+
+    def import_graph(self):
+        edges_df = self.import_graph_edges().dropna()
+        return Graph(list(zip(edges_df.iloc[:, 0].tolist(), edges_df.iloc[:, 1].tolist())))
+
+    def graph_and_components(self):
+        """
+        :return: (the import graph, the SCC of every node id), computed once per dataset
+        """
+        key = self._file_adapter.filepath
+        if key not in _graphs_and_components:
+            graph = self.import_graph()
+            _graphs_and_components[key] = graph, graph.strongly_connected_components()
+        return _graphs_and_components[key]
+
+    def delete(self):
+        _graphs_and_components.pop(self._file_adapter.filepath, None)
+        super().delete()
+
+    def build(self):
+        graph, labels = self.graph_and_components()
+        df = pd.DataFrame({
+            self.level: [graph.node(node_id) for node_id in range(graph.size())],
+            'scc': labels,
+            'scc_size': np.bincount(labels)[labels] if len(labels) else labels,
+        })
+        return df.sort_values(['scc', self.level]).reset_index(drop=True)
+
+    def cycles(self):
+        """
+        :return: pandas.DataFrame with one row per import cycle (SCC), with its nodes and the shortest cycle
+        through its first node
+        """
+        graph, labels = self.graph_and_components()
+        components, first_node_ids, sizes = np.unique(labels, return_index=True, return_counts=True)
+        cycles = {component: graph.shortest_cycle(labels, first_node_id)
+                  for component, first_node_id in zip(components.tolist(), first_node_ids.tolist())}
+        cycles = {component: cycle for component, cycle in cycles.items() if cycle is not None}
+
+        nodes_df = pd.DataFrame({'node': [graph.node(node_id) for node_id in range(graph.size())], 'scc': labels})
+        nodes_df = nodes_df[nodes_df['scc'].isin(list(cycles))].sort_values(['scc', 'node'])
+        members = nodes_df.groupby('scc')['node'].agg(','.join)
+
+        rows = [(self.level, component, sizes[component], members[component], _cycle_to_string(cycle))
+                for component, cycle in cycles.items()]
+        return pd.DataFrame(rows, columns=['level', 'scc', 'scc_size', 'members', 'cycle'])
+
+    def condensation(self):
+        """
+        :return: pandas.DataFrame with the imports between the SCCs, and the number of imports of the import
+        graph between them
+        """
+        graph, labels = self.graph_and_components()
+        sources, targets, counts = graph.condensation_edges(labels)
+        return pd.DataFrame({
+            'level': self.level,
+            'scc': sources,
+            'import_scc': targets,
+            'number_of_imports': counts,
+        })
+
+
+class ModuleImportComponentsDataframe(ImportGraphComponentsDataframeABC):
+    level = 'module'
+
+    def import_graph_edges(self):
+        return InProjectImportModuleGraphDataframe().data()[['module', 'import_module']]
+
+
+class PackageImportComponentsDataframe(ImportGraphComponentsDataframeABC):
+    level = 'package'
+
+    def import_graph_edges(self):
+        module_packages = PackageAndModulesMapping().data().drop_duplicates('module').set_index('module')['package']
+        df = InProjectImportModuleGraphDataframe().data()
+        df = pd.DataFrame({
+            'package': df['module'].map(module_packages),
+            'import_package': df['import_module'].map(module_packages),
+        })
+        # imports between the modules of a package are not package cycles
+        return df[df['package'] != df['import_package']].drop_duplicates()
+
+
+class ImportCyclesDataframe(DataframeObjectABC):
+    """
+    Every import cycle of the project, at module and at package level.
+    """
+    def build(self):
+        return pd.concat([ModuleImportComponentsDataframe().cycles(), PackageImportComponentsDataframe().cycles()],
+                         ignore_index=True)
+
+
+class ImportCondensationGraphDataframe(DataframeObjectABC):
+    """
+    The directed acyclic graph of the imports between the SCCs, at module and at package level.
+    """
+    def build(self):
+        return pd.concat([ModuleImportComponentsDataframe().condensation(),
+                          PackageImportComponentsDataframe().condensation()], ignore_index=True)
+
+
+class ModuleReachabilityDataframe(DataframeObjectABC):
+    """
+    Reachability index of the module import graph: one row per SCC of modules, with the compressed bitsets
+    of the SCCs its modules depend on and of the SCCs that depend on them. See ReachabilityIndex.
+    """
+    def build(self):
+        graph, labels = ModuleImportComponentsDataframe().graph_and_components()
+        return ReachabilityIndex.from_graph(graph, labels).to_dataframe('module')
+
+    def index(self):
+        """
+        :return: the ReachabilityIndex, loaded once per dataset, so that a query is a lookup
+        """
+        key = self._file_adapter.filepath
+        if key not in _reachability_indexes:
+            _reachability_indexes[key] = ReachabilityIndex.from_dataframe(self.data(), 'module')
+        return _reachability_indexes[key]
+
+    def delete(self):
+        _reachability_indexes.pop(self._file_adapter.filepath, None)
+        super().delete()
+
+
+if __name__ == '__main__':
+    ImportCyclesDataframe().data()
+    ImportCondensationGraphDataframe().data()
+    ModuleReachabilityDataframe().data()
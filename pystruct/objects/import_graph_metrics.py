@@ -0,0 +1,69 @@
+import abc
+
+import numpy as np
+import pandas as pd
+
+from pystruct.metrics.graph_metrics import graph_metrics, GRAPH_METRICS
+from pystruct.metrics.metrics_core import NodeFeaturesDataframe
+from pystruct.objects.data_objects import DataframeObjectABC
+from pystruct.objects.import_cycles import ModuleImportComponentsDataframe, PackageImportComponentsDataframe
+
+
+class ImportGraphMetricsDataframeABC(DataframeObjectABC, abc.ABC):
+    """
+    Centrality metrics of the nodes of the in-project import graph at a level (module or package), see
+    pystruct.metrics.graph_metrics. The nodes of the graph are matched once, by name, to the nodes of the
+    tree of their type, and the metrics are stored by node id, as the metrics of pystruct.metrics.metrics_core.
+    """
+    components_class = None
+    node_type = None  # type of the nodes of the tree the level corresponds to
+
+    def node_ids(self, names):
+        """
+        :return: numpy array with the node id of the node of `node_type` of every name, -1 if there is none
+        """
+        features_df = NodeFeaturesDataframe().data()
+        nodes_df = features_df[features_df['type'] == self.node_type]
+        nodes_df = nodes_df.drop_duplicates('item')
+        node_ids = pd.Index(nodes_df['item'].values).get_indexer(names)
+        return np.where(node_ids >= 0, nodes_df.index.values[node_ids], -1)
+
+    def build(self):
+        graph, _ = self.components_class().graph_and_components()
+        df = graph_metrics(graph, self.components_class.level)
+        df.insert(0, 'node_id', self.node_ids(df[self.components_class.level].values))
+        return df[df['node_id'] >= 0].reset_index(drop=True)
+
+    def named_data(self):
+        """
+        :return: the metrics with the names of the nodes ('item') and their type, as in the metrics tables
+        """
+        df = self.data().drop(columns='node_id').rename(columns={self.components_class.level: 'item'})
+        df.insert(1, 'type', self.node_type)
+        return df
+
+
+class ModuleImportGraphMetricsDataframe(ImportGraphMetricsDataframeABC):
+    components_class = ModuleImportComponentsDataframe
+    node_type = 'module'
+
+
+class PackageImportGraphMetricsDataframe(ImportGraphMetricsDataframeABC):
+    components_class = PackageImportComponentsDataframe
+    node_type = 'directory'
+
+
+def join_import_graph_metrics(metrics_df):
+    """
+    :param metrics_df: pandas.DataFrame indexed by node id, as the result of metrics_dataframe
+    :return: metrics_df with the GRAPH_METRICS of its modules and packages (empty for the other nodes)
+    """
+    graph_metrics_df = pd.concat([ModuleImportGraphMetricsDataframe().data(),
+                                  PackageImportGraphMetricsDataframe().data()], ignore_index=True)
+    graph_metrics_df = graph_metrics_df.set_index('node_id')[GRAPH_METRICS]
+    return pd.concat([metrics_df, graph_metrics_df.reindex(metrics_df.index)], axis=1)
+
+
+if __name__ == '__main__':
+    ModuleImportGraphMetricsDataframe().data()
+    PackageImportGraphMetricsDataframe().data()
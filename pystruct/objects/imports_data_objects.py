@@ -4,16 +4,16 @@ from pystruct.html_utils.html_pages import HTMLPage, TabsHTML
 from pystruct.metrics.import_metrics import enrich_import_raw_df
 from pystruct.objects.data_objects import DataframeObjectABC, HTMLTableObjectABC, HTMLObjectABC
 from pystruct.objects.metric_obj import IsScriptFile
-from pystruct.objects.python_object import PObject
+from pystruct.objects.python_object import TreeVisitorObjectMixin
 from pystruct.reports.import_graph import CollectImportsVisitor
 
 
-class ImportsRawDataframe(DataframeObjectABC):
-    def build(self):
-        pobj = PObject().python_source_object()
-        imports_col = CollectImportsVisitor()
-        pobj.use_visitor(imports_col)
-        return imports_col.result()
+class ImportsRawDataframe(TreeVisitorObjectMixin, DataframeObjectABC):
+    def tree_visitor(self):
+        return CollectImportsVisitor()
+
+    def result_from_visitor(self, visitor):
+        return visitor.result()
 
 
 class ImportsEnrichedDataframe(DataframeObjectABC):
@@ -21,7 +21,7 @@ class ImportsEnrichedDataframe(DataframeObjectABC):
         df = ImportsRawDataframe().data()
 
         df_enriched = enrich_import_raw_df(df)
-        df_enriched = df_enriched.merge(IsScriptFile().data(),
+        df_enriched = df_enriched.merge(IsScriptFile().named_data(),
                                         left_on='module',
                                         right_on='item',
                                         how='left').drop(columns=['item'])
@@ -1,12 +1,11 @@
-import ast
-
 import matplotlib.pyplot as plt
 
 from pystruct.utils.plots import plot_hist_and_quartiles
 
 plt.style.use('bmh')
 
-from pystruct.metrics.metrics_core import MetricObject
+from pystruct.metrics.metrics_core import MetricObject, metrics_dataframe
+from pystruct.metrics.node_features import CODE_TYPES, FUNCTION_TYPES
 from pystruct.objects.data_objects import DataframeObjectABC, HTMLTableObjectABC
 from pystruct.objects.metric_stats import ValueCountMetricObj, MatplotlibGraphMetricObj
 
@@ -14,8 +13,8 @@ from pystruct.objects.metric_stats import ValueCountMetricObj, MatplotlibGraphMe
 class TypeMetricObj(MetricObject):
     metric_name = 'type'
 
-    def calculate(self, p_obj, **kwargs):
-        return p_obj.type
+    def calculate(self, features_df):
+        return features_df['type']
 
 
 class TypeMetricValueCountsTable(ValueCountMetricObj):
@@ -26,33 +25,19 @@ class TypeMetricValueCountsTable(ValueCountMetricObj):
 
 class NumberOfCodeLinesMetricObj(MetricObject):
     metric_name = 'number_of_lines'
+    node_types = CODE_TYPES
 
-    def _calc(self, p_obj):
-        return len(p_obj.code_lines)
-
-    def calculate_module(self, module_obj, **kwargs):
-        return self._calc(module_obj)
-
-    def calculate_class(self, class_obj, **kwargs):
-        return self._calc(class_obj)
-
-    def calculate_function(self, function_obj, **kwargs):
-        return self._calc(function_obj)
-
-    def calculate_class_method(self, function_obj, **kwargs):
-        return self._calc(function_obj)
+    def calculate(self, features_df):
+        return features_df['number_of_lines'].astype(int)
 
 
 class GeneralItemMetricObj(DataframeObjectABC):
     def build(self):
-        df_lines = NumberOfCodeLinesMetricObj().data()
-        df_types = TypeMetricObj().data()
-
-        df = df_types.merge(df_lines, on='item', how='left')
+        df = metrics_dataframe([TypeMetricObj, NumberOfCodeLinesMetricObj]).rename_axis('node_id').reset_index()
         df_agg_stats = df.groupby(TypeMetricObj.metric_name).agg({
-            'item': 'count',
+            'node_id': 'count',
             NumberOfCodeLinesMetricObj.metric_name: ['sum', 'min', 'mean', 'max']
-        }).sort_values(by=[('item', 'count')]).reset_index()
+        }).sort_values(by=[('node_id', 'count')]).reset_index()
 
         df_agg_stats.columns = df_agg_stats.columns.droplevel(0)
 
@@ -79,9 +64,7 @@ class GeneralItemMetricHTMLTable(HTMLTableObjectABC):
 
 class NumberOfCodeLinesHistogram(MatplotlibGraphMetricObj):
     def build_plot(self):
-        df_lines = NumberOfCodeLinesMetricObj().data()
-        df_types = TypeMetricObj().data()
-        df = df_types.merge(df_lines, on='item', how='left')
+        df = metrics_dataframe([TypeMetricObj, NumberOfCodeLinesMetricObj])
 
         plt.figure(figsize=(12, 5))
 
@@ -97,29 +80,18 @@ class NumberOfCodeLinesHistogram(MatplotlibGraphMetricObj):
 
 class NumberOfArgsInFunctionsMetricObj(MetricObject):
     metric_name = 'number_of_args_in_functions'
+    node_types = FUNCTION_TYPES
 
-    @staticmethod
-    def _fetch_args(p_obj):
-        args = [_ast.arg for _ast in p_obj.ast if isinstance(_ast, ast.arg)]
-        return args
-
-    def calculate_function(self, function_obj, **kwargs):
-        args = self._fetch_args(function_obj)
-        return len(args)
-
-    def calculate_class_method(self, class_method_obj, **kwargs):
-        args = set(self._fetch_args(class_method_obj))
-        args.discard('self')
-        args.discard('args')
-        args.discard('kwargs')
-        return len(args)
+    def calculate(self, features_df):
+        # all the arguments of the functions, the distinct ones except for self, args and kwargs of the class methods
+        args = features_df['number_of_args'].where(features_df['type'] == 'function',
+                                                   features_df['number_of_distinct_args'])
+        return args.astype(int)
 
 
 class FunctionArgsHistogram(MatplotlibGraphMetricObj):
     def build_plot(self):
-        df_args = NumberOfArgsInFunctionsMetricObj().data()
-        df_types = TypeMetricObj().data()
-        df = df_types.merge(df_args, on='item', how='left')
+        df = metrics_dataframe([TypeMetricObj, NumberOfArgsInFunctionsMetricObj])
 
         plt.figure(figsize=(8, 5))
 
@@ -135,9 +107,9 @@ class FunctionArgsHistogram(MatplotlibGraphMetricObj):
 
 class IsScriptFile(MetricObject):
     metric_name = 'is_script_file'
+    node_types = ['module']
 
-    def calculate_module(self, module_obj, **kwargs):
-        all_code = module_obj.code.replace('\n', '').replace(' ', '').replace('"', "'")
-        return "if__name__=='__main__':" in all_code
+    def calculate(self, features_df):
+        return features_df['has_main_guard'].astype(bool)
 
 
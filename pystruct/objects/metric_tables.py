@@ -7,17 +7,15 @@ plt.style.use('bmh')
 
 from pystruct.html_utils.html_pages import HTMLPage
 from pystruct.metrics.metric_sets import ALL_METRICS
+from pystruct.metrics.metrics_core import metrics_dataframe
 from pystruct.objects.data_objects import HTMLTableObjectABC, DataframeObjectABC, HTMLObjectABC
+from pystruct.objects.import_graph_metrics import join_import_graph_metrics
 
 
 class AllMetricsDataframe(DataframeObjectABC):
     def build(self):
-        df = ALL_METRICS[0]().data()
-
-        for metric_obj in ALL_METRICS[1:]:
-            df = df.merge(metric_obj().data(), on='item', how='left')
-
-        return df
+        metrics_df = metrics_dataframe(ALL_METRICS, with_items=True)
+        return join_import_graph_metrics(metrics_df).reset_index(drop=True)
 
 
 class AllMetricsTable(HTMLTableObjectABC):
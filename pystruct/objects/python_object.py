@@ -1,9 +1,19 @@
+import abc
+import inspect
+
 from pystruct.objects.data_objects import JSONObjectABC
 from pystruct.plat.dataset_controller import DatasetController
+from pystruct.python.module_manifest import ModuleManifest
 from pystruct.python.python_source_obj import PythonSourceObj
+from pystruct.utils.logs import log_general, log_yellow
+from pystruct.utils.python_utils import subclasses_of_class
+from pystruct.visitors.visitor import AbstractVisitor
 
 
 class PObject(JSONObjectABC):
+    # number of processes used to build the python source object, see `PythonSourceObj.from_project_source`
+    jobs = 1
+
     def __init__(self):
         super().__init__()
         self._pobj = None
@@ -11,16 +21,91 @@ class PObject(JSONObjectABC):
     def build(self):
         # srcs = os.listdir(PATH_CODE_COPY_DIR)
         # src_path = os.path.join(PATH_CODE_COPY_DIR, srcs[0])
-        code_dir = DatasetController.get_instance().current_dataset.code_directory
-        self._pobj = PythonSourceObj.from_project_source(code_dir)
+        dataset = DatasetController.get_instance().current_dataset
+        manifest = ModuleManifest.load(dataset.modules_manifest_filepath)
+        self._pobj = PythonSourceObj.from_project_source(dataset.code_directory, jobs=self.jobs, manifest=manifest)
+        manifest.save(dataset.modules_manifest_filepath)
         return self._pobj.to_dict()
 
     def python_source_object(self):
         if not self._pobj:
-            self._pobj = PythonSourceObj.from_dict(self.data())
+            self._pobj = PythonSourceObj.from_dict(self.data(), lazy=True)
         return self._pobj
 
 
+class SharedTraversalVisitor(AbstractVisitor):
+    """
+    Wraps the visitor of an object that is built along with another object. If the visitor (or the
+    object's result) fails, the error is logged and the visitor stops, so that it doesn't fail the other
+    object. The object is then built on its own when requested.
+    """
+    def __init__(self, obj):
+        self.obj = obj
+        self.visitor = obj.tree_visitor()
+        self.visits_below_modules = self.visitor.visits_below_modules
+        self.failed = False
+
+    def _run(self, func, *args):
+        if self.failed:
+            return
+        try:
+            func(*args)
+        except Exception as e:
+            log_yellow(f"{type(self.visitor).__name__} failed in the shared traversal of the tree: {e!r}")
+            self.failed = True
+
+    def visit(self, node):
+        self._run(self.visitor.visit, node)
+
+    def done(self):
+        self._run(self.visitor.done)
+
+    def set_object_data(self):
+        self._run(lambda: self.obj.set_data(self.obj.result_from_visitor(self.visitor)))
+
+
+class TreeVisitorObjectMixin(abc.ABC):
+    """
+    Mixin for objects built by a single visitor of the python source object. The objects of the same
+    `tree_traversal_group` are built together: when one of them is built, the others of its group that are
+    not built yet, and whose visitors visit the tree to the same depth, are built along with it in the same
+    traversal of the tree. Objects without a group are built on their own.
+
+    To use it, implement `tree_visitor` to return the visitor of the object, and `result_from_visitor` to
+    return the data of the object from the visitor once the traversal is done.
+    """
+    tree_traversal_group = None
+
+    @abc.abstractmethod
+    def tree_visitor(self):
+        pass
+
+    @abc.abstractmethod
+    def result_from_visitor(self, visitor):
+        pass
+
+    def _visitors_sharing_tree_traversal(self, visitor):
+        if self.tree_traversal_group is None:
+            return []
+        classes = sorted(subclasses_of_class(TreeVisitorObjectMixin), key=lambda cls: cls.__name__)
+        objs = [cls() for cls in classes if cls is not type(self) and not inspect.isabstract(cls)
+                and cls.tree_traversal_group == self.tree_traversal_group]
+        shared_visitors = [SharedTraversalVisitor(obj) for obj in objs if not obj.is_available()]
+        # a visitor that visits below the modules would expand the lazy modules for the others
+        return [shared_visitor for shared_visitor in shared_visitors
+                if shared_visitor.visits_below_modules == visitor.visits_below_modules]
+
+    def build(self):
+        visitor = self.tree_visitor()
+        shared_visitors = self._visitors_sharing_tree_traversal(visitor)
+        log_general(f"{self.name()}: building {len(shared_visitors)+1} objects in a single traversal of the tree.")
+        PObject().python_source_object().use_visitors([visitor]+shared_visitors)
+
+        for shared_visitor in shared_visitors:
+            shared_visitor.set_object_data()
+        return self.result_from_visitor(visitor)
+
+
 if __name__ == '__main__':
     # PObject().data()
     PObject().python_source_object()
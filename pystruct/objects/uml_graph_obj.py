@@ -5,16 +5,20 @@ import pandas as pd
 
 from pystruct.objects.data_objects import PlantUMLDocumentObjABC
 from pystruct.html_utils.html_pages import HTMLPage, TabsHTML
+from pystruct.html_utils.lazy_report import LazyTabsReportMixin
 from pystruct.metrics.import_metrics import breakdown_import_path
 from pystruct.objects.data_objects import AbstractObject, HTMLObjectABC, DataframeObjectABC
+from pystruct.objects.dependency_matrix import DependencyStructureMatrixHTMLObj
 from pystruct.objects.dependencies import PackageDependencyStatsDataframe, ModuleDependencyStatsDataframe, \
     PackageAndModulesMapping
 from pystruct.objects.imports_data_objects import PackagesImportModuleGraphDataframe, ImportsEnrichedDataframe
-from pystruct.objects.python_object import PObject
+from pystruct.objects.python_object import TreeVisitorObjectMixin
+from pystruct.reports.svg_graph import SVGGraph
 from pystruct.reports.uml_class import UMLClassBuilder, UMLClassRelationBuilder, ObjectRelationGraphBuilder, \
     PlantUMLPackagesAndModulesBuilder
 from pystruct.utils.color_utils import getDistinctColors
 from pystruct.utils.file_adapters import HTMLFile
+from pystruct.utils.graph_partition import partition_graph, MAX_PARTITION_NODES, MAX_PARTITION_EDGES
 from pystruct.utils.graph_structures import Graph
 from pystruct.utils.mixins import JSONableMixin
 from pystruct.utils.plantuml_utils import PlantUMLService
@@ -84,8 +88,7 @@ class PlantUMLGraphMultiTabHTMLPageObj(AbstractObject, abc.ABC):
         if isinstance(docs, list):
             docs = {f"document_{i}": doc for i, doc in enumerate(docs)}
 
-        plantuml_diagram_html_images = {title: self._plant_uml.convert_doc_to_html_image(doc)
-                                        for title, doc in docs.items()}
+        plantuml_diagram_html_images = dict(zip(docs, self._plant_uml.convert_multiple_docs_to_html_images(list(docs.values()))))
 
         html_page = TabsHTML()
         [html_page.add_tab(title, html_image) for title, html_image in plantuml_diagram_html_images.items()]
@@ -97,14 +100,14 @@ class PlantUMLGraphMultiTabHTMLPageObj(AbstractObject, abc.ABC):
         pass
 
 
-class UMLClassDocumentObj(PlantUMLDocumentObjABC):
-    def build(self):
-        pobj = PObject().python_source_object()
+class UMLClassDocumentObj(TreeVisitorObjectMixin, PlantUMLDocumentObjABC):
+    tree_traversal_group = 'uml_classes'
 
-        uml_builder = UMLClassBuilder()
-        pobj.use_visitor(uml_builder)
+    def tree_visitor(self):
+        return UMLClassBuilder()
 
-        plantuml_doc_strings = uml_builder.result()
+    def result_from_visitor(self, visitor):
+        plantuml_doc_strings = visitor.result()
 
         return plantuml_doc_strings
 
@@ -114,34 +117,25 @@ class UMLClassGraphHTMLObj(PlantUMLGraphMultiTabHTMLPageObj):
         return UMLClassDocumentObj().documents()
 
 
-class UMLClassRelationDocumentObj(PlantUMLDocumentObjABC):
-    def build(self):
-        pobj = PObject().python_source_object()
-
-        uml_builder = UMLClassRelationBuilder()
-        pobj.use_visitor(uml_builder)
+class UMLClassRelationDocumentObj(TreeVisitorObjectMixin, PlantUMLDocumentObjABC):
+    tree_traversal_group = 'uml_classes'
 
-        plantuml_doc_strings = uml_builder.result()
+    def tree_visitor(self):
+        return UMLClassRelationBuilder()
 
-        plantuml_doc_strings = UMLClassRelationDocumentObj.split_documents(plantuml_doc_strings)
+    def result_from_visitor(self, visitor):
+        plantuml_doc_strings = UMLClassRelationDocumentObj.split_documents(visitor.diagram())
         return plantuml_doc_strings
 
     @staticmethod
-    def split_documents(graph_doc):
-        graph_doc_lines = graph_doc.split('\n')
-        class_relations_lines = [line for line in graph_doc_lines if '<|--' in line]
-        class_relations = [line.split(' <|-- ') for line in class_relations_lines]
-
+    def split_documents(diagram):
+        """
+        :param diagram: PlantUMLDiagram of the classes and their inheritances
+        :return: list with a document per connected graph of classes
+        """
+        class_relations = [(edge.source, edge.target) for edge in diagram.edges()]
         subgraphs = [graph.nodes for graph in Graph(class_relations).subgraphs()]
-
-        subgraph_docs = []
-        for subgraph in subgraphs:
-            subgraph_lines = [line for line in graph_doc_lines if any([_class in line for _class in subgraph])]
-            subgraph_doc = '@startuml\nleft to right direction\n'+'\n'.join(subgraph_lines)+'\n@enduml'
-
-            subgraph_docs.append(subgraph_doc)
-
-        return subgraph_docs
+        return [subgraph_diagram.to_string() for subgraph_diagram in diagram.split(subgraphs)]
 
 
 class UMLClassRelationGraphHTMLObj(PlantUMLGraphSingleHTMLPageObj):
@@ -283,29 +277,93 @@ class PackageAndModuleRelationsGraphHTMLObj(PlantUMLGraphSingleHTMLPageObj):
 
 
 class ModuleRelationDocuemntObj(PlantUMLDocumentObjABC):
-    def build(self):
-        df = ImportsEnrichedDataframe().data()
-        self._df = df[df['is_internal']]
-        modules, import_modules = self._df['module'].tolist(), self._df['import_module'].tolist()
-        subgraphs = Graph(list(zip(modules, import_modules))).subgraphs()
-        docs = {f"Grpah {i+1} (size={subgraph.size()})": self.produce_doc_for_modules(subgraph.nodes)
-                for i, subgraph in enumerate(subgraphs)}
-        return docs
-
-    def produce_doc_for_modules(self, modules):
-        df = self._df[self._df['module'].isin(modules) | self._df['import_module'].isin(modules)]
-        plantuml_doc = PlantUMLPackagesAndModulesBuilder(direction='top to bottom direction', separator='set separator none')
+    # the graphs that are bigger are split in documents of at most these numbers of modules and imports
+    max_diagram_nodes = MAX_PARTITION_NODES
+    max_diagram_edges = MAX_PARTITION_EDGES
 
+    @staticmethod
+    def produce_data():
+        """
+        :return: (pandas.DataFrame with the in-project imports and the color of the package of the imported
+        module ('arrow_color'), dict with the color of every package)
+        """
+        df = ImportsEnrichedDataframe().data()
         package_colors = {k: v['color'] for k, v in PackageColorMappingDataframe().data().set_index('package').to_dict(orient='index').items()}
-        # package_colors = PackageColorMappingDataframe().to_json()
+        df = df[df['is_internal']].copy()
+        df['arrow_color'] = df['import_package'].map(package_colors)
+        return df, package_colors
 
-        df_mods = pd.DataFrame(df[['module', 'package']].values.tolist()+df[df['is_internal']][['import_module', 'import_package']].values.tolist(),
+    @staticmethod
+    def module_colors(df, package_colors):
+        """
+        :return: pandas.DataFrame with the modules of the imports of df, their package and its color
+        """
+        df_mods = pd.DataFrame(df[['module', 'package']].values.tolist()+df[['import_module', 'import_package']].values.tolist(),
                                columns=['module', 'package']).drop_duplicates()
         df_mods['color'] = df_mods['package'].map(package_colors)
-        for module, package, color in df_mods.values.tolist():
-            plantuml_doc.add_object('object', module, color)
+        return df_mods
+
+    @classmethod
+    def module_graph_parts(cls, df):
+        """
+        Splits the import graph of the modules of df in its connected graphs, and the graphs that are too big
+        in partitions.
+        :return: generator of (title, modules, stub modules, True if the stubs are grouped by package)
+        """
+        subgraphs = Graph(list(zip(df['module'].tolist(), df['import_module'].tolist()))).subgraphs()
+        for i, subgraph in enumerate(subgraphs):
+            partitions = partition_graph(subgraph, cls.max_diagram_nodes, cls.max_diagram_edges)
+            if len(partitions) == 1:
+                yield f"{i+1} (size={subgraph.size()})", subgraph.nodes, (), False
+                continue
+            for j, partition in enumerate(partitions):
+                # the modules imported by (or importing) too many modules have their stubs grouped by package
+                yield f"{i+1}.{j+1} (size={len(partition.nodes)}/{subgraph.size()})", partition.nodes, \
+                    partition.stub_nodes, len(partition.edges) > cls.max_diagram_edges
+
+    def build(self):
+        self._df, self._package_colors = self.produce_data()
+        return {f"Grpah {title}": self.produce_doc_for_modules(modules, stub_modules, stub_packages)
+                for title, modules, stub_modules, stub_packages in self.module_graph_parts(self._df)}
+
+    @staticmethod
+    def _stubs_to_packages(df, modules, stub_modules):
+        df = df.copy()
+        stubs = []
+        for module_column, package_column in (('module', 'package'), ('import_module', 'import_package')):
+            is_stub = df[module_column].isin(stub_modules) & ~df[package_column].isin(modules)
+            df.loc[is_stub, module_column] = df.loc[is_stub, package_column]
+            stubs.extend(df.loc[is_stub, module_column].tolist())
+        # the stub modules of the packages of the modules are kept
+        kept_stub_modules = stub_modules & (set(df['module']) | set(df['import_module']))
+        return df, set(stubs) | kept_stub_modules
+
+    @classmethod
+    def imports_of_modules(cls, df, modules, stub_modules=(), stub_packages=False):
+        """
+        :param stub_modules: the modules of other parts of the graph that are imported by or import the
+        modules, they are drawn as stubs
+        :param stub_packages: if True, the stubs are the packages of the stub modules
+        :return: (the imports of df from or to the modules, set of the stubs)
+        """
+        df = df[df['module'].isin(modules) | df['import_module'].isin(modules)]
+        if stub_packages:
+            return cls._stubs_to_packages(df, set(modules), set(stub_modules))
+        return df, set(stub_modules)
+
+    def produce_doc_for_modules(self, modules, stub_modules=(), stub_packages=False):
+        """
+        See imports_of_modules.
+        """
+        df, stub_modules = self.imports_of_modules(self._df, modules, stub_modules, stub_packages)
+        plantuml_doc = PlantUMLPackagesAndModulesBuilder(direction='top to bottom direction', separator='set separator none')
+
+        for module, package, color in self.module_colors(df, self._package_colors).values.tolist():
+            if module in stub_modules:
+                plantuml_doc.add_object('object', module, '<<stub>>', color)
+            else:
+                plantuml_doc.add_object('object', module, color)
 
-        df['arrow_color'] = df[df['is_internal']]['import_package'].map(package_colors)
         df = df[['module', 'import_module', 'arrow_color']].drop_duplicates()
         for module, import_module, arrow_color in df.values.tolist():
             plantuml_doc.add_relation(module, '<|-[thickness=2]-', import_module, arrow_color)
@@ -319,6 +377,52 @@ class ModuleRelationGraphObj(PlantUMLGraphMultiTabHTMLPageObj):
         return ModuleRelationDocuemntObj().documents()
 
 
+def _scrollable(svg):
+    return f'<div style="overflow:auto; max-height:90vh">{svg}</div>'
+
+
+class PackageAndModuleRelationsSVGGraphObj(HTMLObjectABC):
+    """
+    The graph of PackageAndModuleRelationsDocumentObj, drawn in-process (SVGGraph) instead of by PlantUML.
+    """
+    def build(self):
+        df_pkgs, df_rels = PackageAndModuleRelationsDocumentObj().produce_data()
+
+        module_packages, package_colors = {}, {}
+        for package, color, modules in df_pkgs.values.tolist():
+            package_colors[package] = color
+            module_packages.update({module: package for module in modules})
+
+        df_filtered = df_rels[~df_rels['import_module'].isna()][['module', 'import_module', 'very_strong']].drop_duplicates()
+        edge_colors = {(module, import_module): arrow_color
+                       for module, import_module, arrow_color in df_filtered.values.tolist()}
+
+        svg_graph = SVGGraph(list(edge_colors), edge_colors=edge_colors, group_of=module_packages,
+                             group_colors=package_colors, nodes=list(module_packages))
+        return _scrollable(svg_graph.svg())
+
+
+class ModuleRelationSVGGraphObj(HTMLObjectABC):
+    """
+    The graphs of ModuleRelationDocuemntObj, drawn in-process (SVGGraph) instead of by PlantUML: one tab per
+    connected graph of modules, or per partition of the graphs that are too big, as the documents.
+    """
+    def build(self):
+        df, package_colors = ModuleRelationDocuemntObj.produce_data()
+
+        html_builder = TabsHTML()
+        for title, modules, stub_modules, stub_packages in ModuleRelationDocuemntObj.module_graph_parts(df):
+            df_part, stubs = ModuleRelationDocuemntObj.imports_of_modules(df, modules, stub_modules, stub_packages)
+            df_mods = ModuleRelationDocuemntObj.module_colors(df_part, package_colors)
+            module_colors = dict(zip(df_mods['module'].tolist(), df_mods['color'].tolist()))
+            df_edges = df_part[['module', 'import_module', 'arrow_color']].drop_duplicates()
+            edge_colors = {(module, import_module): arrow_color for module, import_module, arrow_color in df_edges.values.tolist()}
+
+            svg_graph = SVGGraph(list(edge_colors), node_colors=module_colors, edge_colors=edge_colors, stub_nodes=stubs)
+            html_builder.add_tab(f"Graph {title}", _scrollable(svg_graph.svg()))
+        return html_builder.html()
+
+
 class PackagesImportModuleDocumentObj(PlantUMLDocumentObjABC):
     def build(self):
         df = PackagesImportModuleGraphDataframe().data()
@@ -355,13 +459,14 @@ Total number of packages=**{total_n_packages}**, total number of modules=**{tota
         return markdown_to_html+PackageDependencyStatsDataframe().data().to_html()+"<br>"+ModuleDependencyStatsDataframe().data().to_html()
 
 
-class DependencyReportObj(HTMLObjectABC):
+class DependencyReportObj(LazyTabsReportMixin, HTMLObjectABC):
     content_dict = {
         'Analysis': DependencyAnalysisObj,
         "Package Relations": PackageRelationsGraphHTMLObj,
-        "Package-Module Relations": PackageAndModuleRelationsGraphHTMLObj,
-        "Module relations": ModuleRelationGraphObj,
+        "Package-Module Relations": PackageAndModuleRelationsSVGGraphObj,
+        "Module relations": ModuleRelationSVGGraphObj,
         "External package dependencies": PackagesImportModuleGraphHTMLObj,
+        "Dependency matrix": DependencyStructureMatrixHTMLObj,
     }
 
     def build(self):
@@ -1,9 +1,13 @@
 import abc
+import ast
 # TODO project object can be a tree node subclass called head (no parent)
 # TODO check if tree node get item can be chained example node['pystruct']['utils']['ast_utils]['analyse_ast']
-# TODO Init visitor can take argument ex. "functions" and expand only until functions (instead to all the way down to identifiers)
+from array import array
+from collections import deque
 from functools import cached_property
+import weakref
 
+from pystruct.python.source_span import SourceBuffer, SourceSpan
 from pystruct.utils.ast_utils import analyse_ast, remove_first_n_characters
 from pystruct.visitors.visitor import VisitedMixin
 
@@ -16,7 +20,12 @@ class NodeBranchesAlreadySet(ValueError):
     pass
 
 
+_TYPES = ['directory', 'module', 'class', 'function', 'class_method']
+
+
 class Node(VisitedMixin):
+    __slots__ = ('__data', '__depth')
+
     def __init__(self, data, depth=-1):
         self.__data = data
         self.__depth = depth
@@ -36,34 +45,273 @@ class Node(VisitedMixin):
             raise NodeDepthAlreadySet
 
 
+class TreeStore:
+    """
+    Compact storage of the nodes of a tree in parallel arrays, indexed by the node's index.
+    TreeNode objects are views over the store, and the data of the nodes (PythonObjData) are
+    created from the arrays when requested. There is one view per node, kept by the store, and a
+    view keeps the data of its node once requested, so the state cached on them (ex. cached
+    properties) is kept. Short names are interned, and the full name of a node is derived from its
+    parent's name. The code of the modules is kept once, in a SourceBuffer, and the classes,
+    functions and methods keep their span in it.
+    """
+    _NO_INDEX = -1
+    _RECENT_DATA_SIZE = 1024
+
+    def __init__(self):
+        self.parents = array('l')
+        self.type_ids = array('b')
+        self.name_ids = array('l')
+        self.depths = array('l')
+        self.first_children = array('l')
+        self.next_siblings = array('l')
+        self.have_branches = array('b')
+        self.spans = array('l')  # start_lineno, end_lineno, col_offset of every node
+        self.paths = []
+
+        self.names = []
+        self._name_ids = {}
+        self._full_names = {}  # names that can't be derived from the parent's name
+        self._codes = {}  # source buffers of the modules and code of nodes without spans
+        self._branches_loaders = {}  # functions that set the branches of lazily expanded nodes
+        self._views = {}  # the TreeNode of every node index
+        self._branches = {}  # the branches of the nodes, by full name, once requested
+
+        # data objects are rebuilt on request, the ones in use (and the recent ones) are kept
+        self._data = weakref.WeakValueDictionary()
+        self._recent_data = deque(maxlen=self._RECENT_DATA_SIZE)
+
+    def __len__(self):
+        return len(self.parents)
+
+    def _intern(self, name):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def add_node(self, parent_index, data):
+        index = len(self.parents)
+        self.parents.append(parent_index)
+        self.type_ids.append(_TYPES.index(data.type))
+        self.depths.append(self.depths[parent_index]+1 if parent_index != self._NO_INDEX else 0)
+        self.first_children.append(self._NO_INDEX)
+        self.next_siblings.append(self._NO_INDEX)
+        self.have_branches.append(0)
+        self.paths.append(data.path)
+
+        parent_name_prefix = f"{self.full_name(parent_index)}." if parent_index != self._NO_INDEX else None
+        if parent_name_prefix is not None and data.name.startswith(parent_name_prefix):
+            self.name_ids.append(self._intern(data.name[len(parent_name_prefix):]))
+        else:
+            self.name_ids.append(self._NO_INDEX)
+            self._full_names[index] = data.name
+
+        span = data.span if isinstance(data, PythonCodeObj) else None
+        if data.type == 'module':
+            self._codes[index] = span.buffer
+            self.spans.extend((self._NO_INDEX,)*3)
+        elif span is not None and span.buffer is self._module_buffer(parent_index):
+            self.spans.extend((span.start_lineno, span.end_lineno, span.col_offset))
+        else:
+            if isinstance(data, PythonCodeObj):
+                self._codes[index] = data.code
+            self.spans.extend((self._NO_INDEX,)*3)
+
+        self._cache_data(index, data)
+        return index
+
+    def _cache_data(self, index, data):
+        self._data[index] = data
+        self._recent_data.append(data)
+
+    def _module_buffer(self, index):
+        while index != self._NO_INDEX and self.type(index) != 'module':
+            index = self.parents[index]
+        return self._codes.get(index) if index != self._NO_INDEX else None
+
+    def full_name(self, index):
+        name_id = self.name_ids[index]
+        if name_id == self._NO_INDEX:
+            return self._full_names[index]
+        return f"{self.full_name(self.parents[index])}.{self.names[name_id]}"
+
+    def data(self, index):
+        data = self._data.get(index)
+        if data is None:
+            data = self._build_data(index)
+            self._cache_data(index, data)
+        return data
+
+    def _build_data(self, index):
+        data_class = PythonObjData.types[self.type(index)]
+        name, path = self.full_name(index), self.paths[index]
+        if not issubclass(data_class, PythonCodeObj):
+            return data_class(name, path)
+
+        code = self._codes.get(index)
+        if isinstance(code, SourceBuffer):
+            code = code.span()
+        elif code is None:
+            code = SourceSpan(self._module_buffer(index), *self.spans[3*index:3*index+3])
+        return data_class(name, path, code)
+
+    def type(self, index):
+        return _TYPES[self.type_ids[index]]
+
+    def set_branches_loader(self, index, loader):
+        self._branches_loaders[index] = loader
+
+    def has_branches_loader(self, index):
+        return index in self._branches_loaders
+
+    def load_branches(self, index):
+        loader = self._branches_loaders.pop(index, None)
+        if loader is not None:
+            loader()
+
+    def view(self, index):
+        """
+        :return: the TreeNode of the node
+        """
+        node = self._views.get(index)
+        if node is None:
+            node = self._views[index] = TreeNode._view(self, index)
+        return node
+
+    def add_view(self, index, node):
+        self._views[index] = node
+
+    def branches(self, index):
+        """
+        :return: dict {full name: TreeNode} of the branches of the node, the same dict on every call
+        """
+        branches = self._branches.get(index)
+        if branches is None:
+            self.load_branches(index)
+            branches = self._branches[index] = {self.full_name(branch_index): self.view(branch_index)
+                                                for branch_index in self.branch_indexes(index)}
+        return branches
+
+    def set_branches(self, index, branch_indexes):
+        self._branches.pop(index, None)
+        self.have_branches[index] = 1
+        previous_index = self._NO_INDEX
+        for branch_index in branch_indexes:
+            if previous_index == self._NO_INDEX:
+                self.first_children[index] = branch_index
+            else:
+                self.next_siblings[previous_index] = branch_index
+            previous_index = branch_index
+
+    def branch_indexes(self, index):
+        branch_index = self.first_children[index]
+        while branch_index != self._NO_INDEX:
+            yield branch_index
+            branch_index = self.next_siblings[branch_index]
+
+
 class TreeNode(Node):
+    """
+    A view over a node of a TreeStore. A TreeNode without a parent creates a new store. The views of
+    the other nodes are taken from the store (TreeStore.view), so there is one view per node.
+    """
+    __slots__ = ('_store', '_index', '_data')
+
     def __init__(self, parent, data):
-        super().__init__(data, parent.depth+1 if parent else 0)
-        self.__branches = None
-        self.__parent = parent
+        self._store = parent._store if parent else TreeStore()
+        self._index = self._store.add_node(parent._index if parent else TreeStore._NO_INDEX, data)
+        self._data = None
+        self._store.add_view(self._index, self)
 
-    def set_branches(self, list_objs):
-        if self.__branches is None:
-            self.__branches = {}
-            for obj in list_objs:
-                obj.set_depth(self.depth+1)
-                self.__branches[obj.data.name] = obj
+    @classmethod
+    def _view(cls, store, index):
+        node = cls.__new__(cls)
+        node._store, node._index, node._data = store, index, None
+        return node
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self._store.data(self._index)
+        return self._data
+
+    @property
+    def depth(self):
+        return self._store.depths[self._index]
+
+    def set_depth(self, depth):
+        if self.depth > -1:
+            self._store.depths[self._index] = depth
         else:
+            raise NodeDepthAlreadySet
+
+    def set_branches(self, list_objs):
+        if self._store.have_branches[self._index] or self._store.has_branches_loader(self._index):
+            raise NodeBranchesAlreadySet
+
+        # same as storing the branches in a dict by name: a duplicate name replaces the
+        # previous branch, but keeps its position
+        branches = {}
+        for obj in list_objs:
+            obj.set_depth(self.depth+1)
+            branches[self._store.full_name(obj._index)] = obj._index
+        self._store.set_branches(self._index, branches.values())
+
+    def set_branches_loader(self, loader):
+        """
+        Lazy alternative of `set_branches`: `loader` sets the branches the first time they are read.
+        """
+        if self._store.have_branches[self._index] or self._store.has_branches_loader(self._index):
             raise NodeBranchesAlreadySet
+        self._store.set_branches_loader(self._index, loader)
+
+    @property
+    def is_expanded(self):
+        return not self._store.has_branches_loader(self._index)
 
     @property
     def branches(self):
-        return self.__branches if self.__branches else {}
+        return self._store.branches(self._index)
 
     @property
     def parent(self):
-        return self.__parent
+        parent_index = self._store.parents[self._index]
+        return self._store.view(parent_index) if parent_index != TreeStore._NO_INDEX else None
 
     def pre_order_visit(self, visitor):
-        self.accept(visitor)
-        if self.branches:
-            for name, branch in self.branches.items():
-                branch.pre_order_visit(visitor)
+        self.pre_order_visit_all([visitor])
+
+    def pre_order_visit_all(self, visitors):
+        """
+        Visits the tree in pre-order once (iteratively), and every node is visited by all the visitors
+        in the given order. Below the modules, nodes are visited only by the visitors that visit them.
+        """
+        visitors_below_modules = [visitor for visitor in visitors if visitor.visits_below_modules]
+        store = self._store
+
+        stack = [(self._index, visitors)]
+        while stack:
+            index, node_visitors = stack.pop()
+            node = store.view(index)
+            for visitor in node_visitors:
+                node.accept(visitor)
+
+            if store.type(index) == 'module':
+                node_visitors = visitors_below_modules
+                if not node_visitors:
+                    continue
+
+            store.load_branches(index)
+            branch_indexes = list(store.branch_indexes(index))
+            stack.extend((branch_index, node_visitors) for branch_index in reversed(branch_indexes))
+
+    def __eq__(self, other):
+        return isinstance(other, TreeNode) and self._store is other._store and self._index == other._index
+
+    def __hash__(self):
+        return hash((id(self._store), self._index))
 
     def __str__(self):
         return f"(Node) {self.data}"
@@ -74,6 +322,12 @@ class TreeNode(Node):
 
 class PythonObjData(abc.ABC):
     type = None
+    types = {}  # data class of every node type
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.type is not None:
+            PythonObjData.types[cls.type] = cls
 
     def __init__(self, name, path):
         self.__path = path
@@ -97,23 +351,38 @@ class PythonObjData(abc.ABC):
 
 class PythonCodeObj(PythonObjData):
     def __init__(self, name, path, code):
+        """
+        :param code: code of the object (str) or a SourceSpan of the module's code
+        """
         super().__init__(name, path)
         self.__code = code
 
+    @property
+    def span(self):
+        return self.__code if isinstance(self.__code, SourceSpan) else None
+
     @property
     def code(self):
-        return self.__code
+        return self.__code.code if isinstance(self.__code, SourceSpan) else self.__code
 
-    @cached_property
+    @property
     def ast(self):
-        return analyse_ast(self.code)
+        span_ast = self.span.ast if self.span is not None else None
+        if span_ast is not None:
+            return list(ast.walk(span_ast))
+        return self._parsed_ast
 
     @cached_property
+    def _parsed_ast(self):
+        return analyse_ast(self.code)
+
+    @property
     def code_lines(self):
         return self.code.split('\n')
 
     def __str__(self):
-        return f"{super().__str__()}, code \"{self.code_lines[0]}\"..."
+        first_code_line = self.code.partition('\n')[0]
+        return f"{super().__str__()}, code \"{first_code_line}\"..."
 
 
 class CompoundStatementCodeMixin(PythonCodeObj):
@@ -121,9 +390,18 @@ class CompoundStatementCodeMixin(PythonCodeObj):
     def statement_def_ast(self):
         return self.ast[1]
 
+    @property
+    def _span_offsets(self):
+        """
+        Line and column offsets of the asts sliced from the module's parse, relatively to the object's code.
+        """
+        if self.span is not None and self.span.ast is not None:
+            return self.span.start_lineno-1, self.span.col_offset
+        return 0, 0
+
     @cached_property
     def statement_def_lineno(self):
-        return self.statement_def_ast.lineno
+        return self.statement_def_ast.lineno - self._span_offsets[0]
 
     @cached_property
     def statement_def(self):
@@ -132,7 +410,8 @@ class CompoundStatementCodeMixin(PythonCodeObj):
     @cached_property
     def statement_inner_code(self):
         inner_code_lines = self.code_lines[self.statement_def_lineno:]
-        return '\n'.join(remove_first_n_characters(inner_code_lines, self.statement_def_ast.body[0].col_offset))
+        inner_col_offset = self.statement_def_ast.body[0].col_offset - self._span_offsets[1]
+        return '\n'.join(remove_first_n_characters(inner_code_lines, inner_col_offset))
 
     @cached_property
     def statement_name(self):
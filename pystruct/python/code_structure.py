@@ -1,9 +1,9 @@
 from pystruct.python.basic_structure import *
+from pystruct.python.source_span import SourceBuffer
 
 
 # TODO project object can be a tree node subclass called head (no parent)
 # TODO check if tree node get item can be chained example node['pystruct']['utils']['ast_utils]['analyse_ast']
-# TODO Init visitor can take argument ex. "functions" and expand only until functions (instead to all the way down to identifiers)
 
 
 class DirectoryObj(PythonObjData):
@@ -13,6 +13,10 @@ class DirectoryObj(PythonObjData):
 class ModuleObj(PythonCodeObj):
     type = "module"
 
+    def __init__(self, name, path, code):
+        # the module owns the source buffer that the spans of its classes, functions and methods point to
+        super().__init__(name, path, SourceBuffer(code).span() if isinstance(code, str) else code)
+
 
 class ClassObj(CompoundStatementCodeMixin):
     type = "class"
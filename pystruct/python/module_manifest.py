@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+
+from pystruct.python.statement_extractor import ExtractedStatement
+from pystruct.utils.logs import log_disk_ops
+
+
+# the version of the format of the manifest files, to change when the stored statements change, so that the
+# manifests of other versions are not used
+MANIFEST_FORMAT_VERSION = 2
+
+
+def content_hash(code):
+    return hashlib.sha1(code.encode('utf-8')).hexdigest()
+
+
+class ModuleManifest:
+    """
+    Per-module content hashes of a source directory together with the statements extracted
+    from each module. It is persisted alongside the dataset, so that when the source tree gets
+    rebuilt, only the modules whose content changed (or that were added) need to be parsed again.
+    Modules are identified by their path relative to the source directory. A manifest file of another
+    MANIFEST_FORMAT_VERSION is ignored.
+    """
+    def __init__(self, modules=None):
+        self._modules = modules if modules is not None else {}
+
+    def __len__(self):
+        return len(self._modules)
+
+    def __contains__(self, relpath):
+        return relpath in self._modules
+
+    def relpaths(self):
+        return list(self._modules.keys())
+
+    def statements(self, relpath, code):
+        """
+        :return: the stored list of ExtractedStatement of the module if its code is unchanged, otherwise None
+        """
+        module = self._modules.get(relpath)
+        if module is None or module['hash'] != content_hash(code):
+            return None
+        return [ExtractedStatement.from_dict(statement_dict) for statement_dict in module['statements']]
+
+    def add(self, relpath, code, statements):
+        self._modules[relpath] = {
+            'hash': content_hash(code),
+            'statements': [statement.to_dict() for statement in statements]
+        }
+
+    def remove(self, relpath):
+        self._modules.pop(relpath, None)
+
+    def to_dict(self):
+        return self._modules
+
+    def save(self, filepath):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, 'w') as f:
+            json.dump({'version': MANIFEST_FORMAT_VERSION, 'modules': self._modules}, f)
+        log_disk_ops(f"ModuleManifest: Saved {len(self)} modules in {filepath}.")
+
+    @staticmethod
+    def load(filepath):
+        if not os.path.exists(filepath):
+            log_disk_ops(f"ModuleManifest: File {filepath} not found.")
+            return ModuleManifest()
+
+        with open(filepath, 'r') as f:
+            manifest_dict = json.load(f)
+        if not isinstance(manifest_dict, dict) or manifest_dict.get('version') != MANIFEST_FORMAT_VERSION:
+            log_disk_ops(f"ModuleManifest: File {filepath} is of another format version, it is ignored.")
+            return ModuleManifest()
+
+        modules = manifest_dict['modules']
+        log_disk_ops(f"ModuleManifest: Loaded {len(modules)} modules from {filepath}.")
+        return ModuleManifest(modules)
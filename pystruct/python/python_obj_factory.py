@@ -1,4 +1,5 @@
 from pystruct.python.code_structure import *
+from pystruct.python.source_span import SourceSpan
 
 
 class PathObjectFactory:
@@ -45,17 +46,22 @@ class PathObjectFactory:
 
 
 class DictObjectFactory:
-    def node_dict_to_object(self, name, node_dict):
+    def node_dict_to_object(self, name, node_dict, parent=None):
         if node_dict['type'] == "directory":
             return DirectoryObj(name=name, path=None)
         elif node_dict['type'] == "module":
             return ModuleObj(name, None, node_dict['code'])
-        elif node_dict['type'] == "class":
-            return ClassObj(name, None, node_dict['code'])
+
+        code = self._code(node_dict, parent)
+        if node_dict['type'] == "class":
+            return ClassObj(name, None, code)
         elif node_dict['type'] == "function":
-            return FunctionObj(name, None, node_dict['code'])
+            return FunctionObj(name, None, code)
         elif node_dict['type'] == "class_method":
-            return ClassMethodObj(name, None, node_dict['code'])
-
-
+            return ClassMethodObj(name, None, code)
 
+    @staticmethod
+    def _code(node_dict, parent):
+        if 'span' in node_dict:
+            return SourceSpan(parent.data.span.buffer, *node_dict['span'])
+        return node_dict['code']
@@ -1,21 +1,74 @@
+import os
+
 from pystruct.python.basic_structure import TreeNode
 from pystruct.python.python_obj_factory import PathObjectFactory, DictObjectFactory
+from pystruct.python.statement_extractor import extract_module_statements, extract_modules_in_parallel
 from pystruct.utils.logs import log_cyan
 from pystruct.utils.path_utils import load_file_as_string
 from pystruct.utils.paths import Path
+from pystruct.utils.python_file_utils import is_python_file
 from pystruct.visitors.init_visitor import PythonObjInitializer
 from pystruct.visitors.load_pobj_visitor import LoadObjInitializer
 from pystruct.visitors.pobj_to_dict_visitor import ConvertPythonSourceObjToDict
 from pystruct.visitors.visitor import VisitedMixin
 
 
+def _python_file_paths(path):
+    if not path.is_directory:
+        return [path.abspath] if is_python_file(path.abspath) else []
+    return [abspath for sub_path in path.sub_paths for abspath in _python_file_paths(sub_path)]
+
+
+def _extract_changed_modules(root_path, jobs, manifest):
+    """
+    Extracts only the modules that are not in the manifest or whose content changed, the rest are
+    taken from the manifest. The manifest gets updated with the current modules.
+    :return: dict {abspath: (code, list of ExtractedStatement)}
+    """
+    extracted_modules, changed_modules, changed_codes = {}, {}, {}
+    for abspath in _python_file_paths(root_path):
+        relpath = os.path.relpath(abspath, os.path.dirname(root_path.abspath))
+        code = load_file_as_string(abspath)
+        statements = manifest.statements(relpath, code)
+        if statements is None:
+            # the changed modules are parsed from the code that was hashed, without reading them again
+            changed_modules[abspath], changed_codes[abspath] = relpath, code
+        else:
+            extracted_modules[abspath] = (code, statements)
+
+    if jobs != 1:
+        extracted_modules.update(extract_modules_in_parallel(list(changed_modules.keys()), jobs, codes=changed_codes))
+    else:
+        for abspath, code in changed_codes.items():
+            extracted_modules[abspath] = (code, extract_module_statements(code))
+
+    current_relpaths = {os.path.relpath(abspath, os.path.dirname(root_path.abspath)) for abspath in extracted_modules}
+    removed_relpaths = [relpath for relpath in manifest.relpaths() if relpath not in current_relpaths]
+    for relpath in removed_relpaths:
+        manifest.remove(relpath)
+    for abspath, relpath in changed_modules.items():
+        code, statements = extracted_modules[abspath]
+        manifest.add(relpath, code, statements)
+
+    log_cyan(f"Parsed {len(changed_modules)} new or changed modules out of {len(extracted_modules)} "
+             f"({len(removed_relpaths)} removed).")
+    return extracted_modules
+
+
 class PythonSourceObj(VisitedMixin):
     def __init__(self, head):
         self._head = head
 
     def use_visitor(self, visitor):
-        self._head.pre_order_visit(visitor)
-        visitor.done()
+        self.use_visitors([visitor])
+
+    def use_visitors(self, visitors):
+        """
+        Runs all the visitors in a single traversal of the tree.
+        """
+        self._head.pre_order_visit_all(visitors)
+        for visitor in visitors:
+            visitor.done()
 
     def _node(self):
         return self._head
@@ -26,8 +79,17 @@ class PythonSourceObj(VisitedMixin):
         return store_visitor.dict()
 
     @staticmethod
-    def from_project_source(abspath):
-        log_cyan(f"Creating Python Source Object from path: {abspath}")
+    def from_project_source(abspath, jobs=1, manifest=None, lazy=False):
+        """
+        :param abspath: path of the source directory or module
+        :param jobs: number of processes reading and parsing the modules. None uses all the CPUs.
+        The resulting object does not depend on the number of jobs.
+        :param manifest: (optional) ModuleManifest of a previous build. Modules with the same content reuse
+        the stored statements instead of being parsed again, and the manifest gets updated.
+        :param lazy: if True, only directories and modules are created. The classes, functions and methods
+        of a module are extracted the first time the module's branches are read.
+        """
+        log_cyan(f"Creating Python Source Object from path: {abspath} (jobs={jobs})")
         abspath = Path(abspath)
         obj_factory = PathObjectFactory(abspath)
 
@@ -37,13 +99,23 @@ class PythonSourceObj(VisitedMixin):
             code = load_file_as_string(abspath.abspath)
             head = obj_factory.module(abspath.dotted_relpath, code)
 
+        extracted_modules = None
+        if manifest is not None:
+            extracted_modules = _extract_changed_modules(obj_factory.root_path, jobs, manifest)
+        elif jobs != 1:
+            extracted_modules = extract_modules_in_parallel(_python_file_paths(obj_factory.root_path), jobs)
+
         python = PythonSourceObj(head)
-        python.use_visitor(PythonObjInitializer(obj_factory))
+        python.use_visitor(PythonObjInitializer(obj_factory, extracted_modules=extracted_modules, lazy=lazy))
 
         return python
 
     @staticmethod
-    def from_dict(_dict):
+    def from_dict(_dict, lazy=False):
+        """
+        :param lazy: if True, only directories and modules are created. The classes, functions and methods
+        of a module are loaded the first time the module's branches are read.
+        """
         obj_factory = DictObjectFactory()
 
         first_key = list(_dict.keys())[0]
@@ -51,7 +123,7 @@ class PythonSourceObj(VisitedMixin):
         head = TreeNode(None, head_obj)
 
         python = PythonSourceObj(head)
-        python.use_visitor(LoadObjInitializer(obj_factory, _dict))
+        python.use_visitor(LoadObjInitializer(obj_factory, _dict, lazy=lazy))
 
         return python
 
@@ -0,0 +1,130 @@
+import ast
+from array import array
+
+from pystruct.utils.logs import log_yellow
+
+_STATEMENT_ASTS = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _has_multiline_strings(statement_ast):
+    for _ast in ast.walk(statement_ast):
+        if isinstance(_ast, (ast.Constant, ast.JoinedStr)) and _ast.end_lineno > _ast.lineno:
+            if not isinstance(_ast, ast.Constant) or isinstance(_ast.value, (str, bytes)):
+                return True
+    return False
+
+
+class SourceBuffer:
+    """
+    The code of a module, shared by all the nodes of the module. Nodes keep a SourceSpan into
+    the buffer instead of a copy of their code, and their asts are taken from the single parse
+    of the module.
+    """
+    __slots__ = ('_code', '_line_offsets', '_tree', '_statement_asts')
+
+    def __init__(self, code):
+        self._code = code
+        self._line_offsets = None
+        self._tree = None
+        self._statement_asts = None
+
+    @property
+    def code(self):
+        return self._code
+
+    @property
+    def line_offsets(self):
+        """
+        Offset of the first character of every line in the code.
+        """
+        if self._line_offsets is None:
+            line_offsets = array('l', [0])
+            newline_offset = self._code.find('\n')
+            while newline_offset != -1:
+                line_offsets.append(newline_offset+1)
+                newline_offset = self._code.find('\n', newline_offset+1)
+            self._line_offsets = line_offsets
+        return self._line_offsets
+
+    @property
+    def number_of_lines(self):
+        return len(self.line_offsets)
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            try:
+                self._tree = ast.parse(self._code, mode='exec')
+            except SyntaxError:
+                log_yellow(f"Warning-> Unable to analyse the syntax of code segment:\n\"{self._code}\"", verbosity=3)
+                self._tree = False
+        return self._tree if self._tree is not False else None
+
+    def span(self):
+        return SourceSpan(self, 1, self.number_of_lines, 0)
+
+    def code_segment(self, start_lineno, end_lineno, col_offset):
+        line_offsets = self.line_offsets
+        start = line_offsets[start_lineno-1]
+        end = line_offsets[end_lineno]-1 if end_lineno < len(line_offsets) else len(self._code)
+        segment = self._code[start:end]
+        if col_offset == 0:
+            return segment
+        return '\n'.join(line[col_offset:] for line in segment.split('\n'))
+
+    def statement_ast(self, start_lineno, end_lineno, col_offset):
+        """
+        :return: the class or function ast of the module that spans exactly the given lines (decorators
+        included), or None. None is also returned for indented statements with multi-line strings, because
+        dedenting their code changes the value of the strings.
+        """
+        if self._statement_asts is None:
+            tree = self.tree
+            self._statement_asts = {} if tree is None else {
+                (_ast.lineno - len(_ast.decorator_list), _ast.end_lineno, _ast.col_offset): _ast
+                for _ast in ast.walk(tree) if isinstance(_ast, _STATEMENT_ASTS)
+            }
+
+        key = (start_lineno, end_lineno, col_offset)
+        statement_ast = self._statement_asts.get(key)
+        if statement_ast is not None and col_offset > 0 and _has_multiline_strings(statement_ast):
+            self._statement_asts[key] = statement_ast = None
+        return statement_ast
+
+
+class SourceSpan:
+    """
+    Lines `start_lineno` to `end_lineno` (1-based, inclusive) of a SourceBuffer, dedented by `col_offset`
+    characters.
+    """
+    __slots__ = ('buffer', 'start_lineno', 'end_lineno', 'col_offset')
+
+    def __init__(self, buffer, start_lineno, end_lineno, col_offset):
+        self.buffer = buffer
+        self.start_lineno = start_lineno
+        self.end_lineno = end_lineno
+        self.col_offset = col_offset
+
+    @property
+    def code(self):
+        return self.buffer.code_segment(self.start_lineno, self.end_lineno, self.col_offset)
+
+    @property
+    def is_whole_buffer(self):
+        return self.start_lineno == 1 and self.end_lineno == self.buffer.number_of_lines and self.col_offset == 0
+
+    @property
+    def ast(self):
+        """
+        :return: the module ast of the span's code, sliced from the parse of the buffer. None if the span
+        doesn't match a statement of the buffer's parse.
+        """
+        if self.is_whole_buffer:
+            return self.buffer.tree
+        statement_ast = self.buffer.statement_ast(self.start_lineno, self.end_lineno, self.col_offset)
+        if statement_ast is None:
+            return None
+        return ast.Module(body=[statement_ast], type_ignores=[])
+
+    def to_list(self):
+        return [self.start_lineno, self.end_lineno, self.col_offset]
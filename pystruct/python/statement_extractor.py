@@ -0,0 +1,255 @@
+import ast
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from pystruct.utils.ast_utils import get_first_ast_of_type, remove_first_n_characters, separate_statement
+from pystruct.utils.logs import log_yellow
+from pystruct.utils.path_utils import load_file_as_string
+
+MODULE_STATEMENTS = {ast.ClassDef: 'class', ast.FunctionDef: 'function'}
+CLASS_STATEMENTS = {ast.FunctionDef: 'class_method'}
+
+_BLOCK_NODES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+
+class ExtractedStatement:
+    """
+    Picklable description of a class, function or class method extracted from a module.
+    `name` is the short name of the statement (ex. "a_function") and `branches` holds the
+    statements extracted from its body (only classes have branches). `span` is the
+    (start_lineno, end_lineno, col_offset) of the code in the module, if the code can be taken
+    from the module as it is, and then `code` is None.
+    """
+    __slots__ = ('type', 'name', 'code', 'branches', 'span')
+
+    def __init__(self, type, name, code, branches=None, span=None):
+        self.type = type
+        self.name = name
+        self.code = code
+        self.branches = branches if branches is not None else []
+        self.span = span
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.type}, {self.name}, branches={len(self.branches)})"
+
+    def to_dict(self):
+        return {
+            'type': self.type,
+            'name': self.name,
+            'code': self.code,
+            'branches': [branch.to_dict() for branch in self.branches],
+            'span': list(self.span) if self.span is not None else None
+        }
+
+    @staticmethod
+    def from_dict(_dict):
+        branches = [ExtractedStatement.from_dict(branch_dict) for branch_dict in _dict['branches']]
+        span = tuple(_dict['span']) if _dict.get('span') is not None else None
+        return ExtractedStatement(_dict['type'], _dict['name'], _dict['code'], branches, span)
+
+
+class StatementExtractor:
+    """
+    Extracts compound statements (classes, functions, methods) from a module by parsing
+    its code only once.
+
+    The result is identical to repeatedly calling `get_first_ast_of_type` and `separate_statement`
+    on the remaining code: statements are fetched in breadth-first order, the subtrees of fetched
+    statements are skipped, and the fetching stops as soon as removing a statement would leave an
+    empty block behind (the remaining code would not be valid python anymore). If a statement's
+    layout doesn't allow an exact single-parse answer (ex. multi-line decorators) the extraction
+    continues iteratively from the code that remains at that point.
+    """
+    def __init__(self, code):
+        self._code_lines = code.split('\n')
+        self._iteratively_fetched = set()
+        try:
+            self._tree = ast.parse(code, mode='exec')
+        except SyntaxError:
+            log_yellow(f"Warning-> Unable to analyse the syntax of code segment:\n\"{code}\"", verbosity=3)
+            self._tree = None
+
+    @property
+    def tree(self):
+        return self._tree
+
+    def extract(self, root, asts_to_fetch):
+        """
+        :param root: ast node to extract the statements from (the module or a class of this module)
+        :param asts_to_fetch: iterable of ast types to fetch
+        :return: list of (ast node, code) tuples
+        """
+        asts_to_fetch = tuple(asts_to_fetch)
+        fetched = []
+        block_sizes = {}
+
+        queue = deque([(root, None)])
+        while queue:
+            _ast, block = queue.popleft()
+            if _ast is not root and isinstance(_ast, asts_to_fetch):
+                if not self._has_single_line_decorators(_ast):
+                    return self._statements(fetched) + self._extract_iteratively(root, fetched, asts_to_fetch)
+                fetched.append(_ast)
+
+                block_sizes[block] -= 1
+                if block_sizes[block] == 0 and block[0] is not self._tree:
+                    break
+                continue
+
+            for field, value in ast.iter_fields(_ast):
+                if not isinstance(value, list):
+                    continue
+                children = [child for child in value if isinstance(child, _BLOCK_NODES)]
+                if len(children) == 0:
+                    continue
+                child_block = (_ast, field)
+                block_sizes[child_block] = len(value)
+                queue.extend((child, child_block) for child in children)
+
+        return self._statements(fetched)
+
+    def is_fetched_from_tree(self, _ast):
+        return _ast not in self._iteratively_fetched
+
+    def span(self, _ast):
+        """
+        :return: (start_lineno, end_lineno, col_offset) of the statement's code in the extractor's code, or None
+        if the code or the ast of the statement are not the same as the ones found in the extractor's code
+        """
+        if not self.is_fetched_from_tree(_ast) or not self.can_be_extracted_separately(_ast):
+            return None
+        return _ast.lineno - len(_ast.decorator_list), _ast.end_lineno, _ast.col_offset
+
+    def statement_code(self, _ast):
+        start_lineno = _ast.lineno - len(_ast.decorator_list)
+        code_segment = self._code_lines[start_lineno-1:_ast.end_lineno]
+        return '\n'.join(remove_first_n_characters(code_segment, _ast.col_offset))
+
+    def can_be_extracted_separately(self, _ast):
+        """
+        A statement parsed from the module is equivalent to the one parsed from its own (dedented)
+        code only if the dedent removes nothing but whitespace.
+        """
+        if _ast.col_offset == 0:
+            return True
+        start_lineno = _ast.lineno - len(_ast.decorator_list)
+        code_segment = self._code_lines[start_lineno-1:_ast.end_lineno]
+        return all(line[:_ast.col_offset].strip() == '' for line in code_segment)
+
+    def _statements(self, fetched):
+        return [(_ast, self.statement_code(_ast)) for _ast in fetched]
+
+    def _extract_iteratively(self, root, fetched, asts_to_fetch):
+        iteratively_fetched = extract_statements_iteratively(self._remaining_code(root, fetched), asts_to_fetch)
+        self._iteratively_fetched.update(_ast for _ast, _ in iteratively_fetched)
+        return iteratively_fetched
+
+    def _remaining_code(self, root, fetched):
+        removed_linenos = set()
+        for _ast in fetched:
+            removed_linenos.update(range(_ast.lineno - len(_ast.decorator_list), _ast.end_lineno+1))
+
+        if root is self._tree:
+            first_lineno, last_lineno, col_offset = 1, len(self._code_lines), 0
+        else:
+            first_lineno, last_lineno, col_offset = root.lineno - len(root.decorator_list), root.end_lineno, root.col_offset
+
+        remaining_code_lines = [self._code_lines[lineno-1] for lineno in range(first_lineno, last_lineno+1)
+                                if lineno not in removed_linenos]
+        return '\n'.join(remove_first_n_characters(remaining_code_lines, col_offset))
+
+    @staticmethod
+    def _has_single_line_decorators(_ast):
+        first_decorator_lineno = _ast.lineno - len(_ast.decorator_list)
+        for i, decorator in enumerate(_ast.decorator_list):
+            if not decorator.lineno == decorator.end_lineno == first_decorator_lineno + i:
+                return False
+        return True
+
+
+def extract_statements_iteratively(code, asts_to_fetch):
+    """
+    The original extraction: re-parses the remaining code for every statement fetched.
+    """
+    fetched = []
+    remaining_code = code
+    fetched_ast = get_first_ast_of_type(remaining_code, asts_to_fetch)
+    while fetched_ast:
+        fetched_code, remaining_code = separate_statement(remaining_code, fetched_ast)
+        fetched.append((fetched_ast, fetched_code))
+        fetched_ast = get_first_ast_of_type(remaining_code, asts_to_fetch)
+    return fetched
+
+
+def _to_extracted_statement(_ast, code, asts_to_fetch, extractor=None):
+    span = extractor.span(_ast) if extractor is not None else None
+    return ExtractedStatement(asts_to_fetch[_ast.__class__], _ast.name, code if span is None else None, span=span)
+
+
+def _to_extracted_statements(fetched, asts_to_fetch, extractor=None):
+    return [_to_extracted_statement(_ast, code, asts_to_fetch, extractor) for _ast, code in fetched]
+
+
+def extract_class_statements(code):
+    extractor = StatementExtractor(code)
+    if extractor.tree is None:
+        return []
+    # the class' code may start inside a multi-line decorator, so the whole code is searched (like the original
+    # extraction does) instead of the class' statement
+    return _to_extracted_statements(extractor.extract(extractor.tree, CLASS_STATEMENTS.keys()), CLASS_STATEMENTS)
+
+
+def extract_module_statements(code):
+    """
+    Extracts the classes and functions of a module, and the methods of each class.
+    :param code: module's code
+    :return: list of ExtractedStatement
+    """
+    extractor = StatementExtractor(code)
+    if extractor.tree is None:
+        return []
+
+    statements = []
+    for _ast, statement_code in extractor.extract(extractor.tree, MODULE_STATEMENTS.keys()):
+        statement = _to_extracted_statement(_ast, statement_code, MODULE_STATEMENTS, extractor)
+        if statement.type == 'class':
+            if statement.span is not None:
+                # the class' code is dedented by its col_offset, dedenting the methods by their absolute
+                # col_offset gives the same code as dedenting them twice.
+                methods = extractor.extract(_ast, CLASS_STATEMENTS.keys())
+                statement.branches = _to_extracted_statements(methods, CLASS_STATEMENTS, extractor)
+            else:
+                statement.branches = extract_class_statements(statement_code)
+        statements.append(statement)
+    return statements
+
+
+def _load_and_extract_module(abspath):
+    code = load_file_as_string(abspath)
+    return code, extract_module_statements(code)
+
+
+def _extract_module(code):
+    return code, extract_module_statements(code)
+
+
+def extract_modules_in_parallel(abspaths, jobs=None, codes=None):
+    """
+    Reads the modules and extracts their statements in a pool of processes.
+    :param abspaths: list of module paths
+    :param jobs: number of processes (defaults to the number of CPUs)
+    :param codes: (optional) dict {abspath: code} of the modules that are already read, they are not read again
+    :return: dict {abspath: (code, list of ExtractedStatement)}
+    """
+    jobs = jobs or os.cpu_count()
+    # the biggest modules are scheduled first so that no process is left with a big one at the end
+    if codes is not None:
+        abspaths = sorted(abspaths, key=lambda abspath: len(codes[abspath]), reverse=True)
+        function, items = _extract_module, [codes[abspath] for abspath in abspaths]
+    else:
+        abspaths = sorted(abspaths, key=os.path.getsize, reverse=True)
+        function, items = _load_and_extract_module, abspaths
+    chunksize = max(1, len(abspaths) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return dict(zip(abspaths, executor.map(function, items, chunksize=chunksize)))
@@ -0,0 +1,198 @@
+import io
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from pystruct.utils.graph_structures import Graph, label_ranks
+
+# above this number of nodes the names of the nodes are not shown on the axes of the heatmap, the names of
+# their groups are shown instead
+MAX_LABELED_NODES = 60
+
+
+def matrix_order(graph, groups=None):
+    """
+    Orders the nodes of a graph so that its dependency structure matrix is (block) triangular: the strongly
+    connected components (SCCs) are placed in layers of the condensation DAG (the longest path from a node
+    that nothing depends on), so the edges between SCCs go from a layer to a later one. Inside a layer the
+    SCCs are clustered by their group (the first group of their nodes), and the nodes of an SCC are kept
+    together and sorted by name.
+    :param groups: the group of every node id (e.x. the package of a module), or None
+    :return: numpy array with the node ids in matrix order
+    """
+    labels = graph.strongly_connected_components()
+    number_of_components = int(labels.max())+1 if len(labels) else 0
+
+    # the condensation edges are sorted by source, and the SCCs are numbered in topological order, so the
+    # layer of a source is final when its edges are read
+    layers = [0]*number_of_components
+    sources, targets, _ = graph.condensation_edges(labels)
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        layers[target] = max(layers[target], layers[source]+1)
+    layers = np.array(layers, dtype=np.int64)
+
+    name_ranks = label_ranks([graph.node(node_id) for node_id in range(graph.size())])
+    component_groups = np.zeros(number_of_components, dtype=np.int64)
+    if groups is not None:
+        component_groups[:] = np.iinfo(np.int64).max
+        np.minimum.at(component_groups, labels, label_ranks(groups))
+
+    return np.lexsort((name_ranks, labels, component_groups[labels], layers[labels]))
+
+
+class DependencyStructureMatrix:
+    """
+    Sparse (coordinate format) dependency structure matrix: the row of a dependency is the node that
+    depends, and its column the node it depends on, with the nodes in `matrix_order`. The dependencies
+    between different SCCs are above the diagonal, and the cycles are the blocks of the diagonal, whose
+    entries below it are the back edges.
+    :param groups: the group of every node (e.x. the package of a module) in matrix order, or None
+    """
+    def __init__(self, nodes, rows, columns, weights, groups=None):
+        self.nodes = list(nodes)
+        self.groups = list(groups) if groups is not None else None
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.columns = np.asarray(columns, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.int64)
+
+    @classmethod
+    def from_dependencies(cls, dependencies_df, group_of=None):
+        """
+        :param dependencies_df: pandas.DataFrame with the depending node, the node it depends on and the
+        number of dependencies between them, in three columns
+        :param group_of: dict (or pandas.Series) with the group of the nodes, to cluster them
+        """
+        graph = Graph(list(zip(dependencies_df.iloc[:, 0].tolist(), dependencies_df.iloc[:, 1].tolist())))
+        nodes = [graph.node(node_id) for node_id in range(graph.size())]
+        groups = [group_of.get(node) for node in nodes] if group_of is not None else None
+
+        order = matrix_order(graph, groups)
+        positions = np.empty_like(order)
+        positions[order] = np.arange(len(order))
+
+        sources, targets = graph.edge_ids()
+        return cls([nodes[node_id] for node_id in order.tolist()], positions[sources], positions[targets],
+                   dependencies_df.iloc[:, 2].to_numpy(),
+                   [groups[node_id] for node_id in order.tolist()] if groups is not None else None)
+
+    @property
+    def size(self):
+        return len(self.nodes)
+
+    def to_dataframe(self, level):
+        nodes = np.array(self.nodes, dtype=object)
+        df = pd.DataFrame({
+            'row': self.rows,
+            'column': self.columns,
+            level: nodes[self.rows] if len(self.rows) else [],
+            f'import_{level}': nodes[self.columns] if len(self.columns) else [],
+            'number_of_imports': self.weights,
+        })
+        return df.sort_values(['row', 'column']).reset_index(drop=True)
+
+    @classmethod
+    def from_dataframe(cls, df, level, group_of=None):
+        nodes = {}
+        for positions, names in ((df['row'], df[level]), (df['column'], df[f'import_{level}'])):
+            nodes.update(zip(positions.tolist(), names.tolist()))
+        nodes = [nodes[position] for position in range(len(nodes))]
+        groups = [group_of.get(node) for node in nodes] if group_of is not None else None
+        return cls(nodes, df['row'], df['column'], df['number_of_imports'], groups)
+
+    def group_runs(self, depth=None):
+        """
+        :param depth: if not None, the groups are cut to their first `depth` dotted names (e.x. the packages
+        of depth 2 for the package names)
+        :return: list of (group, first position, position after the last) of the runs of consecutive nodes of
+        the same group, in matrix order (a group is in more than one run if its nodes are in more layers).
+        Without groups, the names of the nodes are the groups.
+        """
+        runs = []
+        for position, group in enumerate(self.groups if self.groups is not None else self.nodes):
+            if depth is not None and group is not None:
+                group = '.'.join(str(group).split('.')[:depth])
+            if runs and runs[-1][0] == group:
+                runs[-1][2] = position+1
+            else:
+                runs.append([group, position, position+1])
+        return [tuple(run) for run in runs]
+
+    def coarse_group_runs(self):
+        """
+        :return: the group runs of the deepest cut of the groups (see group_runs) with at most
+        MAX_LABELED_NODES runs, or of their first names if there is none
+        """
+        groups = self.groups if self.groups is not None else self.nodes
+        max_depth = max((len(str(group).split('.')) for group in groups if group is not None), default=1)
+        for depth in range(max_depth, 1, -1):
+            runs = self.group_runs(depth)
+            if len(runs) <= MAX_LABELED_NODES:
+                return runs
+        return self.group_runs(1)
+
+    def _bin_size(self, number_of_bins):
+        return max(1, -(-self.size // number_of_bins))
+
+    def binned(self, number_of_bins):
+        """
+        :return: (dense matrix of at most number_of_bins x number_of_bins, with the sum of the weights of the
+        entries of every bin, same matrix for the entries below the diagonal)
+        """
+        bin_size = self._bin_size(number_of_bins)
+        number_of_bins = -(-self.size // bin_size)
+        bin_indexes = (self.rows // bin_size) * number_of_bins + self.columns // bin_size
+        shape = (number_of_bins, number_of_bins)
+
+        def bin_sums(mask):
+            return np.bincount(bin_indexes[mask], weights=self.weights[mask], minlength=number_of_bins**2).reshape(shape)
+
+        return bin_sums(np.ones(len(self.rows), dtype=bool)), bin_sums(self.rows > self.columns)
+
+    def heatmap_png(self, max_pixels=800, title=''):
+        """
+        Heatmap of the matrix, binned to at most `max_pixels` x `max_pixels` cells, in log scale, with the
+        cells of the back edges (cycles) in red. The axes show the names of the nodes, or if there are more
+        than MAX_LABELED_NODES nodes, the names of their groups (or the first names of the nodes), with lines
+        between the groups (see coarse_group_runs).
+        :return: the png image as bytes
+        """
+        matrix, back_edges = self.binned(max_pixels)
+        bin_size = self._bin_size(max_pixels)
+
+        fig, ax = plt.subplots(figsize=(10, 10))
+        ax.imshow(np.log1p(matrix), cmap='Greys', interpolation='nearest')
+        ax.imshow(np.ma.masked_equal(back_edges, 0), cmap='autumn', interpolation='nearest')
+
+        if self.size <= MAX_LABELED_NODES:
+            ax.set_xticks(range(self.size))
+            ax.set_xticklabels(self.nodes, rotation=90, fontsize=7)
+            ax.set_yticks(range(self.size))
+            ax.set_yticklabels(self.nodes, fontsize=7)
+        else:
+            self._set_group_ticks(ax, bin_size)
+        if self.groups is not None or self.size > MAX_LABELED_NODES:
+            for _, start, _ in self.coarse_group_runs()[1:]:
+                ax.axhline(start / bin_size - .5, color='#3366aa', linewidth=.4, alpha=.7)
+                ax.axvline(start / bin_size - .5, color='#3366aa', linewidth=.4, alpha=.7)
+        ax.set_title(title or f"{self.size} nodes, {len(self.rows)} dependencies")
+        fig.tight_layout()
+
+        image = io.BytesIO()
+        fig.savefig(image, format='png')
+        plt.close(fig)
+        return image.getvalue()
+
+    def _set_group_ticks(self, ax, bin_size):
+        """
+        Names the coarse runs of nodes of the groups at their middle. Only the runs of at least 1/MAX_LABELED_NODES
+        of the nodes are named, so the names don't overlap.
+        """
+        runs = [(group, start, end) for group, start, end in self.coarse_group_runs()
+                if group is not None and (end - start) * MAX_LABELED_NODES >= self.size]
+        ticks = [(start + end) / 2 / bin_size - .5 for _, start, end in runs]
+        labels = [str(group) for group, _, _ in runs]
+        ax.set_xticks(ticks)
+        ax.set_xticklabels(labels, rotation=90, fontsize=7)
+        ax.set_yticks(ticks)
+        ax.set_yticklabels(labels, fontsize=7)
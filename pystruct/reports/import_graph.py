@@ -7,6 +7,8 @@ from pystruct.visitors.visitor import TreeNodeVisitor
 
 
 class CollectImportsVisitor(TreeNodeVisitor):
+    visits_below_modules = False
+
     def __init__(self):
         self._module_imports_list = []
 
@@ -0,0 +1,154 @@
+"""
+Structured PlantUML document: the builders (PlantUMLDocument, PlantUMLPackagesAndModulesBuilder) add
+containers, nodes, edges and notes to a PlantUMLDiagram, which is serialised in one pass, and can be split
+into the diagrams of subgraphs by the ids of their nodes.
+"""
+
+
+class PlantUMLLine:
+    """
+    A line of text, e.x. the members of a class or a blank line.
+    """
+    def __init__(self, text=''):
+        self.text = text
+
+    def lines(self, indent, depth):
+        return [indent * depth + self.text]
+
+
+class PlantUMLNote(PlantUMLLine):
+    pass
+
+
+class PlantUMLNode:
+    """
+    A node (class, object..) with its id, the name used by the edges, and its declaration line. The members
+    of a node with a body are in braces after its declaration.
+    """
+    def __init__(self, node_id, declaration, members=None):
+        self.node_id = node_id
+        self.declaration = declaration
+        self.members = members
+
+    def lines(self, indent, depth):
+        if self.members is None:
+            return [indent * depth + self.declaration]
+        return [indent * depth + self.declaration + '{'] + \
+            [indent * (depth+1) + member for member in self.members] + \
+            [indent * depth + '}']
+
+
+class PlantUMLEdge:
+    def __init__(self, source, relation, target, label=None):
+        self.source = source
+        self.relation = relation
+        self.target = target
+        self.label = label
+
+    def lines(self, indent, depth):
+        parts = [self.source, self.relation, self.target] + ([self.label] if self.label is not None else [])
+        return [indent * depth + ' '.join(str(part) for part in parts)]
+
+
+class PlantUMLContainer:
+    """
+    A package, folder.. with its opening line (up to the brace) and its elements.
+    """
+    def __init__(self, name, opening, elements=None):
+        self.name = name
+        self.opening = opening
+        self.elements = elements if elements is not None else []
+
+    def lines(self, indent, depth):
+        lines = [indent * depth + self.opening]
+        for element in self.elements:
+            lines.extend(element.lines(indent, depth+1))
+        lines.append(indent * depth + '}')
+        return lines
+
+
+class PlantUMLDiagram:
+    def __init__(self, header=('@startuml',), indent=''):
+        self.header = list(header)
+        self._indent = indent
+        self._root = PlantUMLContainer(None, None)
+        self._open_containers = [self._root]
+
+    @property
+    def elements(self):
+        return self._root.elements
+
+    def add(self, element):
+        self._open_containers[-1].elements.append(element)
+        return element
+
+    def start_container(self, name, opening):
+        self._open_containers.append(self.add(PlantUMLContainer(name, opening)))
+
+    def end_container(self):
+        self._open_containers.pop()
+
+    def _walk(self, elements):
+        for element in elements:
+            yield element
+            if isinstance(element, PlantUMLContainer):
+                yield from self._walk(element.elements)
+
+    def nodes(self):
+        return [element for element in self._walk(self.elements) if isinstance(element, PlantUMLNode)]
+
+    def edges(self):
+        return [element for element in self._walk(self.elements) if isinstance(element, PlantUMLEdge)]
+
+    def lines(self):
+        lines = list(self.header)
+        for element in self.elements:
+            lines.extend(element.lines(self._indent, 0))
+        lines.append('@enduml')
+        return lines
+
+    def to_string(self):
+        return '\n'.join(self.lines()) + '\n'
+
+    @staticmethod
+    def _group_of_element(element, group_of):
+        if isinstance(element, PlantUMLNode):
+            return group_of.get(element.node_id)
+        source_group = group_of.get(element.source)
+        return source_group if source_group == group_of.get(element.target) else None
+
+    def _split_elements(self, elements, group_of, number_of_groups, is_root):
+        groups_elements = [[] for _ in range(number_of_groups)]
+        for element in elements:
+            if isinstance(element, (PlantUMLNode, PlantUMLEdge)):
+                group = self._group_of_element(element, group_of)
+                if group is not None:
+                    groups_elements[group].append(element)
+            elif isinstance(element, PlantUMLContainer):
+                containers_elements = self._split_elements(element.elements, group_of, number_of_groups, False)
+                for group, container_elements in enumerate(containers_elements):
+                    if any(not isinstance(kept_element, PlantUMLLine) for kept_element in container_elements):
+                        groups_elements[group].append(PlantUMLContainer(element.name, element.opening, container_elements))
+            elif not is_root:
+                for group_elements in groups_elements:
+                    group_elements.append(element)
+        return groups_elements
+
+    def split(self, groups_of_node_ids):
+        """
+        Splits the diagram, in one pass over its elements, into a diagram per group of node ids, with the nodes
+        of the group, the edges between them, and their containers (with the notes and lines of the
+        containers). The notes and lines outside of containers are not kept.
+        :param groups_of_node_ids: disjoint groups of node ids
+        :return: list of PlantUMLDiagram
+        """
+        group_of = {node_id: group for group, node_ids in enumerate(groups_of_node_ids) for node_id in node_ids}
+        diagrams = []
+        for elements in self._split_elements(self.elements, group_of, len(groups_of_node_ids), True):
+            diagram = PlantUMLDiagram(self.header, self._indent)
+            diagram.elements.extend(elements)
+            diagrams.append(diagram)
+        return diagrams
+
+    def subgraph(self, node_ids):
+        return self.split([node_ids])[0]
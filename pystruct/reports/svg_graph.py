@@ -0,0 +1,254 @@
+"""
+In-process drawing of directed graphs (e.x. import graphs) as SVG, with a layered (Sugiyama style) layout:
+the edges that close cycles are reversed, the nodes are placed in layers so that the edges go down, the
+nodes of every layer are ordered to reduce the crossings, and the layers that are too wide are wrapped in
+more rows.
+"""
+from html import escape
+
+import numpy as np
+
+from pystruct.utils.graph_structures import Graph, label_ranks
+
+CHAR_WIDTH = 7
+NODE_HEIGHT = 24
+NODE_PADDING = 12
+NODE_GAP = 16
+ROW_GAP = 56
+MARGIN = 20
+DEFAULT_NODE_COLOR = '#eeeeee'
+DEFAULT_EDGE_COLOR = '#555555'
+
+
+def _color(colors, key, default):
+    """
+    :return: the color of the key, or the default color if there is none (missing, None or NaN)
+    """
+    color = colors.get(key)
+    return color if isinstance(color, str) and color else default
+
+
+class LayeredLayout:
+    """
+    Layered layout of a Graph. The edges go from a layer to a later one, except for the edges inside the
+    strongly connected components (cycles), which may go up: the nodes of a component are layered in the
+    order of their ids.
+    :param groups: the group of every node id (e.x. the package of a module), to keep the nodes of a group
+    next to each other in their layer, or None
+    """
+    def __init__(self, graph, groups=None, widths=None, max_row_width=4000, sweeps=8):
+        self._graph = graph
+        number_of_nodes = graph.size()
+        self.widths = np.asarray(widths if widths is not None else np.ones(number_of_nodes), dtype=float)
+        self.groups = label_ranks(groups) if groups is not None and number_of_nodes else np.zeros(number_of_nodes, dtype=np.int64)
+
+        sources, targets = graph.edge_ids()
+        not_self_edges = sources != targets
+        self.sources, self.targets = sources[not_self_edges], targets[not_self_edges]
+
+        # the order of the nodes in topological order of the components, then by id
+        order = np.lexsort((np.arange(number_of_nodes), graph.strongly_connected_components()))
+        positions = np.empty(number_of_nodes, dtype=np.int64)
+        positions[order] = np.arange(number_of_nodes)
+        self.is_back_edge = positions[self.sources] > positions[self.targets]
+        self._dag_sources = np.where(self.is_back_edge, self.targets, self.sources)
+        self._dag_targets = np.where(self.is_back_edge, self.sources, self.targets)
+
+        self.layers = self._layers(positions)
+        self.orders = self._orders(sweeps)
+        self.rows, self.x = self._rows(max_row_width)
+
+    def _layers(self, positions):
+        """
+        Longest path layering, then the nodes nothing points to are moved down, next to their first successor.
+        """
+        number_of_nodes = len(positions)
+        layers = [0]*number_of_nodes
+        edge_order = np.argsort(positions[self._dag_sources], kind='stable')
+        for source, target in zip(self._dag_sources[edge_order].tolist(), self._dag_targets[edge_order].tolist()):
+            layers[target] = max(layers[target], layers[source]+1)
+        layers = np.array(layers, dtype=np.int64)
+
+        if len(self._dag_sources):
+            first_successor_layers = np.full(number_of_nodes, np.iinfo(np.int64).max)
+            np.minimum.at(first_successor_layers, self._dag_sources, layers[self._dag_targets])
+            is_top = (np.bincount(self._dag_targets, minlength=number_of_nodes) == 0) & \
+                (np.bincount(self._dag_sources, minlength=number_of_nodes) > 0)
+            layers[is_top] = first_successor_layers[is_top] - 1
+        return layers
+
+    def _orders(self, sweeps):
+        """
+        Barycenter heuristic: the nodes of a layer are sorted by the mean relative position of their
+        neighbours, with the groups sorted by the mean of their nodes.
+        :return: numpy array with the position of every node id in its layer
+        """
+        number_of_nodes = len(self.layers)
+        layer_sizes = np.bincount(self.layers, minlength=1)
+        neighbours = np.concatenate([self._dag_sources, self._dag_targets])
+        neighbours_of = np.concatenate([self._dag_targets, self._dag_sources])
+        number_of_neighbours = np.bincount(neighbours_of, minlength=number_of_nodes)
+
+        keys = np.zeros(number_of_nodes)
+        orders = self._sort_in_layers(keys)
+        for _ in range(sweeps):
+            relative_positions = (orders + .5) / layer_sizes[self.layers]
+            sums = np.bincount(neighbours_of, weights=relative_positions[neighbours], minlength=number_of_nodes)
+            keys = np.where(number_of_neighbours > 0, sums / np.maximum(number_of_neighbours, 1), relative_positions)
+            new_orders = self._sort_in_layers(keys)
+            if np.array_equal(new_orders, orders):
+                break
+            orders = new_orders
+        return orders
+
+    def _sort_in_layers(self, keys):
+        number_of_nodes = len(self.layers)
+        _, layer_groups = np.unique(np.stack([self.layers, self.groups], axis=1).reshape(-1, 2), axis=0,
+                                    return_inverse=True)
+        layer_groups = layer_groups.reshape(-1)
+        group_keys = np.bincount(layer_groups, weights=keys) / np.bincount(layer_groups)
+        node_order = np.lexsort((np.arange(number_of_nodes), keys, self.groups, group_keys[layer_groups], self.layers))
+
+        orders = np.empty(number_of_nodes, dtype=np.int64)
+        layer_starts = np.searchsorted(self.layers[node_order], self.layers[node_order], side='left')
+        orders[node_order] = np.arange(number_of_nodes) - layer_starts
+        return orders
+
+    def _rows(self, max_row_width):
+        """
+        :return: (row of every node id, x of the left side of every node id), the rows of the layers that are
+        wider than `max_row_width` are wrapped
+        """
+        number_of_nodes = len(self.layers)
+        rows, x = np.zeros(number_of_nodes, dtype=np.int64), np.zeros(number_of_nodes)
+        row, previous_layer, row_width = -1, None, 0.
+        for node_id in np.lexsort((self.orders, self.layers)).tolist():
+            layer, width = self.layers[node_id], self.widths[node_id]
+            if layer != previous_layer or (row_width > 0 and row_width + width > max_row_width):
+                row, row_width, previous_layer = row+1, 0., layer
+            rows[node_id], x[node_id] = row, row_width
+            row_width += width + NODE_GAP
+
+        # the rows are centered
+        right_sides = x + self.widths
+        row_widths = np.zeros(row+1)
+        np.maximum.at(row_widths, rows, right_sides)
+        x += (row_widths.max() - row_widths[rows]) / 2 if number_of_nodes else 0
+        return rows, x
+
+
+class SVGGraph:
+    """
+    SVG drawing of a directed graph, with the nodes in a LayeredLayout and the edges as curves with an
+    arrow at the node they point to.
+    :param node_colors: dict with the fill color of the nodes
+    :param edge_colors: dict with the color of the edges (tuples of the nodes)
+    :param group_of: dict with the group of the nodes (e.x. the package of a module); the nodes of a group
+    are drawn next to each other, in a box with the name of the group
+    :param nodes: more nodes to draw, that may not be in the edges
+    :param stub_nodes: nodes drawn as stubs (dashed), e.x. the nodes of other parts of a partitioned graph
+    """
+    def __init__(self, edges, node_colors=None, edge_colors=None, group_of=None, group_colors=None, nodes=(),
+                 stub_nodes=(), max_row_width=4000):
+        # the nodes are added as self edges, which are not drawn
+        self.graph = Graph(list(edges) + [(node, node) for node in nodes])
+        self._node_colors = node_colors or {}
+        self._edge_colors = edge_colors or {}
+        self._group_of = group_of
+        self._group_colors = group_colors or {}
+        self._stub_nodes = set(stub_nodes)
+
+        self._nodes = [self.graph.node(node_id) for node_id in range(self.graph.size())]
+        self.labels = [str(node) for node in self._nodes]
+        widths = [len(label) * CHAR_WIDTH + 2 * NODE_PADDING for label in self.labels]
+        groups = [group_of.get(node) for node in self._nodes] if group_of is not None else None
+        self.layout = LayeredLayout(self.graph, groups, widths, max_row_width)
+
+    def _node_boxes(self):
+        """
+        :return: (x, y) of the top left corner of every node id
+        """
+        offset_y = NODE_HEIGHT if self._group_of is not None else 0  # room for the names of the groups
+        return self.layout.x + MARGIN, self.layout.rows * (NODE_HEIGHT + ROW_GAP + offset_y) + MARGIN + offset_y
+
+    def _edge_paths(self, x, y):
+        widths = self.layout.widths
+        center_x = x + widths / 2
+        paths = {}
+        for edge in dict.fromkeys(self.graph.edges):
+            source, target = self.graph.node_id(edge[0]), self.graph.node_id(edge[1])
+            if source == target:
+                continue
+            x1, x2 = center_x[source], center_x[target]
+            if y[source] < y[target]:
+                y1, y2 = y[source] + NODE_HEIGHT, y[target]
+            else:
+                y1, y2 = y[source], y[target] + NODE_HEIGHT
+            middle_y = (y1 + y2) / 2
+            color = _color(self._edge_colors, edge, DEFAULT_EDGE_COLOR)
+            paths.setdefault(color, []).append(
+                f'<path d="M{x1:.1f},{y1:.1f} C{x1:.1f},{middle_y:.1f} {x2:.1f},{middle_y:.1f} {x2:.1f},{y2:.1f}"/>')
+        return paths
+
+    def _group_boxes(self, x, y):
+        if self._group_of is None:
+            return []
+        boxes = []
+        node_groups = [self._group_of.get(node) for node in self._nodes]
+        node_order = np.lexsort((self.layout.orders, self.layout.rows)).tolist()
+        start = 0
+        for position in range(1, len(node_order)+1):
+            first, previous = node_order[start], node_order[position-1]
+            if position < len(node_order):
+                current = node_order[position]
+                if self.layout.rows[current] == self.layout.rows[first] and node_groups[current] == node_groups[first]:
+                    continue
+            group = node_groups[first]
+            if group is not None:
+                left, right = x[first] - NODE_GAP / 4, x[previous] + self.layout.widths[previous] + NODE_GAP / 4
+                top = y[first] - NODE_HEIGHT
+                color = _color(self._group_colors, group, DEFAULT_NODE_COLOR)
+                boxes.append(
+                    f'<g class="group"><title>{escape(str(group))}</title>'
+                    f'<rect x="{left:.1f}" y="{top:.1f}" width="{right-left:.1f}" height="{2*NODE_HEIGHT+4}" '
+                    f'rx="4" fill="{color}" fill-opacity="0.35" stroke="{color}"/>'
+                    f'<text x="{left+4:.1f}" y="{top+NODE_HEIGHT*.7:.1f}">{escape(str(group))}</text></g>')
+            start = position
+        return boxes
+
+    def svg(self, title=''):
+        x, y = self._node_boxes()
+        width = (x + self.layout.widths).max() + MARGIN if self.graph.size() else 2 * MARGIN
+        height = y.max() + NODE_HEIGHT + MARGIN if self.graph.size() else 2 * MARGIN
+
+        elements = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+                    f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="monospace" font-size="11">']
+        if title:
+            elements.append(f'<title>{escape(title)}</title>')
+
+        paths = self._edge_paths(x, y)
+        elements.append('<defs>')
+        for i, color in enumerate(paths):
+            elements.append(f'<marker id="arrow{i}" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" '
+                            f'markerHeight="8" orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="{color}"/></marker>')
+        elements.append('</defs>')
+
+        elements.extend(self._group_boxes(x, y))
+        for i, (color, color_paths) in enumerate(paths.items()):
+            elements.append(f'<g class="edges" fill="none" stroke="{color}" stroke-width="1.5" marker-end="url(#arrow{i})">')
+            elements.extend(color_paths)
+            elements.append('</g>')
+
+        elements.append('<g class="nodes">')
+        for node_id, label in enumerate(self.labels):
+            color = _color(self._node_colors, self._nodes[node_id], DEFAULT_NODE_COLOR)
+            stub_style = ' fill-opacity="0.4" stroke-dasharray="4 2"' if self._nodes[node_id] in self._stub_nodes else ''
+            elements.append(
+                f'<g><title>{escape(label)}</title>'
+                f'<rect x="{x[node_id]:.1f}" y="{y[node_id]:.1f}" width="{self.layout.widths[node_id]:.0f}" '
+                f'height="{NODE_HEIGHT}" rx="3" fill="{color}" stroke="#333333"{stub_style}/>'
+                f'<text x="{x[node_id]+NODE_PADDING:.1f}" y="{y[node_id]+NODE_HEIGHT*.65:.1f}">{escape(label)}</text></g>')
+        elements.append('</g>')
+
+        elements.append('</svg>')
+        return '\n'.join(elements)
@@ -4,8 +4,12 @@ from functools import cached_property, lru_cache
 
 import pandas as pd
 
+from pystruct.reports.plantuml_model import PlantUMLDiagram, PlantUMLEdge, PlantUMLLine, PlantUMLNode, PlantUMLNote
 from pystruct.visitors.visitor import TreeNodeVisitor
 
+# the packages with more classes are split in documents of at most this number of classes
+MAX_CLASSES_PER_DOCUMENT = 60
+
 
 class UMLClass:
     def __init__(self, node):
@@ -82,132 +86,95 @@ class UMLClass:
 
 class PlantUMLDocument:
     def __init__(self):
-        self._res_string = ""
-        self._ident = 0
-        self._start_uml()
-
-    def _add_line(self, line=''):
-        self._res_string += ("\t" * self._ident) + line + "\n"
-
-    def _end_brackets(self):
-        self._ident -= 1
-        self._add_line('}')
-
-    def _start_uml(self):
-        self._add_line('@startuml')
-        self._add_line('left to right direction')
-        self._add_line('set separator none')
-        # self._add_line('scale max 1024 width')
-
-    def _end_uml(self):
-        self._add_line('@enduml')
-
-    def _start_class(self, class_name, abstract=False):
-        self._add_line(f"{'abstract' if abstract else 'class'} {class_name}" + "{")
-        self._ident += 1
+        self._diagram = PlantUMLDiagram(header=['@startuml', 'left to right direction', 'set separator none'],
+                                        indent='\t')
+        # self._diagram.header.append('scale max 1024 width')
 
     def _start_module(self, module_name):
-        self._add_line(f"package {module_name} <<Rectangle>>" + "{")
-        self._ident += 1
+        self._diagram.start_container(module_name, f"package {module_name} <<Rectangle>>" + "{")
 
     def _start_package(self, package_name):
-        self._add_line(f"package {package_name} <<Folder>>" + "{")
-        self._ident += 1
+        self._diagram.start_container(package_name, f"package {package_name} <<Folder>>" + "{")
 
     def add_package(self, package_name, package):
         self._start_package(package_name)
         for module_name, module in package.items():
             self.add_module(module_name, module)
-        self._end_brackets()
+        self._diagram.end_container()
 
     def add_module(self, module_name, module):
         self._start_module(module_name)
         for _class in module:
             self.add_class(_class)
-        self._end_brackets()
+        self._diagram.end_container()
 
     def add_class(self, class_obj):
-        self._start_class(class_obj.name_plus_inheritances, abstract=class_obj.is_abstract)
-        self.add_fields(class_obj.fields)
-        self._add_line("==")
-        self.add_funtions(class_obj.public_functions)
-        self._end_brackets()
-        self._add_line()
+        members = ["{field} " + field for field in class_obj.fields] + ["=="] + \
+                  ["{method} " + function + "()" for function in class_obj.public_functions]
+        self._diagram.add(PlantUMLNode(class_obj.name, self._class_declaration(class_obj.name_plus_inheritances,
+                                                                               class_obj.is_abstract), members))
+        self._diagram.add(PlantUMLLine())
 
-    def add_fields(self, fields):
-        for field in fields:
-            self._add_line("{field} " + field)
-
-    def add_funtions(self, functions):
-        for function in functions:
-            self._add_line("{method} " + function + "()")
+    @staticmethod
+    def _class_declaration(class_name, abstract=False):
+        return f"{'abstract' if abstract else 'class'} {class_name}"
 
     def add_class_def(self, classname, abstract=False):
-        self._add_line(f"{'abstract' if abstract else 'class'} {classname}")
+        self._diagram.add(PlantUMLNode(classname, self._class_declaration(classname, abstract)))
 
     def add_class_superclass_of_class(self, superclass_name, subclass_name):
-        self._add_line(f"{superclass_name} <|-- {subclass_name}")
+        self._diagram.add(PlantUMLEdge(superclass_name, '<|--', subclass_name))
 
     def add_object(self, object_name):
-        self._add_line(f"object {object_name}")
+        self._diagram.add(PlantUMLNode(object_name, f"object {object_name}"))
 
     def add_object_relation(self, obj1, obj2, relation_str='-->', message=None):
         info_message = f": {message}" if message else ''
-        self._add_line(f"{obj1} {relation_str} {obj2} {info_message}")
+        self._diagram.add(PlantUMLEdge(obj1, relation_str, obj2, info_message))
+
+    def diagram(self):
+        return self._diagram
 
     def finish_and_return(self):
-        self._end_uml()
-        return self._res_string
+        return self._diagram.to_string()
 
 
 class PlantUMLPackagesAndModulesBuilder:
     def __init__(self, direction='left to right direction', separator='set separator none'):
-        self._res_string = ""
-        self._direction = direction
-        self._separator = separator
+        self._diagram = PlantUMLDiagram(header=['@startuml', 'skinparam BackgroundColor #dedede', separator, direction])
+        # self._diagram.header.append('skinparam ObjectFontSize 10')
 
-        self._start_uml()
-
-    def _add_line(self, line=''):
-        self._res_string += line + "\n"
-
-    def _start_uml(self):
-        self._add_line('@startuml')
-        self._add_line('skinparam BackgroundColor #dedede')
-        # self._add_line('skinparam ObjectFontSize 10')
-        self._add_line(self._separator)
-        self._add_line(self._direction)
-
-    def _end_uml(self):
-        self._add_line('@enduml')
+    @staticmethod
+    def _args_to_string(args):
+        return ' '.join([str(arg) for arg in args])
 
     def add_object(self, type, name, *args):
-        args_str = ' '.join([str(arg) for arg in args])
-        self._add_line(f"{type} {name} {args_str}")
+        self._diagram.add(PlantUMLNode(name, f"{type} {name} {self._args_to_string(args)}"))
 
     def start_container(self, type, name, *args):
-        args_str = ' '.join([str(arg) for arg in args])
-        self._add_line(f"{type} {name} {args_str} {{")
+        self._diagram.start_container(name, f"{type} {name} {self._args_to_string(args)} {{")
 
     def end_container(self):
-        self._add_line('}')
+        self._diagram.end_container()
 
     def add_relation(self, obj_a, relation_type, obj_b, *args):
-        args_str = ' '.join([str(arg) for arg in args])
-        self._add_line(f"{obj_a} {relation_type} {obj_b} {args_str}")
+        self._diagram.add(PlantUMLEdge(obj_a, relation_type, obj_b, self._args_to_string(args)))
 
     def add_note(self, note):
-        self._add_line(note)
+        self._diagram.add(PlantUMLNote(note))
+
+    def diagram(self):
+        return self._diagram
 
     def finish_and_return(self):
-        self._end_uml()
-        return self._res_string
+        return self._diagram.to_string()
 
 
 class UMLClassBuilder(TreeNodeVisitor):
-    def __init__(self, seperate_packages=True):
+    def __init__(self, seperate_packages=True, max_classes_per_document=MAX_CLASSES_PER_DOCUMENT):
         self._packages = {}
         self._seperate_packages = seperate_packages
+        self._max_classes_per_document = max_classes_per_document
 
     def add_package(self, package_name):
         if package_name not in self._packages.keys():
@@ -233,12 +200,30 @@ class UMLClassBuilder(TreeNodeVisitor):
 
         return uml_doc.finish_and_return()
 
+    def _split_package(self, package_dict):
+        """
+        :return: list of parts of the package (dicts of modules and their classes) with at most
+        max_classes_per_document classes: the modules in order, and the modules with more classes in chunks
+        """
+        parts, part_size = [{}], 0
+        for module_name, classes in package_dict.items():
+            chunks = [classes[start:start+self._max_classes_per_document]
+                      for start in range(0, len(classes), self._max_classes_per_document)] or [classes]
+            for chunk in chunks:
+                if part_size > 0 and part_size + len(chunk) > self._max_classes_per_document:
+                    parts, part_size = parts + [{}], 0
+                parts[-1].setdefault(module_name, []).extend(chunk)
+                part_size += len(chunk)
+        return parts
+
     def one_doc_per_package(self):
         uml_docs = {}
         for package_name, package_dict in self._packages.items():
-            uml_doc = PlantUMLDocument()
-            uml_doc.add_package(package_name, package_dict)
-            uml_docs[package_name] = uml_doc.finish_and_return()
+            parts = self._split_package(package_dict)
+            for i, part in enumerate(parts):
+                uml_doc = PlantUMLDocument()
+                uml_doc.add_package(package_name, part)
+                uml_docs[package_name if len(parts) == 1 else f"{package_name} ({i+1}/{len(parts)})"] = uml_doc.finish_and_return()
 
         return OrderedDict(uml_docs)
 
@@ -264,6 +249,9 @@ class UMLClassRelationBuilder(TreeNodeVisitor):
     def visit_class(self, node):
         self.add_class(node)
 
+    def diagram(self):
+        return self._uml_doc.diagram()
+
     def result(self):
         return self._uml_doc.finish_and_return()
 
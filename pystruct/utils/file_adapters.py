@@ -41,6 +41,9 @@ class AbstractFileAdapter(abc.ABC):
         self._cached_data = data
         self.save_to_file(data, self.filepath, **self._save_kwargs if self._save_kwargs else {})
 
+    def exists(self):
+        return self._cached_data is not None or os.path.exists(self.filepath)
+
     def delete_file(self):
         if os.path.exists(self.filepath):
             logs.log_disk_ops(f"[DISK] Deleting {self.filepath}...")
@@ -0,0 +1,156 @@
+"""
+Partitioning of graphs that are too big for one diagram into parts of at most `max_nodes` nodes and
+`max_edges` edges (the edges with at least one node in the part). The nodes are split by the hierarchy of
+their dotted names first (packages, then subpackages, modules..), and the parts that can not be split so
+are clustered by label propagation, then cut in chunks of nodes in breadth first order. Small parts are
+merged back with their neighbours, as long as they fit.
+"""
+from collections import Counter, deque, namedtuple
+
+import numpy as np
+
+MAX_PARTITION_NODES = 150
+MAX_PARTITION_EDGES = 400
+
+# the nodes of the part, the nodes of other parts that share edges with them, and those edges
+GraphPartition = namedtuple('GraphPartition', ['nodes', 'stub_nodes', 'edges'])
+
+
+class GraphPartitioner:
+    def __init__(self, graph, max_nodes=MAX_PARTITION_NODES, max_edges=MAX_PARTITION_EDGES, separator='.'):
+        self._graph = graph
+        self._max_nodes = max_nodes
+        self._max_edges = max_edges
+        self._name_parts = [str(graph.node(node_id)).split(separator) for node_id in range(graph.size())]
+
+        self._sources, self._targets = graph.edge_ids()
+        number_of_nodes = graph.size()
+        self._in_part = np.zeros(number_of_nodes, dtype=bool)
+        # undirected adjacency (CSR), for the clustering
+        neighbours_of, neighbours = np.concatenate([self._sources, self._targets]), np.concatenate([self._targets, self._sources])
+        self._indptr = np.concatenate([[0], np.cumsum(np.bincount(neighbours_of, minlength=number_of_nodes))])
+        self._indices = neighbours[np.argsort(neighbours_of, kind='stable')]
+
+    def _number_of_edges(self, node_ids):
+        self._in_part[node_ids] = True
+        number_of_edges = int((self._in_part[self._sources] | self._in_part[self._targets]).sum())
+        self._in_part[node_ids] = False
+        return number_of_edges
+
+    def _fits(self, node_ids):
+        return len(node_ids) <= self._max_nodes and self._number_of_edges(node_ids) <= self._max_edges
+
+    def _split_by_hierarchy(self, node_ids, depth):
+        """
+        :return: (groups of the node ids with the same first names after the common ones, their depth), or
+        None if the names can not be split
+        """
+        max_depth = max(len(self._name_parts[node_id]) for node_id in node_ids)
+        while depth < max_depth:
+            depth += 1
+            groups = {}
+            for node_id in node_ids:
+                groups.setdefault(tuple(self._name_parts[node_id][:depth]), []).append(node_id)
+            if len(groups) > 1:
+                return [groups[prefix] for prefix in sorted(groups)], depth
+        return None
+
+    def _split_by_clustering(self, node_ids, iterations=10):
+        """
+        Label propagation: every node takes the most frequent label of its neighbours in the part, the
+        clusters are the nodes with the same label. The clusters that are too big are cut in chunks of nodes
+        in breadth first order.
+        """
+        in_part = set(node_ids)
+        labels = {node_id: node_id for node_id in node_ids}
+        for _ in range(iterations):
+            changed = False
+            for node_id in node_ids:
+                neighbours = [neighbour for neighbour in self._indices[self._indptr[node_id]:self._indptr[node_id+1]].tolist()
+                              if neighbour in in_part]
+                if not neighbours:
+                    continue
+                counts = Counter(labels[neighbour] for neighbour in neighbours)
+                label = min(counts, key=lambda _label: (-counts[_label], _label))
+                if label != labels[node_id]:
+                    labels[node_id], changed = label, True
+            if not changed:
+                break
+
+        clusters = {}
+        for node_id in node_ids:
+            clusters.setdefault(labels[node_id], []).append(node_id)
+        if len(clusters) > 1:
+            return list(clusters.values())
+
+        ordered = self._breadth_first_order(node_ids, in_part)
+        chunk_size = max(1, min(self._max_nodes, (len(ordered)+1) // 2))
+        return [ordered[start:start+chunk_size] for start in range(0, len(ordered), chunk_size)]
+
+    def _breadth_first_order(self, node_ids, in_part):
+        visited, ordered = set(), []
+        for root in node_ids:
+            if root in visited:
+                continue
+            visited.add(root)
+            queue = deque([root])
+            while queue:
+                node_id = queue.popleft()
+                ordered.append(node_id)
+                for neighbour in self._indices[self._indptr[node_id]:self._indptr[node_id+1]].tolist():
+                    if neighbour in in_part and neighbour not in visited:
+                        visited.add(neighbour)
+                        queue.append(neighbour)
+        return ordered
+
+    def _merge_small_groups(self, groups):
+        merged = []
+        for group in groups:
+            if merged and self._fits(merged[-1] + group):
+                merged[-1] = merged[-1] + group
+            else:
+                merged.append(group)
+        return merged
+
+    def _partition(self, node_ids, depth):
+        if len(node_ids) <= 1 or self._fits(node_ids):
+            return [node_ids]
+
+        split = self._split_by_hierarchy(node_ids, depth)
+        if split is None:
+            groups, depth = self._split_by_clustering(node_ids), max(len(self._name_parts[node_id]) for node_id in node_ids)
+        else:
+            groups, depth = split
+
+        parts = []
+        for group in self._merge_small_groups(groups):
+            parts.extend(self._partition(group, depth))
+        return parts
+
+    def partitions(self):
+        """
+        :return: list of GraphPartition
+        """
+        if self._graph.size() == 0:
+            return []
+        node_ids_parts = self._partition(list(range(self._graph.size())), 0)
+
+        part_of = np.empty(self._graph.size(), dtype=np.int64)
+        for part, node_ids in enumerate(node_ids_parts):
+            part_of[node_ids] = part
+
+        edges = self._graph.edges
+        partitions = []
+        for part, node_ids in enumerate(node_ids_parts):
+            edge_indexes = np.flatnonzero((part_of[self._sources] == part) | (part_of[self._targets] == part))
+            stub_ids = set(self._sources[edge_indexes].tolist()) | set(self._targets[edge_indexes].tolist())
+            partitions.append(GraphPartition(
+                nodes=[self._graph.node(node_id) for node_id in node_ids],
+                stub_nodes=[self._graph.node(node_id) for node_id in sorted(stub_ids - set(node_ids))],
+                edges=[edges[edge_index] for edge_index in edge_indexes.tolist()],
+            ))
+        return partitions
+
+
+def partition_graph(graph, max_nodes=MAX_PARTITION_NODES, max_edges=MAX_PARTITION_EDGES, separator='.'):
+    return GraphPartitioner(graph, max_nodes, max_edges, separator).partitions()
@@ -1,18 +1,58 @@
-from itertools import chain
+import base64
+import zlib
+from collections import deque
 
-import networkx as nx
+import numpy as np
+import pandas as pd
+
+
+class DisjointSets:
+    """
+    Union-find over the integers 0..size-1, with path halving. The root of a set is its smallest element.
+    """
+    def __init__(self, size):
+        self._parents = list(range(size))
+
+    def find(self, element):
+        parents = self._parents
+        while parents[element] != element:
+            parents[element] = parents[parents[element]]
+            element = parents[element]
+        return element
+
+    def union(self, element_1, element_2):
+        root_1, root_2 = self.find(element_1), self.find(element_2)
+        if root_1 < root_2:
+            self._parents[root_2] = root_1
+        elif root_2 < root_1:
+            self._parents[root_1] = root_2
+
+    def roots(self):
+        return np.array([self.find(element) for element in range(len(self._parents))], dtype=np.int64)
 
 
 class Graph:
+    """
+    Directed graph of the nodes of the edges. The nodes get integer ids in order of appearance, and the
+    adjacency is kept in compressed sparse row (CSR) arrays: the successors of the node `i` are
+    `indices[indptr[i]:indptr[i+1]]`.
+    """
     def __init__(self, edges):
         self._edges = edges
-        self._nodes = set(chain.from_iterable(self._edges))
-        self._ngraph = nx.DiGraph()
+        self._node_ids = {}
+        node_ids = [self._node_ids.setdefault(node, len(self._node_ids)) for edge in edges for node in edge]
+        self._nodes = list(self._node_ids)
 
-        self._ngraph.add_nodes_from(self._nodes)
+        self._sources = np.array(node_ids[0::2], dtype=np.int64)
+        self._targets = np.array(node_ids[1::2], dtype=np.int64)
+        self._indptr, self._indices = self._csr(self._sources, self._targets, len(self._nodes))
 
-        for a, b in self._edges:
-            self._ngraph.add_edge(a, b)
+    @staticmethod
+    def _csr(sources, targets, number_of_nodes):
+        indptr = np.zeros(number_of_nodes+1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=number_of_nodes), out=indptr[1:])
+        indices = targets[np.argsort(sources, kind='stable')]
+        return indptr, indices
 
     @property
     def nodes(self):
@@ -22,18 +62,308 @@ class Graph:
     def edges(self):
         return self._edges
 
+    @property
+    def number_of_nodes(self):
+        return len(self._nodes)
+
+    def node_id(self, node):
+        return self._node_ids[node]
+
+    def node(self, node_id):
+        return self._nodes[node_id]
+
+    def csr_adjacency(self):
+        """
+        :return: (indptr, indices) numpy arrays of the successors of every node id
+        """
+        return self._indptr, self._indices
+
+    def edge_ids(self):
+        """
+        :return: (sources, targets) numpy arrays with the node ids of every edge
+        """
+        return self._sources, self._targets
+
+    def successors(self, node):
+        node_id = self._node_ids[node]
+        return [self._nodes[successor_id] for successor_id in self._indices[self._indptr[node_id]:self._indptr[node_id+1]]]
+
     def _filter_edges_for_subset_of_nodes(self, subset_of_nodes):
-        subset_of_nodes = set(subset_of_nodes)
-        filtered_edges = [edge for edge in self.edges if len(subset_of_nodes.intersection(edge))>0]
-        return filtered_edges
+        subset_of_node_ids = [self._node_ids[node] for node in subset_of_nodes if node in self._node_ids]
+        in_subset = np.zeros(len(self._nodes), dtype=bool)
+        in_subset[subset_of_node_ids] = True
+        edge_indexes = np.flatnonzero(in_subset[self._sources] | in_subset[self._targets])
+        return [self._edges[edge_index] for edge_index in edge_indexes]
+
+    def component_labels(self):
+        """
+        :return: numpy array with the connected component (of the undirected graph) of every node id, the
+        components are numbered in order of appearance of their first node
+        """
+        disjoint_sets = DisjointSets(len(self._nodes))
+        for source, target in zip(self._sources.tolist(), self._targets.tolist()):
+            disjoint_sets.union(source, target)
+        _, labels = np.unique(disjoint_sets.roots(), return_inverse=True)
+        return labels.reshape(-1)
+
+    def strongly_connected_components(self):
+        """
+        Tarjan's algorithm, iterative (no recursion limit on deep graphs), in O(nodes + edges).
+        :return: numpy array with the strongly connected component of every node id. The components are
+        numbered in topological order: every edge goes from a component to itself or to a later one.
+        """
+        indptr, indices = self._indptr.tolist(), self._indices.tolist()
+        number_of_nodes = len(self._nodes)
+        visit_order, lowlinks = [-1]*number_of_nodes, [0]*number_of_nodes
+        on_stack, labels = [False]*number_of_nodes, [-1]*number_of_nodes
+        stack, number_of_visited, number_of_components = [], 0, 0
+
+        for root in range(number_of_nodes):
+            if visit_order[root] != -1:
+                continue
+            visit_order[root] = lowlinks[root] = number_of_visited
+            number_of_visited += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, indptr[root])]  # nodes being visited, with their next edge
+
+            while work:
+                node, edge = work[-1]
+                if edge < indptr[node+1]:
+                    work[-1] = (node, edge+1)
+                    successor = indices[edge]
+                    if visit_order[successor] == -1:
+                        visit_order[successor] = lowlinks[successor] = number_of_visited
+                        number_of_visited += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append((successor, indptr[successor]))
+                    elif on_stack[successor]:
+                        lowlinks[node] = min(lowlinks[node], visit_order[successor])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+                if lowlinks[node] == visit_order[node]:
+                    member = None
+                    while member != node:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        labels[member] = number_of_components
+                    number_of_components += 1
+
+        # Tarjan's algorithm finds the components in reverse topological order
+        return number_of_components - 1 - np.array(labels, dtype=np.int64)
+
+    def condensation_edges(self, labels):
+        """
+        :param labels: the component of every node id, e.x. from strongly_connected_components
+        :return: (sources, targets, counts) numpy arrays of the distinct edges between different components,
+        with the number of edges of the graph each of them stands for
+        """
+        sources, targets = labels[self._sources], labels[self._targets]
+        between_components = sources != targets
+        pairs = np.stack([sources[between_components], targets[between_components]], axis=1).reshape(-1, 2)
+        unique_pairs, counts = np.unique(pairs, axis=0, return_counts=True)
+        return unique_pairs[:, 0], unique_pairs[:, 1], counts
+
+    def shortest_cycle(self, labels, start):
+        """
+        Breadth first search, inside the component of the node id `start`, for the shortest cycle through it.
+        :return: the nodes of the cycle, starting and ending with the node of `start`, or None if there isn't
+        any (a component of a single node without an edge to itself)
+        """
+        component = labels[start]
+        previous_ids = {start: None}
+        queue = deque([start])
+        while queue:
+            node_id = queue.popleft()
+            for successor_id in self._indices[self._indptr[node_id]:self._indptr[node_id+1]].tolist():
+                if successor_id == start:
+                    cycle = [start]
+                    while node_id is not None:
+                        cycle.append(node_id)
+                        node_id = previous_ids[node_id]
+                    return [self._nodes[cycle_id] for cycle_id in reversed(cycle)]
+                if successor_id not in previous_ids and labels[successor_id] == component:
+                    previous_ids[successor_id] = node_id
+                    queue.append(successor_id)
+        return None
 
     def subgraphs(self):
-        und_graph = self._ngraph.to_undirected()
-        subgraphs_sets = [list(und_graph.subgraph(c).nodes) for c in nx.connected_components(und_graph)]
+        """
+        :return: a Graph of every connected component of the undirected graph, with the edges in the order
+        of the graph, sorted by number of nodes (largest first)
+        """
+        if not self._edges:
+            return []
+
+        edge_labels = self.component_labels()[self._sources]
+        edge_indexes = np.argsort(edge_labels, kind='stable')
+        ends = np.cumsum(np.bincount(edge_labels))
 
-        res_graph_objs = [Graph(self._filter_edges_for_subset_of_nodes(subgraph_nodes)) for subgraph_nodes in subgraphs_sets]
-        res_graph_objs.sort(key=lambda g: len(g.nodes), reverse=True)
+        res_graph_objs = [Graph([self._edges[edge_index] for edge_index in edge_indexes[start:end]])
+                          for start, end in zip(np.concatenate(([0], ends[:-1])), ends)]
+        res_graph_objs.sort(key=lambda g: g.size(), reverse=True)
         return res_graph_objs
 
     def size(self):
-        return len(self.nodes)
\ No newline at end of file
+        return len(self._nodes)
+
+
+def label_ranks(labels):
+    """
+    :param labels: label of every node id (e.x. its name or its package), of any type
+    :return: numpy array with the rank of the label of every node id among the sorted distinct labels (as
+    strings), to sort or group the node ids by label
+    """
+    return np.unique(np.asarray(labels, dtype=object).astype(str), return_inverse=True)[1].reshape(-1)
+
+
+def _bitset_bytes(bitset):
+    return bitset.to_bytes((bitset.bit_length()+7)//8, 'little')
+
+
+def encode_bitset(bitset):
+    """
+    :param bitset: python int, the bit `i` is set if `i` is in the set
+    :return: the compressed bitset as an ascii string
+    """
+    return base64.b64encode(zlib.compress(_bitset_bytes(bitset))).decode('ascii')
+
+
+def decode_bitset(string):
+    return int.from_bytes(zlib.decompress(base64.b64decode(string)), 'little')
+
+
+def bitset_members(bitset):
+    """
+    :return: sorted numpy array of the elements of the bitset
+    """
+    bits = np.unpackbits(np.frombuffer(_bitset_bytes(bitset), dtype=np.uint8), bitorder='little')
+    return np.flatnonzero(bits)
+
+
+class ReachabilityIndex:
+    """
+    Transitive dependencies and dependents of the nodes of a directed graph: a node depends on the nodes it
+    has a path to. The nodes of a strongly connected component (SCC) reach the same nodes, so the
+    dependencies and the dependents are kept once per SCC, as bitsets of SCCs (python ints) computed in one
+    pass over the condensation DAG, in topological order. "Does A depend on B" is a bit test, and the
+    bitsets of an index loaded from a dataframe are decompressed only when a node of their SCC is queried.
+    """
+    def __init__(self, component_nodes, dependencies, dependents):
+        """
+        :param component_nodes: the nodes of every SCC
+        :param dependencies: the bitset of the SCCs every SCC depends on (python int, or compressed string)
+        :param dependents: the bitset of the SCCs that depend on every SCC (python int, or compressed string)
+        """
+        self._component_nodes = component_nodes
+        self._components = {node: component for component, nodes in enumerate(component_nodes) for node in nodes}
+        self._dependencies = list(dependencies)
+        self._dependents = list(dependents)
+
+    @classmethod
+    def from_graph(cls, graph, labels=None):
+        """
+        The bitsets are kept uncompressed: for C SCCs, the index takes up to 2*C^2 bits in memory, e.x. 6MB
+        for 5000 SCCs, 225MB for 30000. The rows are compressed only by `to_dataframe`.
+        :param labels: the SCCs of the graph (see Graph.strongly_connected_components), if already computed
+        """
+        if labels is None:
+            labels = graph.strongly_connected_components()
+        number_of_components = int(labels.max())+1 if len(labels) else 0
+
+        # an SCC depends on itself if it is a cycle: more than one node, or a node with an edge to itself
+        sources, targets = graph.edge_ids()
+        is_cyclic = np.bincount(labels, minlength=number_of_components) > 1
+        is_cyclic[labels[sources[sources == targets]]] = True
+
+        successors = [[] for _ in range(number_of_components)]
+        predecessors = [[] for _ in range(number_of_components)]
+        condensation_sources, condensation_targets, _ = graph.condensation_edges(labels)
+        for source, target in zip(condensation_sources.tolist(), condensation_targets.tolist()):
+            successors[source].append(target)
+            predecessors[target].append(source)
+
+        # the SCCs are numbered in topological order: the successors of an SCC come after it
+        dependencies = [1 << component if is_cyclic[component] else 0 for component in range(number_of_components)]
+        for component in reversed(range(number_of_components)):
+            for successor in successors[component]:
+                dependencies[component] |= dependencies[successor] | (1 << successor)
+
+        dependents = [1 << component if is_cyclic[component] else 0 for component in range(number_of_components)]
+        for component in range(number_of_components):
+            for predecessor in predecessors[component]:
+                dependents[component] |= dependents[predecessor] | (1 << predecessor)
+
+        node_ids = np.argsort(labels, kind='stable')
+        ends = np.cumsum(np.bincount(labels, minlength=number_of_components))
+        component_nodes = [[graph.node(node_id) for node_id in node_ids[start:end].tolist()]
+                           for start, end in zip([0]+ends[:-1].tolist(), ends.tolist())]
+        return cls(component_nodes, dependencies, dependents)
+
+    def __contains__(self, node):
+        return node in self._components
+
+    @staticmethod
+    def _bitset(bitsets, component):
+        bitset = bitsets[component]
+        if isinstance(bitset, str):
+            bitset = bitsets[component] = decode_bitset(bitset)
+        return bitset
+
+    def _nodes_of_bitset(self, bitset, excluded_node):
+        return [node for component in bitset_members(bitset).tolist()
+                for node in self._component_nodes[component] if node != excluded_node]
+
+    def depends_on(self, node, other_node):
+        """
+        :return: True if there is a path from `node` to `other_node` (of one edge or more)
+        """
+        if node not in self._components or other_node not in self._components:
+            return False
+        bitset = self._bitset(self._dependencies, self._components[node])
+        return bool(bitset >> self._components[other_node] & 1)
+
+    def dependencies(self, node):
+        """
+        :return: the nodes `node` depends on, directly or not (except for itself)
+        """
+        return self._nodes_of_bitset(self._bitset(self._dependencies, self._components[node]), node)
+
+    def dependents(self, node):
+        """
+        :return: the nodes that depend on `node`, directly or not (except for itself)
+        """
+        return self._nodes_of_bitset(self._bitset(self._dependents, self._components[node]), node)
+
+    def to_dataframe(self, node_column='node'):
+        """
+        :return: pandas.DataFrame with one row per SCC: its nodes (comma separated), the number of nodes each
+        of them depends on and that depend on it (as in `dependencies` and `dependents`), and the
+        compressed bitsets
+        """
+        components = range(len(self._component_nodes))
+        component_sizes = np.array([len(nodes) for nodes in self._component_nodes], dtype=np.int64)
+        dependencies = [self._bitset(self._dependencies, component) for component in components]
+        dependents = [self._bitset(self._dependents, component) for component in components]
+
+        def number_of_nodes(bitset, component):
+            return int(component_sizes[bitset_members(bitset)].sum()) - (bitset >> component & 1)
+
+        return pd.DataFrame({
+            'scc': np.arange(len(self._component_nodes)),
+            f'{node_column}s': [','.join(nodes) for nodes in self._component_nodes],
+            'number_of_dependencies': [number_of_nodes(bitset, component) for component, bitset in enumerate(dependencies)],
+            'number_of_dependents': [number_of_nodes(bitset, component) for component, bitset in enumerate(dependents)],
+            'dependencies': [encode_bitset(bitset) for bitset in dependencies],
+            'dependents': [encode_bitset(bitset) for bitset in dependents],
+        })
+
+    @classmethod
+    def from_dataframe(cls, df, node_column='node'):
+        component_nodes = [nodes.split(',') for nodes in df[f'{node_column}s'].tolist()]
+        return cls(component_nodes, df['dependencies'].tolist(), df['dependents'].tolist())
@@ -0,0 +1,49 @@
+_NAME = object()  # key of the name that ends at a trie node
+
+
+class DottedNameTrie:
+    """
+    Prefix tree of dotted names (for example module paths 'a.b.c'). It finds the longest of its names
+    that a dotted name starts with in O(number of components of the name). Names match whole components
+    only, so 'a.b' is a prefix of 'a.b.c' but not of 'a.bc', and the empty name is a prefix of all names.
+    """
+
+    def __init__(self, names=()):
+        self._root = {}
+        for name in names:
+            self.add(name)
+
+    @staticmethod
+    def _components(name):
+        return name.split('.') if name else []
+
+    def add(self, name):
+        node = self._root
+        for component in self._components(name):
+            node = node.setdefault(component, {})
+        node[_NAME] = name
+
+    def __contains__(self, name):
+        node = self._root
+        for component in self._components(name):
+            node = node.get(component)
+            if node is None:
+                return False
+        return _NAME in node
+
+    def longest_prefix(self, name):
+        """
+        :return: the longest name of the trie that is equal to `name` or a dotted prefix of it, None if
+        there isn't any or `name` is empty (or not a string)
+        """
+        if not isinstance(name, str) or not name:
+            return None
+
+        node = self._root
+        longest_prefix = node.get(_NAME)
+        for component in name.split('.'):
+            node = node.get(component)
+            if node is None:
+                break
+            longest_prefix = node.get(_NAME, longest_prefix)
+        return longest_prefix
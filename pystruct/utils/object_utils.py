@@ -2,12 +2,16 @@ import abc
 import sys
 import inspect
 
+from pystruct.metrics.metrics_core import NodeFeaturesDataframe
 from pystruct.objects.data_objects import AbstractObject
 from pystruct.objects.imports_data_objects import *
 from pystruct.objects.metric_tables import *
 from pystruct.objects.metric_obj import *
 from pystruct.objects.uml_graph_obj import *
 from pystruct.objects.dependencies import *
+from pystruct.objects.import_cycles import *
+from pystruct.objects.dependency_matrix import *
+from pystruct.objects.import_graph_metrics import *
 from pystruct.objects.full_report import *
 from pystruct.utils.python_utils import subclasses_of_class
 
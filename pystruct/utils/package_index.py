@@ -0,0 +1,128 @@
+import json
+import os
+import pkgutil
+import site
+import sys
+import sysconfig
+from functools import lru_cache
+from importlib import metadata
+
+from pystruct.configs import PATH_PYTHON_PACKAGE_INDEX_DIR
+from pystruct.utils import logs
+
+
+def _builtin_packages():
+    if hasattr(sys, 'stdlib_module_names'):  # python 3.10+
+        stdlib_module_names = sys.stdlib_module_names
+    else:
+        stdlib_path = sysconfig.get_paths()['stdlib']
+        stdlib_paths = [stdlib_path, os.path.join(stdlib_path, 'lib-dynload')]
+        stdlib_module_names = {module.name for module in pkgutil.iter_modules(stdlib_paths)}
+    return set(stdlib_module_names).union(sys.builtin_module_names)
+
+
+def _third_party_packages():
+    if hasattr(metadata, 'packages_distributions'):  # python 3.10+
+        return set(metadata.packages_distributions().keys())
+
+    # same as packages_distributions: the declared top-level packages, or the ones of the python files
+    packages = set()
+    for distribution in metadata.distributions():
+        top_level = (distribution.read_text('top_level.txt') or '').split()
+        if not top_level:
+            top_level = [file.parts[0] if len(file.parts) > 1 else file.with_suffix('').name
+                         for file in distribution.files or [] if file.suffix == '.py']
+        packages.update(top_level)
+    return packages
+
+
+def _site_directories_mtimes():
+    """
+    Modification times of the directories where packages are installed, which change when packages are
+    installed or removed.
+    """
+    site_directories = list(getattr(site, 'getsitepackages', lambda: [])())+[site.getusersitepackages()]
+    return {directory: os.path.getmtime(directory) for directory in site_directories if os.path.isdir(directory)}
+
+
+class PythonPackageIndex:
+    """
+    Classifies the root of an import path (the top-level package or module) as python built-in, third-party
+    (installed in the interpreter) or internal (the root of the project), with set lookups. The index is
+    built from the interpreter's own list of standard library modules and the metadata of the installed
+    distributions, without network access or walking the modules of site-packages.
+    """
+    BUILTIN, THIRD_PARTY, INTERNAL, UNKNOWN = 'builtin', 'third_party', 'internal', 'unknown'
+
+    def __init__(self, builtin_packages, third_party_packages, site_directories_mtimes=None):
+        self._builtin_packages = frozenset(builtin_packages)
+        self._third_party_packages = frozenset(third_party_packages) - self._builtin_packages
+        self._site_directories_mtimes = site_directories_mtimes or {}
+
+    @classmethod
+    def from_interpreter(cls):
+        return cls(_builtin_packages(), _third_party_packages(), _site_directories_mtimes())
+
+    def is_builtin(self, import_root):
+        return import_root in self._builtin_packages
+
+    def is_third_party(self, import_root):
+        return import_root in self._third_party_packages
+
+    def classify(self, import_root, project_root=None):
+        if project_root is not None and import_root == project_root:
+            return self.INTERNAL
+        if import_root in self._builtin_packages:
+            return self.BUILTIN
+        if import_root in self._third_party_packages:
+            return self.THIRD_PARTY
+        return self.UNKNOWN
+
+    def is_up_to_date(self):
+        """
+        :return: False if packages were installed or removed since the index was built
+        """
+        return self._site_directories_mtimes == _site_directories_mtimes()
+
+    def to_dict(self):
+        return {
+            'builtin_packages': sorted(self._builtin_packages),
+            'third_party_packages': sorted(self._third_party_packages),
+            'site_directories_mtimes': self._site_directories_mtimes,
+        }
+
+    @classmethod
+    def from_dict(cls, _dict):
+        return cls(_dict['builtin_packages'], _dict['third_party_packages'], _dict['site_directories_mtimes'])
+
+    def save(self, filepath):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Loads the index from the file, or builds (and saves) it if the file doesn't exist or is out of date.
+        """
+        if os.path.exists(filepath):
+            with open(filepath, 'r') as f:
+                index = cls.from_dict(json.load(f))
+            if index.is_up_to_date():
+                return index
+            logs.log_disk_ops(f"[DISK] Python package index {filepath} is out of date.")
+
+        logs.log_processor_ops(f"[CPU] Building python package index {filepath}.")
+        index = cls.from_interpreter()
+        index.save(filepath)
+        return index
+
+
+def package_index_filepath():
+    # one index per interpreter version, e.x. cpython-311
+    return os.path.join(PATH_PYTHON_PACKAGE_INDEX_DIR, f"{sys.implementation.cache_tag}.json")
+
+
+@lru_cache
+def python_package_index():
+    return PythonPackageIndex.load(package_index_filepath())
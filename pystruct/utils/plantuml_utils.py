@@ -1,30 +1,265 @@
+import hashlib
+import itertools
+import os
 import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import plantuml
 
+from pystruct.configs import PATH_PLANTUML_RENDER_CACHE_DIR, PLANTUML_LOCAL_SERVER_URL, PLANTUML_DOCKER_SERVER_URL,\
+    PLANTUML_WEB_SERVER_URL, PLANTUML_CONNECT_TIMEOUT, PLANTUML_HEALTH_MAX_AGE, PLANTUML_HEALTH_CHECK_INTERVAL,\
+    PLANTUML_RENDER_POOL_URLS, PLANTUML_RENDER_POOL_MAX_WORKERS, PLANTUML_RENDER_TIMEOUT, PLANTUML_RENDER_RETRIES,\
+    PLANTUML_RENDER_CACHE_MAX_SIZE
 from pystruct.html_utils.html_pages import ImageHTML
 from pystruct.utils.logs import log_plantuml
 
-PLANTUML_LOCAL_SERVER_URL = 'http://localhost:8080/img/'
-PLANTUML_DOCKER_SERVER_URL = 'http://plantuml:8080/img/'
-PLANTUML_WEB_SERVER_URL = 'http://www.plantuml.com/plantuml/img/'
 
+class PlantUMLRenderError(Exception):
+    """
+    The PlantUML server answered with an error status (plantuml.PlantUMLHTTPError can not be created with
+    Python 3).
+    """
+    def __init__(self, status, content):
+        super().__init__(f"PlantUML server error {status}")
+        self.status = status
+        self.content = content
 
-class WorkerThread(threading.Thread):
-    def __init__(self, task):
-        threading.Thread.__init__(self)
-        self._task = task
-        self._result = None
 
-    def run(self):
-        id = uuid.uuid4().hex[:6]
-        log_plantuml(f'Thread {id} started')
-        self._result = self._task()
-        log_plantuml(f'-- Thread {id} finished')
+class PlantUMLRenderPool:
+    """
+    Renders PlantUML documents on at most `max_workers` threads. Every thread keeps a PlantUML client per
+    server, whose HTTP connection is kept alive between its requests, and the documents are sent to the
+    servers in turn. A document that fails with a connection error or a server error (5xx) is sent again, to
+    the next server, at most `retries` times.
+    """
+    def __init__(self, urls, max_workers=PLANTUML_RENDER_POOL_MAX_WORKERS, timeout=PLANTUML_RENDER_TIMEOUT,
+                 retries=PLANTUML_RENDER_RETRIES):
+        self._urls = list(urls)
+        self._max_workers = max_workers
+        self._timeout = timeout
+        self._retries = retries
+        self._executor = None
+        self._thread_clients = threading.local()
+        self._next_url_index = itertools.count()
 
-    def result(self):
-        return self._result
+    @property
+    def urls(self):
+        return self._urls
+
+    @urls.setter
+    def urls(self, urls):
+        self._urls = list(urls)
+
+    def _client(self, url):
+        if not hasattr(self._thread_clients, 'clients'):
+            self._thread_clients.clients = {}
+        if url not in self._thread_clients.clients:
+            self._thread_clients.clients[url] = plantuml.PlantUML(url, http_opts={'timeout': self._timeout})
+        return self._thread_clients.clients[url]
+
+    def _request(self, url, doc):
+        client = self._client(url)
+        try:
+            response, content = client.http.request(client.get_url(doc), **client.request_opts)
+        except client.HttpLib2Error as error:
+            raise plantuml.PlantUMLConnectionError(error)
+        if response.status != 200:
+            raise PlantUMLRenderError(response.status, content)
+        return content
+
+    @staticmethod
+    def _is_retryable(error):
+        if isinstance(error, PlantUMLRenderError):
+            return error.status >= 500
+        return isinstance(error, (plantuml.PlantUMLConnectionError, OSError))
+
+    def render(self, doc):
+        """
+        :return: the png image of the document
+        """
+        first_url_index = next(self._next_url_index)
+        for attempt in range(self._retries + 1):
+            url = self._urls[(first_url_index + attempt) % len(self._urls)]
+            try:
+                return self._request(url, doc)
+            except Exception as error:
+                if attempt == self._retries or not self._is_retryable(error):
+                    raise
+                log_plantuml(f"PlantUML document (size={len(doc)}) failed on {url} with {error!r}. Retrying..")
+                # the connection may be broken
+                self._thread_clients.clients.pop(url, None)
+
+    def map(self, function, items):
+        """
+        :return: list with the results of the function for the items, called on the threads of the pool
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='plantuml')
+        return list(self._executor.map(function, items))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+class PlantUMLRenderCache:
+    """
+    Rendered diagrams on disk, shared by all the datasets, in files named by the hash of the image format
+    and of the PlantUML document. When the files exceed `max_size` bytes, the least recently used ones are
+    deleted. The sizes and the order of use of the files are kept in memory, they are read from the
+    directory (by modification time, which is updated on every hit) only when first needed.
+    """
+    def __init__(self, directory=PATH_PLANTUML_RENDER_CACHE_DIR, max_size=PLANTUML_RENDER_CACHE_MAX_SIZE):
+        self._directory = directory
+        self._max_size = max_size
+        self._files = None  # OrderedDict {file name: size}, from the least to the most recently used
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(doc, image_format='png'):
+        return hashlib.sha256(f"{image_format}\n{doc}".encode('utf-8')).hexdigest()
+
+    def _filepath(self, key, image_format):
+        return os.path.join(self._directory, f"{key}.{image_format}")
+
+    def get(self, doc, image_format='png'):
+        """
+        :return: the rendered image of the document (bytes), None if it is not in the cache
+        """
+        filepath = self._filepath(self.key(doc, image_format), image_format)
+        try:
+            with open(filepath, 'rb') as f:
+                image = f.read()
+            os.utime(filepath)
+        except OSError:
+            return None
+
+        with self._lock:
+            self._use(os.path.basename(filepath), len(image))
+        return image
+
+    def put(self, doc, image, image_format='png'):
+        os.makedirs(self._directory, exist_ok=True)
+        filepath = self._filepath(self.key(doc, image_format), image_format)
+        tmp_filepath = f"{filepath}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_filepath, 'wb') as f:
+            f.write(image)
+
+        with self._lock:
+            os.replace(tmp_filepath, filepath)
+            self._use(os.path.basename(filepath), len(image))
+            if self._size > self._max_size:
+                self._evict()
+
+    def _load_files(self):
+        self._files = OrderedDict()
+        if not os.path.isdir(self._directory):
+            return
+        with os.scandir(self._directory) as entries:
+            stats = [(entry.name, entry.stat()) for entry in entries
+                     if entry.is_file() and not entry.name.endswith('.tmp')]
+        for name, stat in sorted(stats, key=lambda name_and_stat: name_and_stat[1].st_mtime):
+            self._files[name] = stat.st_size
+        self._size = sum(self._files.values())
+
+    def _use(self, filename, size):
+        """
+        Marks the file as the most recently used one.
+        """
+        if self._files is None:
+            self._load_files()
+        self._size += size - self._files.pop(filename, 0)
+        self._files[filename] = size
+
+    def _evict(self):
+        while self._size > self._max_size and len(self._files) > 1:
+            filename, size = self._files.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(os.path.join(self._directory, filename))
+            except OSError:
+                continue
+            log_plantuml(f"PlantUML render cache: {filename} is evicted.")
+
+
+class PlantUMLHealthCheck:
+    """
+    Cached health of PlantUML servers: a server is checked by rendering a test document with a short
+    timeout, and its status is kept for `max_age` seconds. Once started, a daemon thread checks all the
+    servers every `interval` seconds, so the statuses stay fresh without blocking the renders.
+    """
+    TEST_DOCUMENT = """@startuml\nBob -> Alice : hello\n@enduml"""
+
+    def __init__(self, urls, timeout=PLANTUML_CONNECT_TIMEOUT, max_age=PLANTUML_HEALTH_MAX_AGE,
+                 interval=PLANTUML_HEALTH_CHECK_INTERVAL):
+        self.urls = list(urls)
+        self._timeout = timeout
+        self._max_age = max_age
+        self._interval = interval
+        self._statuses = {}  # url -> (is healthy, time of the check)
+        self._background_thread = None
+        self._stop_event = threading.Event()
+
+    def check(self, url):
+        log_plantuml(f"Checking the Plant UML server {url}..")
+        try:
+            plantuml.PlantUML(url, http_opts={'timeout': self._timeout}).processes(plantuml_text=self.TEST_DOCUMENT)
+            is_healthy = True
+        except Exception as error:
+            log_plantuml(f"Plant UML server {url} is not reachable: {error!r}")
+            is_healthy = False
+        self._statuses[url] = (is_healthy, time.monotonic())
+        return is_healthy
+
+    def cached_status(self, url):
+        """
+        :return: True or False if the server was checked less than `max_age` seconds ago, None otherwise
+        """
+        is_healthy, checked_at = self._statuses.get(url, (None, None))
+        if checked_at is None or time.monotonic() - checked_at > self._max_age:
+            return None
+        return is_healthy
+
+    def is_healthy(self, url):
+        is_healthy = self.cached_status(url)
+        return self.check(url) if is_healthy is None else is_healthy
+
+    def mark_unhealthy(self, url):
+        self._statuses[url] = (False, time.monotonic())
+
+    def first_healthy_url(self):
+        """
+        :return: the first healthy server, by its cached status or by checking it, None if there is none
+        """
+        return next((url for url in self.urls if self.is_healthy(url)), None)
+
+    def first_cached_healthy_url(self):
+        """
+        :return: the first server with a cached healthy status (no checks)
+        """
+        return next((url for url in self.urls if self.cached_status(url)), None)
+
+    def start(self):
+        if self._background_thread is not None:
+            return
+        self._stop_event.clear()
+
+        def check_periodically():
+            while not self._stop_event.wait(self._interval):
+                for url in self.urls:
+                    self.check(url)
+
+        self._background_thread = threading.Thread(target=check_periodically, name='plantuml-health', daemon=True)
+        self._background_thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._background_thread = None
 
 
 class PlantUMLService:
@@ -33,39 +268,75 @@ class PlantUMLService:
     @classmethod
     def get_instance(cls):
         if cls.__instance is None:
-            cls.__instance = PlantUMLService()
+            cls.__instance = PlantUMLService(multithreading=True)
             log_plantuml(f"PlantUMLService: Instance is created.")
         return cls.__instance
 
-    def __init__(self, multithreading=False):
-        self._multithreading_flag = multithreading
+    def __init__(self, multithreading=False, render_cache=None, render_pool_urls=PLANTUML_RENDER_POOL_URLS,
+                 health_check=None):
+        # no server is contacted before the first render
         self._plant_uml_server = None
-        self.reset_plant_uml_server()
+        self._render_cache = render_cache if render_cache is not None else PlantUMLRenderCache()
+        self._render_pool_urls = render_pool_urls
+        self._render_pool = PlantUMLRenderPool([]) if multithreading else None
+        self._health_check = health_check if health_check is not None else PlantUMLHealthCheck(
+            [PLANTUML_LOCAL_SERVER_URL, PLANTUML_DOCKER_SERVER_URL, PLANTUML_WEB_SERVER_URL])
+        self._connection_lock = threading.Lock()
 
     def reset_plant_uml_server(self):
-        def init_plantuml(url):
-            log_plantuml(f"Attempting to connect to a local Plant UML server: {url}")
-            plant_uml_server = plantuml.PlantUML(url)
-            log_plantuml(f"Sending test message...")
-            res = plant_uml_server.processes(plantuml_text="""@startuml\nBob -> Alice : hello\n@enduml""")
-            log_plantuml(f"Response length {len(res)}")
-            return plant_uml_server
+        """
+        Connects to the first healthy server of localhost, docker and web, and starts checking their health
+        in the background.
+        """
+        url = self._health_check.first_healthy_url()
+        if url is None:
+            raise plantuml.PlantUMLConnectionError(f"No Plant UML server is reachable: {self._health_check.urls}")
+        self._plant_uml_server = plantuml.PlantUML(url, http_opts={'timeout': PLANTUML_RENDER_TIMEOUT})
+        log_plantuml(f"Plant UML is running on {url}")
+        self._health_check.start()
 
-        try:
-            self._plant_uml_server = init_plantuml(PLANTUML_LOCAL_SERVER_URL)
-            log_plantuml(f"(LOCALHOST) Plant UML is running locally: {PLANTUML_LOCAL_SERVER_URL}")
-        except (plantuml.PlantUMLConnectionError, ConnectionRefusedError, OSError) as local_connection_error:
+        if self._render_pool is not None:
+            self._render_pool.urls = [url] + [pool_url for pool_url in self._render_pool_urls if pool_url != url]
+
+    def _server(self):
+        """
+        :return: the PlantUML server, connected on the first call, and again when a server before it is
+        healthy again or when it is not healthy anymore (from the cached statuses of the servers)
+        """
+        with self._connection_lock:
+            url = None if self._plant_uml_server is None else self._plant_uml_server.url
+            preferred_url = self._health_check.first_cached_healthy_url()
+            if url is None or self._health_check.cached_status(url) is False or preferred_url not in (None, url):
+                self.reset_plant_uml_server()
+            return self._plant_uml_server
+
+    def _render_on_server(self, doc):
+        server = self._server()
+        if self._render_pool is not None:
+            return self._render_pool.render(doc)
+        return server.processes(plantuml_text=doc)
+
+    def render(self, doc):
+        """
+        :return: the png image of the document, from the render cache if it was rendered before
+        """
+        raw_image_data = self._render_cache.get(doc)
+        if raw_image_data is None:
             try:
-                self._plant_uml_server = init_plantuml(PLANTUML_DOCKER_SERVER_URL)
-                log_plantuml(f"(DOCKER) Plant UML is running on web: {PLANTUML_DOCKER_SERVER_URL}")
-            except (plantuml.PlantUMLConnectionError, ConnectionRefusedError) as docker_connection_error:
-                self._plant_uml_server = init_plantuml(PLANTUML_WEB_SERVER_URL)
-                log_plantuml(f"(WEB) Plant UML is running on web: {PLANTUML_WEB_SERVER_URL}")
+                raw_image_data = self._render_on_server(doc)
+            except (plantuml.PlantUMLConnectionError, OSError):
+                if self._plant_uml_server is None:
+                    raise
+                # the server is down: the document is sent to the next healthy server
+                self._health_check.mark_unhealthy(self._plant_uml_server.url)
+                raw_image_data = self._render_on_server(doc)
+            self._render_cache.put(doc, raw_image_data)
+        return raw_image_data
 
     def convert_doc_to_html_image(self, doc, error_message=''):
         try:
             log_plantuml(f"Processing plantUML document (size={len(doc)})..")
-            raw_image_data = self._plant_uml_server.processes(plantuml_text=doc)
+            raw_image_data = self.render(doc)
             image_html = ImageHTML(raw_image_data)
             log_plantuml(f"PlantUML document (size={len(doc)}) is done.")
             return image_html
@@ -78,31 +349,21 @@ class PlantUMLService:
                 error_message_uml = f"""{error_message} Error: {e}"""
                 return error_message_uml
 
-    def convert_multiple_docs_to_html_images(self, docs):
-        if self._multithreading_flag:
-            try:
-                raise NotImplementedError
-                # return self._send_multiple_requests(docs) doesn't work right now
-            except Exception as exception:
-                log_plantuml(
-                    f"Processing {len(docs)} documents with multithreading failed with {exception=}. Switching to linear.")
-                self._multithreading_flag = False
-
-        html_images = [self.convert_doc_to_html_image(doc) for doc in docs]
-        return html_images
-
-    def _send_multiple_requests(self, docs):
-        threads = []
-        for doc in docs:
-            thread = WorkerThread(lambda: self.convert_doc_to_html_image(doc))
-            thread.start()
-            threads.append(thread)
-
-        for thread in threads:
-            thread.join()
-
-        html_images = [thread.result() for thread in threads]
-        return html_images
+    def convert_multiple_docs_to_html_images(self, docs, error_message=''):
+        # identical documents are converted once
+        unique_docs = list(dict.fromkeys(docs))
+
+        def convert(doc):
+            return self.convert_doc_to_html_image(doc, error_message)
+
+        if self._render_pool is not None:
+            log_plantuml(f"Processing {len(unique_docs)} plantUML documents on {len(self._render_pool.urls)} server(s)..")
+            html_images = self._render_pool.map(convert, unique_docs)
+        else:
+            html_images = [convert(doc) for doc in unique_docs]
+
+        html_images = dict(zip(unique_docs, html_images))
+        return [html_images[doc] for doc in docs]
 
 
 if __name__ == "__main__":
@@ -67,6 +67,10 @@ class Dataset(Directory, MultiSingleton):
     def objects_directory(self):
         return self._objs_dir
 
+    @property
+    def modules_manifest_filepath(self):
+        return self.path / 'modules_manifest.json'
+
     def add_python_files_from_path(self, python_source):
         log_disk_ops(f"Dataset: Fetching python files from {str(python_source)} ...")
 
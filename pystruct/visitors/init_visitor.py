@@ -1,6 +1,5 @@
-import ast
-
-from pystruct.utils.ast_utils import get_first_ast_of_type, separate_statement
+from pystruct.python.source_span import SourceSpan
+from pystruct.python.statement_extractor import extract_class_statements, extract_module_statements
 from pystruct.utils.logs import log_cyan
 from pystruct.utils.path_utils import load_file_as_string
 from pystruct.utils.python_file_utils import is_python_file
@@ -9,15 +8,37 @@ from pystruct.visitors.visitor import TreeNodeVisitor
 
 class PythonObjInitializer(TreeNodeVisitor):
 
-    def __init__(self, obj_factory):
+    def __init__(self, obj_factory, extracted_modules=None, lazy=False):
+        """
+        :param obj_factory: PathObjectFactory
+        :param extracted_modules: (optional) dict {module abspath: (code, list of ExtractedStatement)} of modules
+        that are already read and extracted (ex. by `extract_modules_in_parallel`). The rest of the modules are
+        read and extracted when visited.
+        :param lazy: if True, the classes, functions and methods of a module are extracted the first time
+        the module's branches are read, instead of when the module is visited
+        """
         self._obj_factory = obj_factory
+        self._lazy = lazy
+        self.visits_below_modules = not lazy
+        self._extracted_modules = extracted_modules if extracted_modules is not None else {}
+        self._statement_factories = {
+            'class': self._obj_factory.class_node,
+            'function': self._obj_factory.function,
+            'class_method': self._obj_factory.class_method
+        }
+        # class methods are extracted together with their module (single parse), and they
+        # are kept here until the class node gets visited
+        self._extracted_class_branches = {}
 
     def visit_directory(self, node):
         log_cyan(f".Visiting directory {node}", verbosity=3)
         list_objs = []
         for sub_path in node.data.path.sub_paths:
             if is_python_file(sub_path.abspath):
-                code = load_file_as_string(sub_path.abspath)
+                if sub_path.abspath in self._extracted_modules:
+                    code, _ = self._extracted_modules[sub_path.abspath]
+                else:
+                    code = load_file_as_string(sub_path.abspath)
                 module_node = self._obj_factory.module(sub_path.dotted_relpath, code, parent=node)
                 log_cyan(f"->Extracted module {module_node.data.name}", verbosity=3)
                 list_objs.append(module_node)
@@ -31,49 +52,51 @@ class PythonObjInitializer(TreeNodeVisitor):
         node.set_branches(list_objs)
         log_cyan(f"_Init Directory:{node.data.name} branches ({len(list_objs)})", verbosity=3)
 
-    def visit_module(self, node):
-        log_cyan(f".Visiting module {node}", verbosity=3)
-        asts_to_fetch = {ast.ClassDef: self._obj_factory.class_node,
-                         ast.FunctionDef: self._obj_factory.function}
-
+    def _statement_nodes(self, node, statements):
         list_objs = []
-
-        remaining_code = node.data.code
-        fetched_ast = get_first_ast_of_type(remaining_code, asts_to_fetch.keys())
-
-        while fetched_ast:
-            fetched_code, remaining_code = separate_statement(remaining_code, fetched_ast)
-
-            factory_method = asts_to_fetch[fetched_ast.__class__]
-            obj = factory_method(f"{node.data.name}.{fetched_ast.name}", fetched_code, parent=node)
-            log_cyan(f"->Extracted {fetched_ast.__class__} {obj.data.name}", verbosity=3)
+        for statement in statements:
+            factory_method = self._statement_factories[statement.type]
+            if statement.span is not None:
+                code = SourceSpan(node.data.span.buffer, *statement.span)
+            else:
+                code = statement.code
+            obj = factory_method(f"{node.data.name}.{statement.name}", code, parent=node)
+            log_cyan(f"->Extracted {statement.type} {obj.data.name}", verbosity=3)
+            if statement.type == 'class':
+                self._extracted_class_branches[obj] = statement.branches
             list_objs.append(obj)
+        return list_objs
 
-            fetched_ast = get_first_ast_of_type(remaining_code, asts_to_fetch)
+    def visit_module(self, node):
+        log_cyan(f".Visiting module {node}", verbosity=3)
+        if self._lazy:
+            node.set_branches_loader(lambda: self._expand_module(node))
+        else:
+            self._expand_module(node)
+
+    def _expand_module(self, node):
+        extracted_module = self._extracted_modules.pop(node.data.path.abspath, None)
+        if extracted_module is not None:
+            _, statements = extracted_module
+        else:
+            statements = extract_module_statements(node.data.code)
+        list_objs = self._statement_nodes(node, statements)
 
         node.set_branches(list_objs)
         log_cyan(f"_Init Module:{node.data.name} branches ({len(list_objs)})", verbosity=3)
 
+        if self._lazy:
+            # the classes are not visited when expanding lazily
+            for obj in list_objs:
+                if obj.data.type == 'class':
+                    self.visit_class(obj)
+
     def visit_class(self, node):
         log_cyan(f".Visiting class {node}", verbosity=3)
-        asts_to_fetch = {
-            # ast.ClassDef: self._obj_factory.class_node,
-            ast.FunctionDef: self._obj_factory.class_method
-        }
-
-        list_objs = []
-
-        remaining_code = node.data.code
-        fetched_ast = get_first_ast_of_type(remaining_code, asts_to_fetch.keys())
-        while fetched_ast:
-            fetched_code, remaining_code = separate_statement(remaining_code, fetched_ast)
-
-            obj = asts_to_fetch[fetched_ast.__class__](f"{node.data.name}.{fetched_ast.name}", fetched_code,
-                                                       parent=node)
-            log_cyan(f"->Extracted {fetched_ast.__class__} {obj.data.name}", verbosity=3)
-            list_objs.append(obj)
-
-            fetched_ast = get_first_ast_of_type(remaining_code, asts_to_fetch)
+        statements = self._extracted_class_branches.pop(node, None)
+        if statements is None:
+            statements = extract_class_statements(node.data.code)
+        list_objs = self._statement_nodes(node, statements)
 
         node.set_branches(list_objs)
         log_cyan(f"_Init Class:{node.data.name} branches ({len(list_objs)})", verbosity=3)
@@ -5,9 +5,15 @@ from pystruct.visitors.visitor import TreeNodeVisitor
 
 class LoadObjInitializer(TreeNodeVisitor):
 
-    def __init__(self, obj_factory, _dict):
+    def __init__(self, obj_factory, _dict, lazy=False):
+        """
+        :param lazy: if True, the classes, functions and methods of a module are loaded the first time
+        the module's branches are read, instead of when the module is visited
+        """
         self._obj_factory = obj_factory
         self._dict = _dict
+        self._lazy = lazy
+        self.visits_below_modules = not lazy
         self._parent_dir = self._produce_parent_dir()
 
     def _produce_parent_dir(self):
@@ -20,6 +26,17 @@ class LoadObjInitializer(TreeNodeVisitor):
                 parent_dir[cnodes] = node
 
     def visit_all(self, node):
+        if self._lazy and node.data.type == 'module':
+            node.set_branches_loader(lambda: self._load_sub_tree(node))
+        else:
+            self._load_branches(node)
+
+    def _load_sub_tree(self, node):
+        self._load_branches(node)
+        for branch in node.branches.values():
+            self._load_sub_tree(branch)
+
+    def _load_branches(self, node):
         node_name = node.data.name
         obj_dict = self._dict[node_name]
         node_type = self._dict[node_name]['type']
@@ -28,7 +45,7 @@ class LoadObjInitializer(TreeNodeVisitor):
         list_objs = []
         for sub_node_name in obj_dict['branches']:
             sub_obj_dict = self._dict[sub_node_name]
-            sub_obj = self._obj_factory.node_dict_to_object(sub_node_name, sub_obj_dict)
+            sub_obj = self._obj_factory.node_dict_to_object(sub_node_name, sub_obj_dict, parent=node)
             list_objs.append(TreeNode(node, sub_obj))
 
         node.set_branches(list_objs)
@@ -7,20 +7,26 @@ class ConvertPythonSourceObjToDict(TreeNodeVisitor):
         self._storage_dict = {}
         pass
 
-    def _add_node(self, name, type, code, branches):
-        node_dict = {
-            'type': type,
-            'code': code,
-            'branches': list(branches.keys())
-        }
+    def _add_node(self, name, type, code, branches, span=None):
+        node_dict = {'type': type}
+        if span is None:
+            node_dict['code'] = code
+        else:
+            # the code is stored once in the module, the rest of the nodes store their span in it
+            node_dict['span'] = span.to_list()
+        node_dict['branches'] = list(branches.keys())
         self._storage_dict[name] = node_dict
 
     def visit_all(self, node):
         type = node.data.type
         name = node.data.name
         branches = node.branches
-        code = node.data.code if issubclass(node.data.__class__, PythonCodeObj) else None
-        self._add_node(name, type, code, branches)
+        if not issubclass(node.data.__class__, PythonCodeObj):
+            self._add_node(name, type, None, branches)
+        elif node.data.type != 'module' and node.data.span is not None:
+            self._add_node(name, type, None, branches, span=node.data.span)
+        else:
+            self._add_node(name, type, node.data.code, branches)
 
     def dict(self):
         return self._storage_dict
@@ -4,6 +4,10 @@ from pystruct.utils.logs import *
 
 
 class AbstractVisitor(ABC):
+    # visitors that only need directories and modules set this to False, so that the classes,
+    # functions and methods of lazily expanded trees are never extracted
+    visits_below_modules = True
+
     @abstractmethod
     def visit(self, node):
         pass
@@ -49,6 +53,8 @@ class TreeNodeVisitor(AbstractVisitor):
 
 
 class VisitedMixin:
+    __slots__ = ()
+
     def _node(self):
         return self
 
@@ -0,0 +1,72 @@
+import base64
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from pystruct.html_utils.html_pages import ImageHTML, TabsHTML
+from pystruct.html_utils.lazy_report import LazyTabsReportMixin, ReportAssetStore, report_fragment
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 16
+
+
+class TestTabsHTML(unittest.TestCase):
+    def test_add_lazy_tab(self):
+        html = TabsHTML().add_lazy_tab('Classes', '/fragment/UMLClassDiagramObj').html()
+        self.assertIn('data-src="/fragment/UMLClassDiagramObj">Loading..</div>', html)
+        self.assertIn('Classes', html)
+        self.assertNotIn('[div_tab]', html)
+
+
+class TestReportAssetStore(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.store = ReportAssetStore(self._directory.name)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_put(self):
+        filename = self.store.put(PNG)
+        self.assertTrue(filename.endswith('.png'))
+        self.assertEqual(self.store.put(PNG), filename)
+        self.assertTrue(self.store.put(b'<svg></svg>').endswith('.svg'))
+        with open(os.path.join(self._directory.name, filename), 'rb') as f:
+            self.assertEqual(f.read(), PNG)
+        self.assertEqual(len(os.listdir(self._directory.name)), 2)
+
+    def test_externalize_images(self):
+        html = f"<h1>Graph</h1>{ImageHTML(PNG).html()}{ImageHTML(PNG).html()}"
+        result = self.store.externalize_images(html, lambda filename: f"/asset/{filename}")
+
+        filename = self.store.put(PNG)
+        self.assertNotIn(base64.b64encode(PNG).decode(), result)
+        self.assertEqual(result.count(f'loading="lazy" src="/asset/{filename}"'), 2)
+        self.assertTrue(result.startswith('<h1>Graph</h1>'))
+
+
+class TestLazyTabsReport(unittest.TestCase):
+    def test_lazy_html_does_not_build_the_tabs(self):
+        first, second = MagicMock(__name__='FirstObj'), MagicMock(__name__='SecondObj')
+
+        class Report(LazyTabsReportMixin):
+            content_dict = {'First': first, 'Second': second}
+
+        html = Report().lazy_html(lambda obj_class: f"/fragment/{obj_class.__name__}")
+        self.assertIn('data-src="/fragment/FirstObj"', html)
+        self.assertIn('data-src="/fragment/SecondObj"', html)
+        first.assert_not_called()
+        second.assert_not_called()
+
+    def test_report_fragment(self):
+        asset_store = MagicMock()
+        obj = MagicMock()
+        obj.to_html.return_value = 'html'
+        report_fragment(obj, None, asset_store, None)
+        asset_store.externalize_images.assert_called_once_with('html', None)
+
+        class Report(LazyTabsReportMixin):
+            content_dict = {'First': MagicMock(__name__='FirstObj')}
+
+        html = report_fragment(Report(), lambda obj_class: f"/fragment/{obj_class.__name__}", asset_store, None)
+        self.assertIn('data-src="/fragment/FirstObj"', html)
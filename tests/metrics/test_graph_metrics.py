@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+from pystruct.metrics import graph_metrics
+from pystruct.utils.graph_structures import Graph
+
+
+class TestGraphMetrics(unittest.TestCase):
+    def test_fan_in_and_fan_out(self):
+        graph = Graph([['a', 'b'], ['a', 'b'], ['a', 'c'], ['b', 'c'], ['c', 'c']])
+
+        fan_in, fan_out = graph_metrics.fan_in_and_fan_out(graph)
+        self.assertEqual(fan_in.tolist(), [0, 1, 2])
+        self.assertEqual(fan_out.tolist(), [2, 1, 0])
+        self.assertEqual(graph_metrics.instability(fan_in, fan_out).tolist(), [1., .5, 0.])
+
+    def test_instability_without_imports(self):
+        self.assertTrue(np.isnan(graph_metrics.instability(np.array([0]), np.array([0]))[0]))
+
+    def test_pagerank(self):
+        cycle = Graph([['a', 'b'], ['b', 'c'], ['c', 'a']])
+        np.testing.assert_allclose(graph_metrics.pagerank(cycle), [1/3, 1/3, 1/3])
+
+        star = Graph([['a', 'd'], ['b', 'd'], ['c', 'd']])
+        ranks = graph_metrics.pagerank(star)
+        self.assertAlmostEqual(ranks.sum(), 1.)
+        self.assertEqual(star.node(ranks.argmax()), 'd')
+
+    def test_betweenness(self):
+        path = Graph([['a', 'b'], ['b', 'c'], ['c', 'd']])
+        # b is on the paths a->c and a->d, c on a->d and b->d, normalised by (n-1)(n-2) = 6
+        np.testing.assert_allclose(graph_metrics.betweenness(path), [0, 2/6, 2/6, 0])
+
+    def test_betweenness_approximation(self):
+        rng = np.random.default_rng(0)
+        edges = rng.integers(0, 300, size=(1500, 2)).tolist()
+        graph = Graph(edges)
+
+        exact = graph_metrics.betweenness(graph, number_of_pivots=graph.size())
+        approximation = graph_metrics.betweenness(graph, number_of_pivots=150)
+        self.assertLess(np.abs(exact - approximation).max(), .05)
+
+
+if __name__ == '__main__':
+    unittest.main()
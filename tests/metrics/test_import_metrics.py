@@ -0,0 +1,35 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from pystruct.metrics import import_metrics
+
+
+class TestEnrichImportRawDf(unittest.TestCase):
+    @mock.patch.object(import_metrics, 'is_python_builtin_package', lambda import_path: import_path == 'os')
+    def test_enrich_import_raw_df(self):
+        raw_df = pd.DataFrame({
+            'module': ['proj.a', 'proj.a', 'proj.pkg.b', 'proj.pkg.__init__', 'proj'],
+            'imports': ['os', 'proj.pkg.b.a_function', 'proj.a', 'proj.missing', 'no-imports'],
+        })
+
+        df = import_metrics.enrich_import_raw_df(raw_df)
+
+        self.assertEqual(df['import_root'].tolist(), ['os', 'proj', 'proj', 'proj', 'no-imports'])
+        self.assertEqual(df['is_internal'].tolist(), [False, True, True, True, False])
+        self.assertEqual(df['is_external'].tolist(), [True, False, False, False, False])
+        self.assertEqual(df['is_builtin'].tolist(), [True, False, False, False, False])
+        self.assertEqual(df['import_module'].fillna('').tolist(), ['', 'proj.pkg.b', 'proj.a', 'proj', ''])
+        self.assertEqual(df['module_depth'].tolist(), [2, 2, 3, 3, 1])
+        self.assertEqual(df['invalid_import'].tolist(), [False, False, False, False, False])
+        self.assertEqual(df['unused_module'].tolist(), [False, False, False, True, False])
+        self.assertEqual(df['module_name'].tolist(), ['a', 'a', 'b', '__init__', 'proj'])
+        self.assertEqual(df['package'].tolist(), ['proj', 'proj', 'proj.pkg', 'proj.pkg', ''])
+        self.assertEqual(df['package_name'].tolist(), ['proj', 'proj', 'pkg', 'pkg', ''])
+        self.assertEqual(df['import_package'].tolist(), ['os', 'proj.pkg', 'proj', 'proj', 'no-imports'])
+        self.assertEqual(df['is_init_file'].tolist(), [False, False, False, True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from pystruct.metrics.node_features import NodeFeaturesVisitor, has_main_guard
+from pystruct.python.python_source_obj import PythonSourceObj
+
+a_py_file_content = """import os
+
+
+@decorator
+def a_function(some, arguments, *args, **kwargs):
+    return lambda x: x
+
+
+class AClass:
+    def a_method(self, argument, *args, **kwargs):
+        def inner(argument):
+            return argument
+        return inner
+
+
+if __name__ == "__main__":
+    a_function(1, 2)
+"""
+
+
+class TestNodeFeatures(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp_dir.name, 'a.py'), 'w') as f:
+            f.write(a_py_file_content)
+
+    def test_node_features(self):
+        features = NodeFeaturesVisitor()
+        PythonSourceObj.from_project_source(self.tmp_dir.name).use_visitor(features)
+        df = features.result().set_index('type')
+
+        self.assertEqual(df.index.tolist(), ['directory', 'module', 'function', 'class', 'class_method'])
+        self.assertEqual(df['number_of_lines'].tolist()[1:], [len(a_py_file_content.split("\n")), 3, 5, 4])
+        self.assertEqual(df.loc[['function', 'class_method'], 'number_of_args'].tolist(), [5, 5])
+        self.assertEqual(df.loc[['function', 'class_method'], 'number_of_distinct_args'].tolist(), [3, 1])
+        self.assertEqual(df.loc[['function', 'class', 'class_method'], 'number_of_decorators'].tolist(), [1, 0, 0])
+        self.assertEqual(df.loc['module', 'has_main_guard'], True)
+        self.assertTrue(df.loc[['directory', 'function', 'class', 'class_method'], 'has_main_guard'].isna().all())
+
+    def test_has_main_guard(self):
+        self.assertTrue(has_main_guard("if __name__ ==\n  '__main__' :\n    pass"))
+        self.assertTrue(has_main_guard("if __name__=='__main__':"))
+        self.assertFalse(has_main_guard("if __name__ != '__main__':\n    pass"))
+        self.assertFalse(has_main_guard("if __name__ == '__main__'"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+import pandas as pd
+
+from pystruct.objects.dependencies import DependencyStatsEngine, UniqueStat
+
+
+class TestDependencyStatsEngine(unittest.TestCase):
+    def setUp(self):
+        self.test_df = pd.DataFrame({
+            'package': ['a1', 'a1', 'a1', 'a2', 'a2', 'a2', 'a3', None],
+            'import_package': ['ext_1', 'int_1', 'ext_1', 'int_2', 'int_1', 'int_1', None, 'ext_1'],
+            'is_external': [True, False, True, False, False, False, True, True],
+            'is_internal': [False, True, False, True, True, True, False, False],
+        })
+        self.engine = DependencyStatsEngine(self.test_df, [
+            UniqueStat('external_package', 'package', 'import_package', 'is_external'),
+            UniqueStat('internal_package', 'package', 'import_package', 'is_internal'),
+            UniqueStat('imported_from_package', 'import_package', 'package', 'is_internal'),
+        ])
+
+    def test_unique_and_nunique(self):
+        expected_df = pd.DataFrame({
+            'package': ['a1', 'a3'],
+            'external_packages': ['ext_1', ''],
+            'number_of_external_packages': [1, 0],
+        }).set_index('package')
+        pd.testing.assert_frame_equal(self.engine.unique_and_nunique('external_package'), expected_df)
+
+    def test_stats_are_independent(self):
+        expected_df = pd.DataFrame({
+            'package': ['a1', 'a2'],
+            'internal_packages': ['int_1', 'int_1,int_2'],
+            'number_of_internal_packages': [1, 2],
+        }).set_index('package')
+        pd.testing.assert_frame_equal(self.engine.unique_and_nunique('internal_package'), expected_df)
+
+        expected_df = pd.DataFrame({
+            'import_package': ['int_1', 'int_2'],
+            'imported_from_packages': ['a1,a2', 'a2'],
+            'number_of_imported_from_packages': [2, 1],
+        }).set_index('import_package')
+        pd.testing.assert_frame_equal(self.engine.unique_and_nunique('imported_from_package'), expected_df)
+
+
+if __name__ == '__main__':
+    unittest.main()
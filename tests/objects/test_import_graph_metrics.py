@@ -0,0 +1,40 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from pystruct.metrics.graph_metrics import GRAPH_METRICS
+from pystruct.metrics.metrics_core import NodeFeaturesDataframe
+from pystruct.objects import import_graph_metrics as igm
+
+
+class TestImportGraphMetrics(unittest.TestCase):
+    @mock.patch.object(NodeFeaturesDataframe, '__new__')
+    def test_node_ids(self, mock_features):
+        mock_features.return_value.data.return_value = pd.DataFrame({
+            'item': ['a', 'a', 'a.b', 'a.b.C', 'a.c'],
+            'type': ['directory', 'module', 'module', 'class', 'module'],
+        })
+        obj = SimpleNamespace(node_type='module')
+        node_ids = igm.ImportGraphMetricsDataframeABC.node_ids(obj, np.array(['a.c', 'a', 'a.b.C', 'a.b']))
+        self.assertEqual(node_ids.tolist(), [4, 1, -1, 2])
+
+    @mock.patch.object(igm.PackageImportGraphMetricsDataframe, '__new__')
+    @mock.patch.object(igm.ModuleImportGraphMetricsDataframe, '__new__')
+    def test_join_import_graph_metrics(self, mock_modules, mock_packages):
+        def graph_metrics_df(node_ids, name_column):
+            df = pd.DataFrame({metric: np.array(node_ids, dtype=float) for metric in GRAPH_METRICS})
+            df.insert(0, 'node_id', node_ids)
+            df.insert(1, name_column, 'name')
+            return df
+
+        mock_modules.return_value.data.return_value = graph_metrics_df([3, 1], 'module')
+        mock_packages.return_value.data.return_value = graph_metrics_df([0], 'package')
+        metrics_df = pd.DataFrame({'item': ['a', 'a.b', 'a.b.f', 'a.c']})
+
+        df = igm.join_import_graph_metrics(metrics_df)
+        self.assertEqual(list(df.columns), ['item']+GRAPH_METRICS)
+        self.assertEqual(df['item'].tolist(), metrics_df['item'].tolist())
+        np.testing.assert_array_equal(df['pagerank'].values, [0., 1., np.nan, 3.])
@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pystruct.objects import data_objects as do
+from pystruct.objects import python_object as po
+
+
+def _visitor(visits_below_modules):
+    visitor = MagicMock()
+    visitor.visits_below_modules = visits_below_modules
+    return visitor
+
+
+class _GroupedObjectMixin:
+    tree_traversal_group = 'test_group'
+    visits_below_modules = True
+
+    def tree_visitor(self):
+        return _visitor(self.visits_below_modules)
+
+    def result_from_visitor(self, visitor):
+        return type(self).__name__
+
+
+class FirstGroupedObject(_GroupedObjectMixin, po.TreeVisitorObjectMixin, do.AbstractObject):
+    pass
+
+
+class SecondGroupedObject(_GroupedObjectMixin, po.TreeVisitorObjectMixin, do.AbstractObject):
+    pass
+
+
+class ModulesOnlyGroupedObject(_GroupedObjectMixin, po.TreeVisitorObjectMixin, do.AbstractObject):
+    visits_below_modules = False
+
+
+class UngroupedObject(_GroupedObjectMixin, po.TreeVisitorObjectMixin, do.AbstractObject):
+    tree_traversal_group = None
+
+
+class TestTreeVisitorObjectMixin(unittest.TestCase):
+    @patch.object(do.AbstractObject, 'set_data')
+    @patch.object(po, 'PObject')
+    def test_build_shares_the_traversal_with_its_group(self, pobject, set_data):
+        self.assertEqual(FirstGroupedObject().build(), 'FirstGroupedObject')
+
+        visitors = pobject().python_source_object().use_visitors.call_args[0][0]
+        self.assertEqual(len(visitors), 2)
+        # not the objects with another depth of traversal, or without group
+        set_data.assert_called_once_with('SecondGroupedObject')
+
+    @patch.object(do.AbstractObject, 'set_data')
+    @patch.object(po, 'PObject')
+    def test_build_without_group(self, pobject, set_data):
+        self.assertEqual(UngroupedObject().build(), 'UngroupedObject')
+
+        visitors = pobject().python_source_object().use_visitors.call_args[0][0]
+        self.assertEqual(len(visitors), 1)
+        set_data.assert_not_called()
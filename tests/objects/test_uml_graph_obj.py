@@ -0,0 +1,42 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from pystruct.objects.uml_graph_obj import ModuleRelationDocuemntObj
+
+
+class TestModuleRelationDocuemntObj(unittest.TestCase):
+    def setUp(self):
+        # two packages of 4 modules, with imports inside the packages and one between them, and an import
+        # graph of two modules
+        imports = [('a.x.m1', 'a.x.m2'), ('a.x.m2', 'a.y.m3'), ('a.y.m3', 'a.y.m4'),
+                   ('b.m5', 'b.m6'), ('b.m6', 'b.m7'), ('b.m7', 'b.m8'), ('a.y.m4', 'b.m5'), ('c.m9', 'c.m10')]
+        self.df = pd.DataFrame(imports, columns=['module', 'import_module'])
+        self.df['package'] = self.df['module'].str.rpartition('.')[0]
+        self.df['import_package'] = self.df['import_module'].str.rpartition('.')[0]
+
+    def test_module_graph_parts(self):
+        with mock.patch.object(ModuleRelationDocuemntObj, 'max_diagram_nodes', 4):
+            parts = list(ModuleRelationDocuemntObj.module_graph_parts(self.df))
+
+        self.assertEqual([title for title, _, _, _ in parts],
+                         ['1.1 (size=4/8)', '1.2 (size=4/8)', '2 (size=2)'])
+        self.assertEqual([sorted(stub_modules) for _, _, stub_modules, _ in parts], [['b.m5'], ['a.y.m4'], []])
+        self.assertEqual([stub_packages for _, _, _, stub_packages in parts], [False, False, False])
+
+    def test_imports_of_modules(self):
+        modules = ['b.m5', 'b.m6', 'b.m7', 'b.m8']
+
+        df, stubs = ModuleRelationDocuemntObj.imports_of_modules(self.df, modules, ['a.y.m4'])
+        self.assertEqual(len(df), 4)
+        self.assertEqual(stubs, {'a.y.m4'})
+
+        # the stub module is replaced by its package
+        df, stubs = ModuleRelationDocuemntObj.imports_of_modules(self.df, modules, ['a.y.m4'], stub_packages=True)
+        self.assertIn(('a.y', 'b.m5'), list(zip(df['module'], df['import_module'])))
+        self.assertEqual(stubs, {'a.y'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from pystruct.python.basic_structure import NodeBranchesAlreadySet, TreeNode
+from pystruct.python.code_structure import ClassObj, DirectoryObj, FunctionObj, ModuleObj
+from pystruct.python.source_span import SourceSpan
+
+module_code = """def a_function():
+    return 1
+
+def a_function():
+    return 2
+
+class AClass:
+    pass
+"""
+
+
+class TestTreeNode(unittest.TestCase):
+    def setUp(self):
+        self.head = TreeNode(None, DirectoryObj('pkg', None))
+        self.module = TreeNode(self.head, ModuleObj('pkg.mod', None, module_code))
+        self.head.set_branches([self.module])
+
+        buffer = self.module.data.span.buffer
+        self.module.set_branches([
+            TreeNode(self.module, FunctionObj('pkg.mod.a_function', None, SourceSpan(buffer, 1, 2, 0))),
+            TreeNode(self.module, ClassObj('pkg.mod.AClass', None, "class AClass:\n    pass")),
+            TreeNode(self.module, FunctionObj('pkg.mod.a_function', None, SourceSpan(buffer, 4, 5, 0))),
+        ])
+
+    def test_branches(self):
+        branches = self.module.branches
+        self.assertEqual(list(branches.keys()), ['pkg.mod.a_function', 'pkg.mod.AClass'])
+        self.assertEqual(branches['pkg.mod.a_function'].data.code, "def a_function():\n    return 2")
+        self.assertEqual(branches['pkg.mod.AClass'].data.code, "class AClass:\n    pass")
+        self.assertEqual(self.head.branches, {'pkg.mod': self.module})
+
+    def test_views_are_kept(self):
+        function_node = self.module.branches['pkg.mod.a_function']
+        self.assertIs(self.module.branches, self.module.branches)
+        self.assertIs(self.head.branches['pkg.mod'], self.module)
+        self.assertIs(function_node.parent, self.module)
+
+        # the data of a view, and the state cached on it, are kept
+        function_data = function_node.data
+        self.assertEqual(function_data.statement_name, 'a_function')
+        self.module._store._data.clear()
+        self.module._store._recent_data.clear()
+        self.assertIs(self.module.branches['pkg.mod.a_function'].data, function_data)
+        self.assertIn('statement_name', vars(function_data))
+
+    def test_depth_and_parent(self):
+        function_node = self.module.branches['pkg.mod.a_function']
+        self.assertEqual((self.head.depth, self.module.depth, function_node.depth), (0, 1, 2))
+        self.assertEqual(function_node.parent, self.module)
+        self.assertIsNone(self.head.parent)
+
+    def test_branches_already_set(self):
+        with self.assertRaises(NodeBranchesAlreadySet):
+            self.module.set_branches([])
+
+    def test_data_is_rebuilt_from_the_store(self):
+        store = self.module._store
+        store._data.clear()
+        store._recent_data.clear()
+
+        function_data = self.module.branches['pkg.mod.a_function'].data
+        self.assertIsInstance(function_data, FunctionObj)
+        self.assertEqual(function_data.name, 'pkg.mod.a_function')
+        self.assertIs(function_data.span.buffer, self.module.data.span.buffer)
+        self.assertEqual(function_data.statement_name, 'a_function')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pystruct.python import python_source_obj
+from pystruct.python.module_manifest import MANIFEST_FORMAT_VERSION, ModuleManifest
+from pystruct.python.python_source_obj import PythonSourceObj
+
+a_py_file_content = """
+def a_function(some, arguments):
+    return 1
+
+class a_class:
+    def a_class_method(self):
+        return 1
+"""
+
+changed_py_file_content = """
+class another_class:
+    def another_class_method(self):
+        return 2
+"""
+
+
+class TestModuleManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        for module_name in ['a', 'b', 'c']:
+            self._write_module(module_name, a_py_file_content)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write_module(self, module_name, code):
+        with open(os.path.join(self.tmp_dir.name, f"{module_name}.py"), 'w') as f:
+            f.write(code)
+
+    def _build_with_manifest(self, manifest):
+        with mock.patch.object(python_source_obj, 'extract_module_statements',
+                               wraps=python_source_obj.extract_module_statements) as extract_mock:
+            pobj = PythonSourceObj.from_project_source(self.tmp_dir.name, manifest=manifest)
+        return pobj.to_dict(), extract_mock.call_count
+
+    def test_only_changed_modules_are_parsed(self):
+        manifest = ModuleManifest()
+        first_dict, parsed_count = self._build_with_manifest(manifest)
+        self.assertEqual(parsed_count, 3)
+        self.assertEqual(len(manifest), 3)
+        self.assertEqual(first_dict, PythonSourceObj.from_project_source(self.tmp_dir.name).to_dict())
+
+        self._write_module('b', changed_py_file_content)
+        os.remove(os.path.join(self.tmp_dir.name, 'c.py'))
+        self._write_module('d', a_py_file_content)
+
+        second_dict, parsed_count = self._build_with_manifest(manifest)
+        self.assertEqual(parsed_count, 2)
+        self.assertEqual(sorted(manifest.relpaths()),
+                         sorted(os.path.join(os.path.basename(self.tmp_dir.name), f"{module_name}.py")
+                                for module_name in ['a', 'b', 'd']))
+        self.assertEqual(list(second_dict.items()),
+                         list(PythonSourceObj.from_project_source(self.tmp_dir.name).to_dict().items()))
+
+    def test_save_and_load(self):
+        manifest = ModuleManifest()
+        expected_dict, _ = self._build_with_manifest(manifest)
+        with tempfile.TemporaryDirectory() as manifest_dir:
+            manifest_filepath = os.path.join(manifest_dir, 'modules_manifest.json')
+            manifest.save(manifest_filepath)
+            loaded_manifest = ModuleManifest.load(manifest_filepath)
+        test_dict, parsed_count = self._build_with_manifest(loaded_manifest)
+
+        self.assertEqual(parsed_count, 0)
+        self.assertEqual(test_dict, expected_dict)
+        self.assertEqual(loaded_manifest.to_dict(), manifest.to_dict())
+
+
+    def test_changed_modules_are_read_once(self):
+        for jobs in [1, 2]:
+            with mock.patch.object(python_source_obj, 'load_file_as_string',
+                                   wraps=python_source_obj.load_file_as_string) as load_mock:
+                PythonSourceObj.from_project_source(self.tmp_dir.name, jobs=jobs, manifest=ModuleManifest())
+            self.assertEqual(load_mock.call_count, 3)
+
+    def test_manifest_of_another_version_is_ignored(self):
+        manifest = ModuleManifest()
+        self._build_with_manifest(manifest)
+        with tempfile.TemporaryDirectory() as manifest_dir:
+            manifest_filepath = os.path.join(manifest_dir, 'modules_manifest.json')
+            manifest.save(manifest_filepath)
+            with open(manifest_filepath) as f:
+                self.assertEqual(json.load(f)['version'], MANIFEST_FORMAT_VERSION)
+
+            for manifest_dict in [manifest.to_dict(), {'version': MANIFEST_FORMAT_VERSION-1, 'modules': manifest.to_dict()}]:
+                with open(manifest_filepath, 'w') as f:
+                    json.dump(manifest_dict, f)
+                self.assertEqual(len(ModuleManifest.load(manifest_filepath)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,8 @@ import tempfile
 import unittest
 
 from pystruct.python.python_source_obj import PythonSourceObj
+from pystruct.reports.import_graph import CollectImportsVisitor
+from pystruct.visitors.visitor import TreeNodeVisitor
 
 a_py_file_content = """
 import one_package
@@ -22,6 +24,14 @@ class a_class:
 expected_dict_str = r"""{"pystruct": {"type": "directory", "code": null, "branches": ["pystruct.a"]}, "pystruct.a": {"type": "module", "code": "\nimport one_package\nfrom another_package import that_module\n\ndef a_function(some, arguments):\n    var = \"something\"\n    return var\n\nclass a_class:\n    def a_class_method(self):\n        return 1\n\n", "branches": ["pystruct.a.a_function", "pystruct.a.a_class"]}, "pystruct.a.a_function": {"type": "function", "code": "def a_function(some, arguments):\n    var = \"something\"\n    return var", "branches": []}, "pystruct.a.a_class": {"type": "class", "code": "class a_class:\n    def a_class_method(self):\n        return 1", "branches": ["pystruct.a.a_class.a_class_method"]}, "pystruct.a.a_class.a_class_method": {"type": "class_method", "code": "def a_class_method(self):\n    return 1", "branches": []}}"""
 
 
+class CollectNamesVisitor(TreeNodeVisitor):
+    def __init__(self):
+        self.names = []
+
+    def visit_all(self, node):
+        self.names.append(node.data.name)
+
+
 class TestPythonSourceObj(unittest.TestCase):
     def setUp(self):
         self.tmp_dir = tempfile.TemporaryDirectory()
@@ -44,6 +54,48 @@ class TestPythonSourceObj(unittest.TestCase):
 
         self.assertEqual(test_dict, expected_dict)
 
+    def test_create_from_project_source_in_parallel(self):
+        os.mkdir(os.path.join(self.tmp_dir.name, 'sub_package'))
+        for module_name in ['b', 'c']:
+            with open(os.path.join(self.tmp_dir.name, 'sub_package', f"{module_name}.py"), 'w') as f:
+                f.write(a_py_file_content)
+
+        serial_dict = PythonSourceObj.from_project_source(self.tmp_dir.name).to_dict()
+        parallel_dict = PythonSourceObj.from_project_source(self.tmp_dir.name, jobs=2).to_dict()
+
+        self.assertEqual(list(parallel_dict.items()), list(serial_dict.items()))
+
+    def test_lazy_expansion(self):
+        expected_dict = PythonSourceObj.from_project_source(self.tmp_dir.name).to_dict()
+
+        pobj = PythonSourceObj.from_project_source(self.tmp_dir.name, lazy=True)
+        imports = CollectImportsVisitor()
+        pobj.use_visitor(imports)
+        module_node = list(pobj._node().branches.values())[0]
+        self.assertFalse(module_node.is_expanded)
+        self.assertEqual(imports.result()['imports'].tolist(), ['one_package', 'another_package.that_module'])
+
+        self.assertEqual(list(pobj.to_dict().items()), list(expected_dict.items()))
+        self.assertTrue(module_node.is_expanded)
+
+        lazy_pobj = PythonSourceObj.from_dict(expected_dict, lazy=True)
+        self.assertEqual(list(lazy_pobj.to_dict().items()), list(expected_dict.items()))
+
+    def test_use_visitors(self):
+        pobj = PythonSourceObj.from_project_source(self.tmp_dir.name, lazy=True)
+        names, imports = CollectNamesVisitor(), CollectImportsVisitor()
+        pobj.use_visitors([imports, names])
+
+        separate_pobj = PythonSourceObj.from_project_source(self.tmp_dir.name)
+        separate_names, separate_imports = CollectNamesVisitor(), CollectImportsVisitor()
+        separate_pobj.use_visitor(separate_names)
+        separate_pobj.use_visitor(separate_imports)
+
+        self.assertEqual(names.names, separate_names.names)
+        self.assertEqual(names.names, list(separate_pobj.to_dict().keys()))
+        self.assertTrue(imports.result().equals(separate_imports.result()))
+
+
 
 if __name__ == '__main__':
     unittest.main()
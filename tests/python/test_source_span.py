@@ -0,0 +1,55 @@
+import ast
+import unittest
+
+from pystruct.python.code_structure import ClassMethodObj, ModuleObj
+from pystruct.python.source_span import SourceBuffer, SourceSpan
+
+module_code = """import os
+
+class AClass:
+    def a_method(self, argument):
+        return argument
+
+    def documented_method(self):
+        \"\"\"
+        Multi-line docstring.
+        \"\"\"
+        return 1
+"""
+
+
+class TestSourceSpan(unittest.TestCase):
+    def setUp(self):
+        self.module = ModuleObj('a', None, module_code)
+        self.buffer = self.module.span.buffer
+
+    def test_line_offsets(self):
+        self.assertEqual(self.buffer.number_of_lines, len(module_code.split('\n')))
+        for lineno, line in enumerate(module_code.split('\n'), start=1):
+            self.assertEqual(self.buffer.code_segment(lineno, lineno, 0), line)
+
+    def test_code_segment(self):
+        self.assertEqual(SourceSpan(self.buffer, 4, 5, 4).code, "def a_method(self, argument):\n    return argument")
+        self.assertEqual(self.module.code, module_code)
+
+    def test_ast_is_sliced_from_the_module(self):
+        method = ClassMethodObj('a.AClass.a_method', None, SourceSpan(self.buffer, 4, 5, 4))
+        self.assertIs(method.statement_def_ast, self.buffer.tree.body[1].body[0])
+        self.assertEqual(method.statement_def_lineno, 1)
+        self.assertEqual(method.statement_def, "def a_method(self, argument):")
+        self.assertEqual(method.statement_inner_code, "return argument")
+        self.assertEqual([_ast.arg for _ast in method.ast if isinstance(_ast, ast.arg)], ['self', 'argument'])
+
+    def test_multi_line_strings_are_parsed_from_the_code(self):
+        method = ClassMethodObj('a.AClass.documented_method', None, SourceSpan(self.buffer, 7, 11, 4))
+        self.assertIsNone(method.span.ast)
+        self.assertEqual(ast.dump(method.statement_def_ast),
+                         ast.dump(ast.parse(method.code).body[0]))
+        self.assertEqual(method.statement_def_lineno, 1)
+
+    def test_syntax_error(self):
+        self.assertIsNone(SourceBuffer("def a_function(:\n    pass").tree)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import unittest
+
+from pystruct.python.source_span import SourceBuffer
+from pystruct.python.statement_extractor import CLASS_STATEMENTS, MODULE_STATEMENTS, StatementExtractor, \
+    extract_class_statements, extract_module_statements, extract_statements_iteratively
+
+
+def _iterative_module_statements(code):
+    res = []
+    for _ast, statement_code in extract_statements_iteratively(code, MODULE_STATEMENTS.keys()):
+        branches = []
+        if MODULE_STATEMENTS[_ast.__class__] == 'class':
+            branches = [(s.type, s.name, s.code) for s in extract_class_statements(statement_code)]
+        res.append((MODULE_STATEMENTS[_ast.__class__], _ast.name, statement_code, branches))
+    return res
+
+
+def _single_parse_module_statements(code):
+    buffer = SourceBuffer(code)
+
+    def statement_code(statement):
+        return statement.code if statement.span is None else buffer.code_segment(*statement.span)
+
+    return [(s.type, s.name, statement_code(s), [(b.type, b.name, statement_code(b)) for b in s.branches])
+            for s in extract_module_statements(code)]
+
+
+simple_code = """
+import os
+
+@decorator
+def a_function(some, arguments):
+    def inner():
+        pass
+    return 1
+
+class AClass(Base):
+    x = 1
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    class Inner:
+        def inner_method(self):
+            pass
+
+async def an_async_function():
+    def nested_in_async():
+        pass
+    return 2
+"""
+
+nested_blocks_code = """
+try:
+    import something
+except ImportError:
+    def fallback():
+        pass
+    class Fallback:
+        def method(self):
+            pass
+
+if __name__ == '__main__':
+    def main():
+        pass
+    main()
+
+def top_level():
+    pass
+"""
+
+empty_block_code = """
+if flag:
+    def only_statement():
+        pass
+
+if other_flag:
+    def never_fetched():
+        pass
+"""
+
+multiline_decorator_code = """
+@decorator(
+    argument)
+def a_function():
+    pass
+
+def another_function():
+    pass
+"""
+
+chopped_string_code = """
+if flag:
+    class AClass:
+        text = '''
+no indentation'''
+        def method(self):
+            pass
+"""
+
+
+class TestStatementExtractor(unittest.TestCase):
+    def assert_same_as_iterative(self, code):
+        self.assertEqual(_single_parse_module_statements(code), _iterative_module_statements(code))
+
+    def test_simple_module(self):
+        statements = extract_module_statements(simple_code)
+        self.assertEqual([(s.type, s.name) for s in statements],
+                         [('function', 'a_function'), ('class', 'AClass'), ('function', 'nested_in_async')])
+        self.assertEqual([(s.type, s.name) for s in statements[1].branches],
+                         [('class_method', 'value'), ('class_method', 'value'), ('class_method', 'inner_method')])
+        self.assertEqual(SourceBuffer(simple_code).code_segment(*statements[1].branches[2].span),
+                         "def inner_method(self):\n    pass")
+        self.assert_same_as_iterative(simple_code)
+
+    def test_statements_in_blocks(self):
+        self.assert_same_as_iterative(nested_blocks_code)
+
+    def test_stops_when_a_block_is_left_empty(self):
+        statements = extract_module_statements(empty_block_code)
+        self.assertEqual([s.name for s in statements], ['only_statement'])
+        self.assert_same_as_iterative(empty_block_code)
+
+    def test_multiline_decorator_falls_back(self):
+        extractor = StatementExtractor(multiline_decorator_code)
+        statements = extractor.extract(extractor.tree, MODULE_STATEMENTS.keys())
+        self.assertEqual([_ast.name for _ast, _ in statements], ['a_function'])
+        self.assertFalse(extractor.is_fetched_from_tree(statements[0][0]))
+        self.assert_same_as_iterative(multiline_decorator_code)
+
+    def test_lossy_dedent_falls_back(self):
+        extractor = StatementExtractor(chopped_string_code)
+        class_ast = extractor.tree.body[0].body[0]
+        self.assertFalse(extractor.can_be_extracted_separately(class_ast))
+        self.assert_same_as_iterative(chopped_string_code)
+
+    def test_syntax_error(self):
+        self.assertEqual(extract_module_statements("def a_function(:\n    pass"), [])
+
+    def test_class_statements(self):
+        extractor = StatementExtractor(simple_code)
+        class_ast = extractor.tree.body[2]
+        methods = extractor.extract(class_ast, CLASS_STATEMENTS.keys())
+        self.assertEqual([_ast.name for _ast, _ in methods], ['value', 'value', 'inner_method'])
+
+
+if __name__ == '__main__':
+    unittest.main()
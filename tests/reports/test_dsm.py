@@ -0,0 +1,77 @@
+import unittest
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from pystruct.reports.dsm import DependencyStructureMatrix, matrix_order
+from pystruct.utils.graph_structures import Graph
+
+
+class TestDependencyStructureMatrix(unittest.TestCase):
+    def setUp(self):
+        self.dependencies_df = pd.DataFrame({
+            'module': ['b.x', 'a.y', 'a.z', 'a.y', 'c.w'],
+            'import_module': ['a.y', 'a.z', 'a.y', 'c.w', 'c.v'],
+            'number_of_imports': [1, 2, 1, 3, 1],
+        })
+        self.groups = {'b.x': 'b', 'a.y': 'a', 'a.z': 'a', 'c.w': 'c', 'c.v': 'c'}
+
+    def test_matrix_order(self):
+        graph = Graph([['c', 'd'], ['a', 'b'], ['b', 'c'], ['e', 'd']])
+
+        order = [graph.node(node_id) for node_id in matrix_order(graph, groups=['2', '2', '1', '1', '1'])]
+        # layers: a and e, b, c, d. e is in the first group of the first layer
+        self.assertEqual(order, ['e', 'a', 'b', 'c', 'd'])
+
+    def test_from_dependencies(self):
+        matrix = DependencyStructureMatrix.from_dependencies(self.dependencies_df, self.groups)
+
+        self.assertEqual(matrix.nodes, ['b.x', 'a.y', 'a.z', 'c.w', 'c.v'])
+        # the only entry below the diagonal is the back edge of the cycle a.y -> a.z -> a.y
+        self.assertEqual(list(zip(matrix.rows[matrix.rows > matrix.columns].tolist(),
+                                  matrix.columns[matrix.rows > matrix.columns].tolist())), [(2, 1)])
+
+    def test_dataframe(self):
+        matrix = DependencyStructureMatrix.from_dependencies(self.dependencies_df, self.groups)
+
+        df = matrix.to_dataframe('module')
+        self.assertEqual(df[['module', 'import_module', 'number_of_imports']].values.tolist(), [
+            ['b.x', 'a.y', 1], ['a.y', 'a.z', 2], ['a.y', 'c.w', 3], ['a.z', 'a.y', 1], ['c.w', 'c.v', 1]])
+
+        loaded_matrix = DependencyStructureMatrix.from_dataframe(df, 'module', self.groups)
+        self.assertEqual(loaded_matrix.nodes, matrix.nodes)
+        self.assertEqual(loaded_matrix.groups, matrix.groups)
+
+    def test_group_runs(self):
+        matrix = DependencyStructureMatrix.from_dependencies(self.dependencies_df, self.groups)
+        self.assertEqual(matrix.group_runs(), [('b', 0, 1), ('a', 1, 3), ('c', 3, 5)])
+
+        matrix = DependencyStructureMatrix.from_dependencies(self.dependencies_df)
+        self.assertEqual(len(matrix.group_runs()), 5)
+        self.assertEqual(matrix.group_runs(depth=1), [('b', 0, 1), ('a', 1, 3), ('c', 3, 5)])
+
+    def test_group_ticks(self):
+        # a chain of 200 modules, the modules of the same group are in runs of 50
+        modules = [f"p{i // 50}.m{i:03}" for i in range(200)]
+        dependencies_df = pd.DataFrame({'module': modules[:-1], 'import_module': modules[1:], 'number_of_imports': 1})
+        matrix = DependencyStructureMatrix.from_dependencies(dependencies_df, {module: module[:2] for module in modules})
+
+        fig, ax = plt.subplots()
+        matrix._set_group_ticks(ax, bin_size=2)
+        self.assertEqual([label.get_text() for label in ax.get_xticklabels()], ['p0', 'p1', 'p2', 'p3'])
+        self.assertEqual(ax.get_xticks().tolist(), [12., 37., 62., 87.])
+        plt.close(fig)
+
+        self.assertTrue(matrix.heatmap_png(max_pixels=100).startswith(b'\x89PNG'))
+
+    def test_binned(self):
+        matrix = DependencyStructureMatrix.from_dependencies(self.dependencies_df, self.groups)
+
+        # 3 nodes per bin
+        binned, back_edges = matrix.binned(2)
+        self.assertEqual(binned.tolist(), [[4, 3], [0, 1]])
+        self.assertEqual(back_edges.tolist(), [[1, 0], [0, 0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
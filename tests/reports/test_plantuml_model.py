@@ -0,0 +1,63 @@
+import unittest
+
+from pystruct.reports.plantuml_model import PlantUMLDiagram, PlantUMLEdge, PlantUMLNode, PlantUMLNote
+from pystruct.reports.uml_class import PlantUMLDocument, PlantUMLPackagesAndModulesBuilder
+
+
+class TestPlantUMLDiagram(unittest.TestCase):
+    def test_builders_serialisation(self):
+        document = PlantUMLDocument()
+        document.add_class_def('A', abstract=True)
+        document.add_class_superclass_of_class('A', 'B')
+        document.add_object_relation('B', 'C', message='x2')
+
+        self.assertEqual(document.finish_and_return(),
+                         "@startuml\nleft to right direction\nset separator none\n"
+                         "abstract A\nA <|-- B\nB --> C : x2\n@enduml\n")
+
+        builder = PlantUMLPackagesAndModulesBuilder()
+        builder.start_container('package', 'p', '<<Folder>>')
+        builder.add_object('object', 'm', '#fff')
+        builder.end_container()
+
+        self.assertEqual(builder.finish_and_return(),
+                         "@startuml\nskinparam BackgroundColor #dedede\nset separator none\nleft to right direction\n"
+                         "package p <<Folder>> {\nobject m #fff\n}\n@enduml\n")
+
+    def test_edges_with_missing_nodes_are_serialised(self):
+        # e.x. an in-project import that is not resolved to a module, with a NaN module
+        builder = PlantUMLPackagesAndModulesBuilder()
+        builder.add_relation('m', '-->', float('nan'), None)
+
+        self.assertEqual(builder.diagram().lines()[4:-1], ['m --> nan None'])
+
+    def test_split_by_node_ids(self):
+        document = PlantUMLDocument()
+        # A is a prefix of AB, but they are in different graphs
+        for superclass, subclass in [('A', 'B'), ('AB', 'C')]:
+            document.add_class_def(subclass)
+            document.add_class_superclass_of_class(superclass, subclass)
+
+        diagrams = document.diagram().split([{'A', 'B'}, {'AB', 'C'}])
+
+        self.assertEqual([diagram.lines()[3:-1] for diagram in diagrams],
+                         [['class B', 'A <|-- B'], ['class C', 'AB <|-- C']])
+
+    def test_split_keeps_containers_of_the_nodes(self):
+        diagram = PlantUMLDiagram(indent='  ')
+        for package, module in [('p1', 'm1'), ('p2', 'm2')]:
+            diagram.start_container(package, f"package {package} {{")
+            diagram.add(PlantUMLNote(f"note of {package}"))
+            diagram.add(PlantUMLNode(module, f"object {module}"))
+            diagram.end_container()
+        diagram.add(PlantUMLEdge('m1', '-->', 'm2'))
+
+        diagrams = diagram.split([['m1'], ['m2']])
+
+        self.assertEqual(diagrams[0].lines(), ['@startuml', 'package p1 {', '  note of p1', '  object m1', '}', '@enduml'])
+        self.assertEqual(diagrams[1].edges(), [])
+        self.assertEqual(len(diagram.subgraph(['m1', 'm2']).edges()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
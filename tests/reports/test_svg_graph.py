@@ -0,0 +1,72 @@
+import unittest
+import xml.dom.minidom
+
+import numpy as np
+
+from pystruct.reports.svg_graph import LayeredLayout, SVGGraph
+from pystruct.utils.graph_structures import Graph
+
+
+class TestLayeredLayout(unittest.TestCase):
+    def test_edges_go_down_except_in_cycles(self):
+        graph = Graph([('a', 'b'), ('b', 'c'), ('c', 'a'), ('a', 'd'), ('e', 'd')])
+        layout = LayeredLayout(graph)
+        sources, targets = graph.edge_ids()
+
+        is_down = layout.layers[sources] < layout.layers[targets]
+        np.testing.assert_array_equal(is_down, ~layout.is_back_edge)
+        self.assertEqual(layout.is_back_edge.sum(), 1)
+        # e only imports d, so it is placed right above it
+        self.assertEqual(layout.layers[graph.node_id('e')], layout.layers[graph.node_id('d')] - 1)
+
+    def test_nodes_of_a_group_are_next_to_each_other(self):
+        graph = Graph([('top', f'm{i}') for i in range(6)])
+        groups = ['top'] + ['p1', 'p2'] * 3
+        layout = LayeredLayout(graph, groups)
+
+        bottom_orders = layout.orders[1:]
+        p1_orders = sorted(bottom_orders[0::2].tolist())
+        self.assertIn(p1_orders, [[0, 1, 2], [3, 4, 5]])
+
+    def test_wide_layers_are_wrapped(self):
+        graph = Graph([('top', f'm{i}') for i in range(10)])
+        layout = LayeredLayout(graph, widths=[10]*11, max_row_width=60)
+
+        # 2 nodes (and the gap between them) fit in a row, so the 10 imported nodes are in 5 rows
+        self.assertEqual(layout.rows.max(), 1 + 4)
+        self.assertLessEqual((layout.x + layout.widths).max() - layout.x.min(), 60)
+
+
+class TestSVGGraph(unittest.TestCase):
+    def test_svg(self):
+        svg_graph = SVGGraph([('a', 'b'), ('b', 'a')], node_colors={'a': '#ff0000'}, edge_colors={('a', 'b'): '#00ff00'},
+                             group_of={'a': 'p<1>', 'b': 'p<1>'}, nodes=['c'])
+
+        document = xml.dom.minidom.parseString(svg_graph.svg(title='graph'))
+
+        texts = [text.firstChild.data for text in document.getElementsByTagName('text')]
+        # a and b are in different rows, so their group has a box in each row
+        self.assertEqual(sorted(texts), ['a', 'b', 'c', 'p<1>', 'p<1>'])
+        self.assertEqual(len(document.getElementsByTagName('marker')), 2)
+        self.assertIn('#ff0000', [rect.getAttribute('fill') for rect in document.getElementsByTagName('rect')])
+
+    def test_svg_without_colors(self):
+        svg_graph = SVGGraph([('a', 'b')], node_colors={'a': None, 'b': np.nan}, edge_colors={('a', 'b'): None},
+                             group_of={'a': 'p', 'b': 'p'}, group_colors={'p': None})
+
+        svg = svg_graph.svg()
+        self.assertNotIn('None', svg)
+        self.assertNotIn('nan', svg)
+
+    def test_stub_nodes(self):
+        svg_graph = SVGGraph([('a', 'b'), ('a', 'c')], stub_nodes=['b'])
+
+        document = xml.dom.minidom.parseString(svg_graph.svg())
+
+        dashed = [rect.parentNode.getElementsByTagName('text')[0].firstChild.data
+                  for rect in document.getElementsByTagName('rect') if rect.hasAttribute('stroke-dasharray')]
+        self.assertEqual(dashed, ['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
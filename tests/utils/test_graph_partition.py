@@ -0,0 +1,46 @@
+import unittest
+
+from pystruct.utils.graph_partition import partition_graph
+from pystruct.utils.graph_structures import Graph
+
+
+class TestPartitionGraph(unittest.TestCase):
+    def setUp(self):
+        # two packages of 4 modules, with imports inside the packages and one between them
+        self.edges = [('a.x.m1', 'a.x.m2'), ('a.x.m2', 'a.y.m3'), ('a.y.m3', 'a.y.m4'),
+                      ('b.m5', 'b.m6'), ('b.m6', 'b.m7'), ('b.m7', 'b.m8'), ('a.y.m4', 'b.m5')]
+        self.graph = Graph(self.edges)
+
+    def test_graph_within_budget_is_one_partition(self):
+        partitions = partition_graph(self.graph, max_nodes=8, max_edges=7)
+
+        self.assertEqual(len(partitions), 1)
+        self.assertEqual(sorted(partitions[0].nodes), sorted(self.graph.nodes))
+        self.assertEqual(partitions[0].stub_nodes, [])
+        self.assertEqual(partitions[0].edges, self.edges)
+
+    def test_nodes_are_split_by_package_first(self):
+        partitions = partition_graph(self.graph, max_nodes=4, max_edges=7)
+
+        self.assertEqual([sorted(partition.nodes) for partition in partitions],
+                         [['a.x.m1', 'a.x.m2', 'a.y.m3', 'a.y.m4'], ['b.m5', 'b.m6', 'b.m7', 'b.m8']])
+        # the import between the packages is in both partitions, with a stub of the other package
+        self.assertEqual([partition.stub_nodes for partition in partitions], [['b.m5'], ['a.y.m4']])
+        self.assertIn(('a.y.m4', 'b.m5'), partitions[0].edges)
+        self.assertIn(('a.y.m4', 'b.m5'), partitions[1].edges)
+
+    def test_partitions_fit_in_the_budget(self):
+        nodes = [f"m{i}" for i in range(60)]
+        graph = Graph([(nodes[i], nodes[(i+1) % 60]) for i in range(60)] + [(nodes[i], nodes[(i*7) % 60]) for i in range(60)])
+
+        partitions = partition_graph(graph, max_nodes=10, max_edges=30)
+
+        self.assertEqual(sorted(node for partition in partitions for node in partition.nodes), sorted(nodes))
+        for partition in partitions:
+            self.assertLessEqual(len(partition.nodes), 10)
+            self.assertLessEqual(len(partition.edges), 30)
+            self.assertTrue(set(partition.stub_nodes).isdisjoint(partition.nodes))
+
+
+if __name__ == '__main__':
+    unittest.main()
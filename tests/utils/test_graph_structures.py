@@ -30,6 +30,102 @@ class TestGraphs(unittest.TestCase):
         self.assertEqual(subgraphs[1].nodes, {5, 6})
         self.assertEqual(subgraphs[1].edges, [[5, 6]])
 
+    def test_csr_adjacency(self):
+        test_edges = [[1, 2], [3, 1], [1, 3], [2, 4]]
+        test_graph = gs.Graph(test_edges)
+
+        indptr, indices = test_graph.csr_adjacency()
+        self.assertEqual(indptr.tolist(), [0, 2, 3, 4, 4])
+        self.assertEqual(indices.tolist(), [1, 2, 3, 0])
+        self.assertEqual(test_graph.successors(1), [2, 3])
+        self.assertEqual(test_graph.successors(4), [])
+
+    def test_component_labels(self):
+        test_edges = [[1, 2], [5, 6], [3, 4], [2, 3]]
+        test_graph = gs.Graph(test_edges)
+
+        labels = test_graph.component_labels()
+        self.assertEqual(labels.tolist(), [0, 0, 1, 1, 0, 0])
+
+    def test_subgraphs_of_empty_graph(self):
+        self.assertEqual(gs.Graph([]).subgraphs(), [])
+
+    def test_strongly_connected_components(self):
+        test_edges = [['a', 'b'], ['b', 'c'], ['c', 'a'], ['c', 'd'], ['d', 'e'], ['e', 'd'], ['a', 'f']]
+        test_graph = gs.Graph(test_edges)
+
+        labels = test_graph.strongly_connected_components()
+        components = {test_graph.node(node_id): label for node_id, label in enumerate(labels.tolist())}
+        self.assertEqual(components['a'], components['b'])
+        self.assertEqual(components['a'], components['c'])
+        self.assertEqual(components['d'], components['e'])
+        self.assertEqual(len(set(components.values())), 3)
+
+        # topological order of the components
+        sources, targets = test_graph.edge_ids()
+        self.assertTrue((labels[sources] <= labels[targets]).all())
+
+    def test_condensation_edges(self):
+        test_edges = [['a', 'b'], ['b', 'a'], ['a', 'c'], ['b', 'c'], ['c', 'd']]
+        test_graph = gs.Graph(test_edges)
+
+        sources, targets, counts = test_graph.condensation_edges(test_graph.strongly_connected_components())
+        self.assertEqual(list(zip(sources.tolist(), targets.tolist(), counts.tolist())), [(0, 1, 2), (1, 2, 1)])
+
+    def test_shortest_cycle(self):
+        test_edges = [['a', 'b'], ['b', 'c'], ['c', 'a'], ['b', 'a'], ['c', 'd'], ['e', 'e']]
+        test_graph = gs.Graph(test_edges)
+
+        labels = test_graph.strongly_connected_components()
+        self.assertEqual(test_graph.shortest_cycle(labels, test_graph.node_id('a')), ['a', 'b', 'a'])
+        self.assertEqual(test_graph.shortest_cycle(labels, test_graph.node_id('e')), ['e', 'e'])
+        self.assertIsNone(test_graph.shortest_cycle(labels, test_graph.node_id('d')))
+
+    def test_label_ranks(self):
+        self.assertEqual(gs.label_ranks(['b', 'a', 'c', 'b']).tolist(), [1, 0, 2, 1])
+        self.assertEqual(gs.label_ranks([]).tolist(), [])
+
+
+class TestReachabilityIndex(unittest.TestCase):
+    def setUp(self):
+        test_edges = [['a', 'b'], ['b', 'c'], ['c', 'b'], ['c', 'd'], ['e', 'd']]
+        self.index = gs.ReachabilityIndex.from_graph(gs.Graph(test_edges))
+
+    def test_bitsets(self):
+        bitset = (1 << 3) | (1 << 70)
+        self.assertEqual(gs.decode_bitset(gs.encode_bitset(bitset)), bitset)
+        self.assertEqual(gs.bitset_members(bitset).tolist(), [3, 70])
+        self.assertEqual(gs.bitset_members(0).tolist(), [])
+
+    def test_depends_on(self):
+        self.assertTrue(self.index.depends_on('a', 'd'))
+        self.assertTrue(self.index.depends_on('b', 'b'))
+        self.assertFalse(self.index.depends_on('a', 'a'))
+        self.assertFalse(self.index.depends_on('d', 'a'))
+        self.assertFalse(self.index.depends_on('e', 'b'))
+
+    def test_dependencies_and_dependents(self):
+        self.assertEqual(sorted(self.index.dependencies('a')), ['b', 'c', 'd'])
+        self.assertEqual(sorted(self.index.dependencies('b')), ['c', 'd'])
+        self.assertEqual(sorted(self.index.dependents('d')), ['a', 'b', 'c', 'e'])
+        self.assertEqual(self.index.dependents('a'), [])
+
+    def test_from_graph_with_components(self):
+        graph = gs.Graph([['a', 'b'], ['b', 'a'], ['b', 'c']])
+        index = gs.ReachabilityIndex.from_graph(graph, graph.strongly_connected_components())
+        self.assertEqual(sorted(index.dependencies('a')), ['b', 'c'])
+        self.assertTrue(index.depends_on('a', 'a'))
+
+    def test_dataframe(self):
+        df = self.index.to_dataframe('module')
+        self.assertEqual(df['modules'].tolist(), ['e', 'a', 'b,c', 'd'])
+        self.assertEqual(df['number_of_dependencies'].tolist(), [1, 3, 2, 0])
+        self.assertEqual(df['number_of_dependents'].tolist(), [0, 0, 2, 4])
+
+        index = gs.ReachabilityIndex.from_dataframe(df, 'module')
+        self.assertTrue(index.depends_on('a', 'd'))
+        self.assertEqual(sorted(index.dependents('c')), ['a', 'b'])
+
 
 if __name__ == '__main__':
     unittest.main()
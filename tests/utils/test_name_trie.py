@@ -0,0 +1,38 @@
+import unittest
+
+from pystruct.utils.name_trie import DottedNameTrie
+
+
+class TestDottedNameTrie(unittest.TestCase):
+    def setUp(self):
+        self.trie = DottedNameTrie(['a', 'a.b', 'a.b.c', 'a.bc', 'x.y'])
+
+    def test_longest_prefix(self):
+        self.assertEqual(self.trie.longest_prefix('a.b.c.d'), 'a.b.c')
+        self.assertEqual(self.trie.longest_prefix('a.b.d'), 'a.b')
+        self.assertEqual(self.trie.longest_prefix('a.bc'), 'a.bc')
+        self.assertEqual(self.trie.longest_prefix('x.y.z'), 'x.y')
+        self.assertIsNone(self.trie.longest_prefix('x'))
+        self.assertIsNone(self.trie.longest_prefix('b.a'))
+
+    def test_whole_components_only(self):
+        self.assertEqual(self.trie.longest_prefix('a.b_c'), 'a')
+        self.assertIsNone(self.trie.longest_prefix('x.yz'))
+
+    def test_empty_names(self):
+        self.assertIsNone(self.trie.longest_prefix(''))
+        self.assertIsNone(self.trie.longest_prefix(None))
+        self.assertIsNone(self.trie.longest_prefix(float('nan')))
+
+        trie = DottedNameTrie(['', 'a'])
+        self.assertEqual(trie.longest_prefix('b.c'), '')
+        self.assertEqual(trie.longest_prefix('a.c'), 'a')
+
+    def test_contains(self):
+        self.assertIn('a.b', self.trie)
+        self.assertNotIn('x', self.trie)
+        self.assertNotIn('a.b.c.d', self.trie)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pystruct.utils.package_index import PythonPackageIndex
+
+
+class TestPythonPackageIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tmp_dir.name, 'index', 'cpython.json')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_classify(self):
+        index = PythonPackageIndex(['os', 'json'], ['pandas', 'json'])
+        self.assertTrue(index.is_builtin('os'))
+        self.assertFalse(index.is_builtin('os.path'))
+        self.assertFalse(index.is_third_party('json'))
+        self.assertEqual([index.classify(root, project_root='project') for root in ['os', 'pandas', 'project', 'a']],
+                         [index.BUILTIN, index.THIRD_PARTY, index.INTERNAL, index.UNKNOWN])
+
+    def test_from_interpreter(self):
+        with mock.patch('urllib.request.urlopen', side_effect=AssertionError('no network access')):
+            index = PythonPackageIndex.from_interpreter()
+        self.assertTrue(all(index.is_builtin(root) for root in ['os', 'sys', 'json', 'collections']))
+        self.assertTrue(index.is_third_party('pandas'))
+        self.assertFalse(index.is_builtin('pandas'))
+
+    def test_load_saves_and_reuses_the_index(self):
+        index = PythonPackageIndex.load(self.filepath)
+        self.assertTrue(os.path.exists(self.filepath))
+
+        with mock.patch.object(PythonPackageIndex, 'from_interpreter') as from_interpreter:
+            loaded_index = PythonPackageIndex.load(self.filepath)
+        from_interpreter.assert_not_called()
+        self.assertEqual(loaded_index.to_dict(), index.to_dict())
+
+    def test_load_rebuilds_out_of_date_index(self):
+        PythonPackageIndex(['os'], ['a_package'], {'a_site_directory': 0.}).save(self.filepath)
+
+        index = PythonPackageIndex.load(self.filepath)
+        self.assertFalse(index.is_third_party('a_package'))
+        self.assertEqual(index.to_dict(), PythonPackageIndex.from_interpreter().to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,30 @@
+import os
+import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
 
+from pystruct.configs import PLANTUML_LOCAL_SERVER_URL, PLANTUML_WEB_SERVER_URL, PLANTUML_DOCKER_SERVER_URL,\
+    PLANTUML_RENDER_TIMEOUT, PLANTUML_CONNECT_TIMEOUT
 from pystruct.utils import plantuml_utils
-from pystruct.utils.plantuml_utils import PlantUMLService,\
-    PLANTUML_LOCAL_SERVER_URL, PLANTUML_WEB_SERVER_URL, PLANTUML_DOCKER_SERVER_URL
+from pystruct.utils.plantuml_utils import PlantUMLService, PlantUMLRenderCache, PlantUMLRenderPool,\
+    PlantUMLHealthCheck
 
 
 class TestPlantUMLService(unittest.TestCase):
+    def _service(self, urls=(PLANTUML_LOCAL_SERVER_URL, PLANTUML_DOCKER_SERVER_URL, PLANTUML_WEB_SERVER_URL), **kwargs):
+        health_check = PlantUMLHealthCheck(urls)
+        self.addCleanup(health_check.stop)
+        return PlantUMLService(health_check=health_check, **kwargs)
+
+    @patch('pystruct.utils.plantuml_utils.plantuml.PlantUML')
+    def test_init_does_not_connect(self, mock_plantuml):
+        PlantUMLService()
+
+        mock_plantuml.assert_not_called()
+
     @patch.object(plantuml_utils.PlantUMLService, '__init__', return_value=None)
     def test_singleton(self, mock_init):
         p1, p2 = plantuml_utils.PlantUMLService.get_instance(), plantuml_utils.PlantUMLService.get_instance()
@@ -19,14 +37,25 @@ class TestPlantUMLService(unittest.TestCase):
         mock_plantuml.return_value = mock_plant_uml_instance
         mock_plant_uml_instance.processes.return_value = 'Success'
 
-        plant_uml_service = PlantUMLService()
+        plant_uml_service = self._service()
+        plant_uml_service.reset_plant_uml_server()
 
-        mock_plantuml.assert_called_with(PLANTUML_LOCAL_SERVER_URL)
+        mock_plantuml.assert_called_with(PLANTUML_LOCAL_SERVER_URL, http_opts={'timeout': PLANTUML_RENDER_TIMEOUT})
         self.assertEqual(plant_uml_service._plant_uml_server, mock_plant_uml_instance)
 
+    @patch('pystruct.utils.plantuml_utils.plantuml.PlantUML')
+    def test_reset_plant_uml_server_uses_the_cached_health(self, mock_plantuml):
+        plant_uml_service = self._service()
+        plant_uml_service.reset_plant_uml_server()
+        plant_uml_service.reset_plant_uml_server()
+
+        health_checks = [call for call in mock_plantuml.call_args_list
+                         if call.kwargs == {'http_opts': {'timeout': PLANTUML_CONNECT_TIMEOUT}}]
+        self.assertEqual(len(health_checks), 1)
+
     @patch('pystruct.utils.plantuml_utils.plantuml.PlantUML')
     def test_reset_plant_uml_server_local_fail_but_docker_success(self, mock_plantuml):
-        def side_effect(url):
+        def side_effect(url, **kwargs):
             if url == PLANTUML_LOCAL_SERVER_URL:
                 raise plantuml_utils.plantuml.PlantUMLConnectionError()
             else:
@@ -36,14 +65,15 @@ class TestPlantUMLService(unittest.TestCase):
 
         mock_plantuml.side_effect = side_effect
 
-        plant_uml_service = PlantUMLService()
+        plant_uml_service = self._service()
+        plant_uml_service.reset_plant_uml_server()
 
-        mock_plantuml.assert_called_with(PLANTUML_DOCKER_SERVER_URL)
+        mock_plantuml.assert_called_with(PLANTUML_DOCKER_SERVER_URL, http_opts={'timeout': PLANTUML_RENDER_TIMEOUT})
         self.assertEqual(plant_uml_service._plant_uml_server.processes(), 'Success')
 
     @patch('pystruct.utils.plantuml_utils.plantuml.PlantUML')
     def test_reset_plant_uml_server_local_and_docker_fail_but_WEB_success(self, mock_plantuml):
-        def side_effect(url):
+        def side_effect(url, **kwargs):
             if url == PLANTUML_LOCAL_SERVER_URL or url == PLANTUML_DOCKER_SERVER_URL:
                 raise plantuml_utils.plantuml.PlantUMLConnectionError()
             else:
@@ -53,9 +83,10 @@ class TestPlantUMLService(unittest.TestCase):
 
         mock_plantuml.side_effect = side_effect
 
-        plant_uml_service = PlantUMLService()
+        plant_uml_service = self._service()
+        plant_uml_service.reset_plant_uml_server()
 
-        mock_plantuml.assert_called_with(PLANTUML_WEB_SERVER_URL)
+        mock_plantuml.assert_called_with(PLANTUML_WEB_SERVER_URL, http_opts={'timeout': PLANTUML_RENDER_TIMEOUT})
         self.assertEqual(plant_uml_service._plant_uml_server.processes(), 'Success')
 
 
@@ -63,12 +94,222 @@ class TestPlantUMLService(unittest.TestCase):
     def test_reset_plant_uml_server_local_and_web_connection_error(self, mock_plantuml):
         mock_plantuml.side_effect = plantuml_utils.plantuml.PlantUMLConnectionError()
 
+        plant_uml_service = self._service()
         with self.assertRaises(plantuml_utils.plantuml.PlantUMLConnectionError):
-            plant_uml_service = PlantUMLService()
+            plant_uml_service.reset_plant_uml_server()
+
+        self.assertIsNone(plant_uml_service._plant_uml_server)
+
+    @patch('pystruct.utils.plantuml_utils.plantuml.PlantUML')
+    def test_convert_multiple_docs_renders_every_document_once(self, mock_plantuml):
+        mock_plant_uml_instance = MagicMock()
+        mock_plantuml.return_value = mock_plant_uml_instance
+        mock_plant_uml_instance.processes.side_effect = lambda plantuml_text: plantuml_text.encode()
+
+        with tempfile.TemporaryDirectory() as directory:
+            plant_uml_service = self._service(render_cache=PlantUMLRenderCache(directory))
+            plant_uml_service.reset_plant_uml_server()
+            mock_plant_uml_instance.processes.reset_mock()
+
+            plant_uml_service.convert_multiple_docs_to_html_images(['@startuml\na\n@enduml', '@startuml\na\n@enduml'])
+            plant_uml_service.convert_doc_to_html_image('@startuml\na\n@enduml')
+
+        mock_plant_uml_instance.processes.assert_called_once_with(plantuml_text='@startuml\na\n@enduml')
+
+
+class TestPlantUMLRenderCache(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+
+    def test_get_and_put(self):
+        cache = PlantUMLRenderCache(self._directory.name)
+        self.assertIsNone(cache.get('doc'))
+
+        cache.put('doc', b'image')
+
+        self.assertEqual(cache.get('doc'), b'image')
+        self.assertIsNone(cache.get('doc', image_format='svg'))
+        # the cache is on disk, so it is shared by new instances
+        self.assertEqual(PlantUMLRenderCache(self._directory.name).get('doc'), b'image')
+
+    def test_least_recently_used_are_evicted(self):
+        cache = PlantUMLRenderCache(self._directory.name, max_size=10)
+        cache.put('doc1', b'1234')
+        cache.put('doc2', b'1234')
+        past = time.time() - 60
+        for filename in os.listdir(self._directory.name):
+            os.utime(os.path.join(self._directory.name, filename), (past, past))
+        cache.get('doc1')
+
+        cache.put('doc3', b'1234')
+
+        self.assertEqual(cache.get('doc1'), b'1234')
+        self.assertIsNone(cache.get('doc2'))
+        self.assertEqual(cache.get('doc3'), b'1234')
+
+    def test_directory_is_scanned_once(self):
+        cache = PlantUMLRenderCache(self._directory.name, max_size=10)
+        cache.put('doc1', b'1234')
+        past = time.time() - 60
+        for filename in os.listdir(self._directory.name):
+            os.utime(os.path.join(self._directory.name, filename), (past, past))
+
+        # a new instance reads the order of use from the modification times
+        cache = PlantUMLRenderCache(self._directory.name, max_size=10)
+        with patch('os.scandir', wraps=os.scandir) as scandir:
+            cache.put('doc2', b'1234')
+            cache.put('doc3', b'1234')
+            cache.put('doc4', b'1234')
+
+        self.assertEqual(scandir.call_count, 1)
+        self.assertEqual(sorted(os.listdir(self._directory.name)),
+                         sorted(f"{PlantUMLRenderCache.key(doc)}.png" for doc in ('doc3', 'doc4')))
+
+
+class StubPlantUMLServer:
+    """
+    Local HTTP server that answers every GET with the requested path as the image, after `delay` seconds, or
+    with the statuses of `failures` for the first requests.
+    """
+    def __init__(self, delay=0., failures=()):
+        self.paths = []
+        self.client_ports = set()
+        self.closed = False
+        failures = list(failures)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if stub.closed:
+                    self.close_connection = True
+                    return
+                stub.paths.append(self.path)
+                stub.client_ports.add(self.client_address[1])
+                time.sleep(delay)
+                status, body = (failures.pop(0), b'error') if failures else (200, self.path.encode())
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self._server.server_port}/img/'
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.closed = True
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class TestPlantUMLRenderPool(unittest.TestCase):
+    def _stub_server(self, **kwargs):
+        server = StubPlantUMLServer(**kwargs)
+        self.addCleanup(server.close)
+        return server
+
+    def _pool(self, urls, **kwargs):
+        pool = PlantUMLRenderPool(urls, **kwargs)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_documents_are_rendered_concurrently_on_kept_alive_connections(self):
+        server = self._stub_server(delay=0.2)
+        pool = self._pool([server.url], max_workers=4)
+        docs = [f'@startuml\nA -> B{i}\n@enduml' for i in range(8)]
+
+        start = time.perf_counter()
+        images = pool.map(pool.render, docs)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(images, [pool._client(server.url).get_url(doc)[len(server.url)-5:].encode() for doc in docs])
+        self.assertLess(elapsed, 8 * 0.2 / 2)
+        self.assertLessEqual(len(server.client_ports), 4)
+
+    def test_documents_are_spread_over_the_servers(self):
+        servers = [self._stub_server(), self._stub_server()]
+        pool = self._pool([server.url for server in servers], max_workers=2)
+
+        pool.map(pool.render, [f'doc {i}' for i in range(6)])
+
+        self.assertEqual([len(server.paths) for server in servers], [3, 3])
+
+    def test_server_errors_are_retried(self):
+        server = self._stub_server(failures=[503, 503])
+        pool = self._pool([server.url], retries=2)
+
+        self.assertTrue(pool.render('doc').startswith(b'/img/'))
+        self.assertEqual(len(server.paths), 3)
+
+    def test_client_errors_are_not_retried(self):
+        server = self._stub_server(failures=[400])
+        pool = self._pool([server.url], retries=2)
+
+        with self.assertRaises(plantuml_utils.PlantUMLRenderError):
+            pool.render('doc')
+        self.assertEqual(len(server.paths), 1)
+
+    def test_service_renders_with_the_pool(self):
+        server = self._stub_server()
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.object(plantuml_utils, 'PLANTUML_LOCAL_SERVER_URL', server.url):
+            service = PlantUMLService(multithreading=True, render_cache=PlantUMLRenderCache(directory))
+            self.addCleanup(service._render_pool.shutdown)
+            self.addCleanup(service._health_check.stop)
+
+            html_images = service.convert_multiple_docs_to_html_images(['doc 1', 'doc 2', 'doc 1'])
+
+        self.assertEqual(len(html_images), 3)
+        # the test message of the connection, and the two documents
+        self.assertEqual(len(server.paths), 3)
+
+
+class TestPlantUMLHealthCheck(unittest.TestCase):
+    def _stub_server(self):
+        server = StubPlantUMLServer()
+        self.addCleanup(server.close)
+        return server
+
+    def test_render_fails_over_to_the_next_healthy_server(self):
+        servers = [self._stub_server(), self._stub_server()]
+        health_check = PlantUMLHealthCheck([server.url for server in servers])
+        self.addCleanup(health_check.stop)
+
+        with tempfile.TemporaryDirectory() as directory:
+            service = PlantUMLService(render_cache=PlantUMLRenderCache(directory), health_check=health_check)
+            service.render('doc 1')
+            servers[0].close()
+            service.render('doc 2')
+
+        self.assertEqual(service._plant_uml_server.url, servers[1].url)
+        self.assertEqual([len(server.paths) for server in servers], [2, 2])
+        self.assertFalse(health_check.cached_status(servers[0].url))
+
+    def test_servers_are_checked_in_the_background(self):
+        server = self._stub_server()
+        health_check = PlantUMLHealthCheck([server.url], interval=0.05)
+        self.assertIsNone(health_check.cached_status(server.url))
+
+        health_check.start()
+        time.sleep(0.3)
+        health_check.stop()
+
+        self.assertTrue(health_check.cached_status(server.url))
+        self.assertGreaterEqual(len(server.paths), 2)
+
+    def test_cached_status_expires(self):
+        health_check = PlantUMLHealthCheck(['http://localhost:1/img/'], max_age=0.)
+        health_check.mark_unhealthy('http://localhost:1/img/')
+        time.sleep(0.01)
 
-            mock_plantuml.assert_called_with(PLANTUML_LOCAL_SERVER_URL)
-            mock_plantuml.assert_called_with(PLANTUML_WEB_SERVER_URL)
-            self.assertIsNone(plant_uml_service._plant_uml_server)
+        self.assertIsNone(health_check.cached_status('http://localhost:1/img/'))
 
 
 if __name__ == '__main__':